@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled field-mapping transforms vs the hand-written ones.
+
+The hand-written variant is the reference: the dict literals with
+safe_to_double/safe_to_int/parse_date per field that extract_bonds.py,
+extract_shares.py and extract_loans.py used before field_mapping.py
+(apartments: the engine's transform from that time), copied below
+unchanged apart from taking the record ID as an argument. The speedup
+column is measured against it; below 1.0x the compiled transform is slower.
+
+The interpreted variant walks the schema generically for every record
+(field_mapping.interpret_schema). It is slower than either and only
+shown for comparison. The compiled output is checked against both.
+
+Every run starts cold (field_mapping.clear_caches), otherwise the amount,
+category and date caches would stay warm for the compiled transforms
+only. Cold, the compiled transforms win clearly only where most columns
+are amounts and dates: bonds (1.4-2.4x) and loans (1.2-2.3x) on the
+export and on a synthetic 20,000-row set. Shares and apartments are even
+or slower (0.8-1.0x): they have fewer converted columns, and the first
+sight of every value pays for the caches and for the date validation
+the hand-written parse_date never did.
+
+Usage: python benchmark_field_mapping.py [source.json] [--repeat N]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from field_mapping import (
+    APARTMENT_SCHEMA,
+    BOND_SCHEMA,
+    LOAN_SCHEMA,
+    SHARE_SCHEMA,
+    SOURCE_FILE,
+    clear_caches,
+    interpret_schema,
+    transform_apartment,
+    transform_bond,
+    transform_loan,
+    transform_share,
+)
+from json_stream import iter_records
+
+
+# --- Hand-written reference (the extract_*.py scripts before field_mapping) ---
+
+def safe_to_double(value):
+    """Safely convert value to double/float"""
+    if value is None or value == 'NULL' or value == '':
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        if value.strip() == '' or value.upper() == 'NULL':
+            return 0.0
+        # Handle comma-separated numbers like "305,700.00"
+        cleaned = value.replace(',', '')
+        try:
+            return float(cleaned)
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def safe_to_int(value):
+    """Safely convert value to int"""
+    if value is None or value == 'NULL' or value == '':
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        if value.strip() == '' or value.upper() == 'NULL':
+            return 0
+        try:
+            return int(float(value))
+        except ValueError:
+            return 0
+    return 0
+
+
+def parse_date(date_str):
+    """Parse date string to ISO format"""
+    if not date_str or date_str == 'NULL':
+        return None
+
+    try:
+        # Handle different date formats
+        if '-' in date_str:
+            # ISO format like "2019-01-30 00:00:00"
+            return date_str.split(' ')[0] + 'T00:00:00.000Z'
+        elif '/' in date_str:
+            # Format like "2/8/19"
+            parts = date_str.split('/')
+            if len(parts) == 3:
+                month, day, year = parts
+                year = int(year)
+                if year < 100:
+                    year += 2000 if year < 30 else 1900
+                return f"{year:04d}-{int(month):02d}-{int(day):02d}T00:00:00.000Z"
+        return date_str
+    except Exception as e:
+        print(f"Error parsing date: {date_str} - {e}")
+        return None
+
+
+def handwritten_bond(bond, record_id, current_time):
+    return {
+        "id": record_id,
+        "productType": bond.get('Typ_produktu', 'Obligacje'),
+        "investmentAmount": safe_to_double(bond.get('Kwota_inwestycji')),
+        "realizedCapital": safe_to_double(bond.get('Kapital zrealizowany')),
+        "remainingCapital": safe_to_double(bond.get('Kapital Pozostaly')),
+        "realizedInterest": 0.0,
+        "remainingInterest": 0.0,
+        "realizedTax": 0.0,
+        "remainingTax": 0.0,
+        "transferToOtherProduct": safe_to_double(bond.get('Przekaz na inny produkt')),
+        "capitalForRestructuring": safe_to_double(bond.get('Kapitał do restrukturyzacji')),
+        "capitalSecuredByRealEstate": safe_to_double(bond.get('Kapitał zabezpieczony nieruchomością')),
+        "sourceFile": SOURCE_FILE,
+        "createdAt": current_time,
+        "uploadedAt": current_time,
+        "clientId": bond.get('ID_Klient'),
+        "clientName": bond.get('Klient'),
+        "companyId": bond.get('ID_Spolka'),
+        "salesId": bond.get('ID_Sprzedaz'),
+        "sharesCount": None,
+        "paymentAmount": safe_to_double(bond.get('Kwota_wplat')),
+        "branch": bond.get('Oddzial'),
+        "advisor": bond.get('Opiekun z MISA'),
+        "productName": bond.get('Produkt_nazwa'),
+        "productStatusEntry": bond.get('Produkt_status_wejscie'),
+        "productStatus": bond.get('Status_produktu'),
+        "signedDate": parse_date(bond.get('Data_podpisania')),
+        "investmentEntryDate": parse_date(bond.get('Data_wejscia_do_inwestycji')),
+        "issueDate": parse_date(bond.get('data_emisji')),
+        "maturityDate": parse_date(bond.get('data_wykupu')),
+        "redemptionDate": parse_date(bond.get('data_wykupu')),
+        "interestRate": bond.get('oprocentowanie'),
+        "additionalInfo": {
+            "wierzyciel_spolka": bond.get('wierzyciel_spolka')
+        }
+    }
+
+
+def handwritten_share(share, record_id, current_time):
+    return {
+        "id": record_id,
+        "productType": share.get('Typ_produktu', 'Udziały'),
+        "investmentAmount": safe_to_double(share.get('Kwota_inwestycji')),
+        "sharesCount": safe_to_int(share.get('Ilosc_Udzialow')),
+        "remainingCapital": safe_to_double(share.get('Kapital Pozostaly')),
+        "capitalForRestructuring": safe_to_double(share.get('Kapitał do restrukturyzacji')),
+        "capitalSecuredByRealEstate": safe_to_double(share.get('Kapitał zabezpieczony nieruchomością')),
+        "sourceFile": SOURCE_FILE,
+        "createdAt": current_time,
+        "uploadedAt": current_time,
+        "clientId": share.get('ID_Klient'),
+        "clientName": share.get('Klient'),
+        "companyId": share.get('ID_Spolka'),
+        "salesId": share.get('ID_Sprzedaz'),
+        "paymentAmount": safe_to_double(share.get('Kwota_wplat')),
+        "branch": share.get('Oddzial'),
+        "advisor": share.get('Opiekun z MISA'),
+        "productName": share.get('Produkt_nazwa'),
+        "productStatusEntry": share.get('Produkt_status_wejscie'),
+        "productStatus": share.get('Status_produktu'),
+        "signedDate": parse_date(share.get('Data_podpisania')),
+        "investmentEntryDate": parse_date(share.get('Data_wejscia_do_inwestycji')),
+        "issueDate": parse_date(share.get('data_emisji')),
+        "maturityDate": parse_date(share.get('data_wykupu')),
+        "additionalInfo": {
+            "wierzyciel_spolka": share.get('wierzyciel_spolka'),
+            "realizedCapital": safe_to_double(share.get('Kapital zrealizowany')),
+            "transferToOtherProduct": safe_to_double(share.get('Przekaz na inny produkt'))
+        }
+    }
+
+
+def handwritten_loan(loan, record_id, current_time):
+    return {
+        "id": record_id,
+        "productType": loan.get('Typ_produktu', 'Pożyczka'),
+        "investmentAmount": safe_to_double(loan.get('Kwota_inwestycji')),
+        "remainingCapital": safe_to_double(loan.get('Kapital Pozostaly')),
+        "capitalForRestructuring": safe_to_double(loan.get('Kapitał do restrukturyzacji')),
+        "capitalSecuredByRealEstate": safe_to_double(loan.get('Kapitał zabezpieczony nieruchomością')),
+        "sourceFile": SOURCE_FILE,
+        "createdAt": current_time,
+        "uploadedAt": current_time,
+        "clientId": loan.get('ID_Klient'),
+        "clientName": loan.get('Klient'),
+        "companyId": loan.get('ID_Spolka'),
+        "salesId": loan.get('ID_Sprzedaz'),
+        "paymentAmount": safe_to_double(loan.get('Kwota_wplat')),
+        "branch": loan.get('Oddzial'),
+        "advisor": loan.get('Opiekun z MISA'),
+        "productName": loan.get('Produkt_nazwa'),
+        "productStatusEntry": loan.get('Produkt_status_wejscie'),
+        "productStatus": loan.get('Status_produktu'),
+        "signedDate": parse_date(loan.get('Data_podpisania')),
+        "investmentEntryDate": parse_date(loan.get('Data_wejscia_do_inwestycji')),
+        "issueDate": parse_date(loan.get('data_emisji')),
+        "maturityDate": parse_date(loan.get('data_wykupu')),
+        "loanNumber": None,
+        "borrower": loan.get('Klient'),
+        "creditorCompany": loan.get('wierzyciel_spolka'),
+        "interestRate": loan.get('oprocentowanie'),
+        "disbursementDate": parse_date(loan.get('Data_wejscia_do_inwestycji')),
+        "repaymentDate": parse_date(loan.get('data_wykupu')),
+        "accruedInterest": 0.0,
+        "collateral": None,
+        "status": loan.get('Status_produktu'),
+        "additionalInfo": {
+            "realizedCapital": safe_to_double(loan.get('Kapital zrealizowany')),
+            "transferToOtherProduct": safe_to_double(loan.get('Przekaz na inny produkt')),
+            "sharesCount": loan.get('Ilosc_Udzialow')
+        }
+    }
+
+
+def handwritten_apartment(apartment, record_id, current_time):
+    return {
+        "id": record_id,
+        "productType": apartment.get('Typ_produktu', 'Apartamenty'),
+        "investmentAmount": safe_to_double(apartment.get('Kwota_inwestycji')),
+        "capitalForRestructuring": safe_to_double(apartment.get('Kapitał do restrukturyzacji')),
+        "capitalSecuredByRealEstate": safe_to_double(apartment.get('Kapitał zabezpieczony nieruchomością')),
+        "sourceFile": SOURCE_FILE,
+        "createdAt": current_time,
+        "uploadedAt": current_time,
+        "saleId": apartment.get('ID_Sprzedaz'),
+        "clientId": apartment.get('ID_Klient'),
+        "clientName": apartment.get('Klient'),
+        "advisor": apartment.get('Opiekun z MISA'),
+        "branch": apartment.get('Oddzial'),
+        "productStatus": apartment.get('Status_produktu'),
+        "marketEntry": apartment.get('Produkt_status_wejscie'),
+        "projectName": apartment.get('Produkt_nazwa'),
+        "creditorCompany": apartment.get('wierzyciel_spolka'),
+        "companyId": apartment.get('ID_Spolka'),
+        "shareCount": apartment.get('Ilosc_Udzialow'),
+        "paymentAmount": safe_to_double(apartment.get('Kwota_wplat')),
+        "realizedCapital": safe_to_double(apartment.get('Kapital zrealizowany')),
+        "transferToOtherProduct": safe_to_double(apartment.get('Przekaz na inny produkt')),
+        "remainingCapital": safe_to_double(apartment.get('Kapital Pozostaly')),
+        "signedDate": parse_date(apartment.get('Data_podpisania')),
+        "investmentEntryDate": parse_date(apartment.get('Data_wejscia_do_inwestycji')),
+        "issueDate": parse_date(apartment.get('data_emisji')),
+        "redemptionDate": parse_date(apartment.get('data_wykupu')),
+        "additionalInfo": {}
+    }
+
+
+CASES = {
+    'Obligacje': (BOND_SCHEMA, handwritten_bond, transform_bond),
+    'Udziały': (SHARE_SCHEMA, handwritten_share, transform_share),
+    'Pożyczka': (LOAN_SCHEMA, handwritten_loan, transform_loan),
+    'Apartamenty': (APARTMENT_SCHEMA, handwritten_apartment, transform_apartment),
+}
+
+
+def _best_time(function, records, current_time, repeat):
+    """Best of `repeat` cold runs: the compiled transforms' caches are emptied before each"""
+    best = float('inf')
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        for i, record in enumerate(records):
+            function(record, i, current_time)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compiled field mapping')
+    parser.add_argument('source', nargs='?', default=SOURCE_FILE)
+    parser.add_argument('--repeat', type=int, default=5, help='Take the best of N runs')
+    args = parser.parse_args()
+
+    by_type = {product_type: [] for product_type in CASES}
+    for record in iter_records(args.source):
+        records = by_type.get(record.get('Typ_produktu'))
+        if records is not None:
+            records.append(record)
+
+    current_time = datetime.now().isoformat() + 'Z'
+
+    print(f"⏱️  Field mapping benchmark ({args.source}, best of {args.repeat})")
+    print(f"{'type':<14}{'rows':>8}{'hand-written':>15}{'interpreted':>14}{'compiled':>12}{'speedup':>10}")
+
+    for product_type, (schema, handwritten, transform) in CASES.items():
+        records = by_type[product_type]
+        if not records:
+            continue
+
+        # All three must produce the same records
+        for i, record in enumerate(records):
+            compiled = transform(record, i, current_time)
+            if compiled != interpret_schema(schema, record, i, current_time):
+                raise SystemExit(f"❌ {product_type}: compiled output differs from the interpreter for record {i}")
+            if compiled != handwritten(record, i, current_time):
+                raise SystemExit(f"❌ {product_type}: compiled output differs from the hand-written one for record {i}")
+
+        reference = _best_time(handwritten, records, current_time, args.repeat)
+        interpreted = _best_time(lambda record, i, now: interpret_schema(schema, record, i, now),
+                                 records, current_time, args.repeat)
+        compiled = _best_time(transform, records, current_time, args.repeat)
+        # Speedup over the hand-written transform, not over the interpreter
+        print(f"{product_type:<14}{len(records):>8}{reference * 1000:>13.2f}ms{interpreted * 1000:>12.2f}ms"
+              f"{compiled * 1000:>10.2f}ms{reference / compiled:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
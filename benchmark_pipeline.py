@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the extraction pipeline on synthetic data.
+
+A seeded generator produces tableConvert-shaped records that follow the
+real export: the product type mix, per-type NULL / empty density, the share
+of comma-formatted amounts ("305,700.00") and the mix of date formats
+("2019-01-30 00:00:00" / "2/8/19") are profiled from the source file, and
+values are drawn (with jitter) from the observed ones. The same seed and
+profile always give the same dataset.
+
+Every stage runs in a fresh process so its peak RSS is measured on its own:
+
+    bonds, shares, loans, apartments   what extract_<type>.main() runs
+    clients                            what extract_clients.extract_clients() runs
+    engine                             all products and clients in one pass
+
+Results (seconds, rows/s, peak RSS) can be stored as a baseline; later runs
+fail with exit code 1 when a stage is slower or uses more memory than the
+baseline allows (--tolerance).
+
+Usage:
+    python benchmark_pipeline.py --rows 2000 20000 200000
+    python benchmark_pipeline.py --rows 20000 --save-baseline
+    python benchmark_pipeline.py --rows 20000            # compares to benchmark_baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import date, timedelta
+
+from field_mapping import SOURCE_FILE
+from json_stream import iter_records
+from json_writers import write_json_array
+
+BASELINE_FILE = 'benchmark_baseline.json'
+DEFAULT_ROWS = (2000, 20000)
+DEFAULT_SEED = 42
+DEFAULT_TOLERANCE = 0.25
+
+STAGES = {
+    'bonds': {'products': ['bonds'], 'include_clients': False},
+    'shares': {'products': ['shares'], 'include_clients': False},
+    'loans': {'products': ['loans'], 'include_clients': False},
+    'apartments': {'products': ['apartments'], 'include_clients': False},
+    'clients': {'products': [], 'include_clients': True},
+    'engine': {'products': None, 'include_clients': True},
+}
+
+# Columns generated from the client pool / a running counter, not sampled
+_SALE_ID = 'ID_Sprzedaz'
+_CLIENT_ID = 'ID_Klient'
+_CLIENT_NAME = 'Klient'
+_PRODUCT_TYPE = 'Typ_produktu'
+
+_ISO_DATE = re.compile(r'^(\d{4})-(\d\d)-(\d\d) 00:00:00$')
+_SHORT_DATE = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d\d)$')
+_NUMBER = re.compile(r'^-?\d+(?:\.\d+)?$')
+_COMMA_NUMBER = re.compile(r'^-?\d{1,3}(?:,\d{3})+(?:\.\d+)?$')
+
+
+def _classify(value):
+    """Value class used by the profile: NULL, empty, iso, short, comma, number, text"""
+    if value is None or value == 'NULL':
+        return 'NULL'
+    if not isinstance(value, str):
+        return 'number'
+    if value == '':
+        return 'empty'
+    if _ISO_DATE.match(value):
+        return 'iso'
+    if _SHORT_DATE.match(value):
+        return 'short'
+    if _COMMA_NUMBER.match(value):
+        return 'comma'
+    if _NUMBER.match(value):
+        return 'number'
+    return 'text'
+
+
+def _to_date(value):
+    match = _ISO_DATE.match(value)
+    if match:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    month, day, year = (int(part) for part in _SHORT_DATE.match(value).groups())
+    return date(year + (2000 if year < 30 else 1900), month, day)
+
+
+class DataProfile:
+    """
+    Per product type and column: how often each value class occurs and the
+    observed values per class. Built from the real export.
+    """
+
+    def __init__(self, columns, type_mix, classes, samples, decimal_columns, clients_per_row,
+                 first_names, last_names):
+        self.columns = columns
+        self.type_mix = type_mix
+        self.classes = classes
+        self.samples = samples
+        self.decimal_columns = decimal_columns
+        self.clients_per_row = clients_per_row
+        self.first_names = first_names
+        self.last_names = last_names
+
+    @classmethod
+    def from_records(cls, records):
+        columns = []
+        type_mix = Counter()
+        classes = {}
+        samples = {}
+        decimal_columns = set()
+        client_ids = set()
+        first_names = Counter()
+        last_names = Counter()
+        rows = 0
+
+        for record in records:
+            rows += 1
+            for column in record:
+                if column not in columns:
+                    columns.append(column)
+            product_type = record.get(_PRODUCT_TYPE)
+            type_mix[product_type] += 1
+            client_ids.add(record.get(_CLIENT_ID))
+            name_parts = str(record.get(_CLIENT_NAME) or '').split()
+            if len(name_parts) >= 2:
+                first_names[name_parts[0]] += 1
+                last_names[name_parts[-1]] += 1
+
+            for column, value in record.items():
+                value_class = _classify(value)
+                key = (product_type, column)
+                classes.setdefault(key, Counter())[value_class] += 1
+                pool = samples.setdefault(key, {}).setdefault(value_class, [])
+                if value_class in ('iso', 'short'):
+                    pool.append(_to_date(value))
+                elif value_class in ('comma', 'number'):
+                    pool.append(float(str(value).replace(',', '')))
+                    if '.' in str(value):
+                        decimal_columns.add(column)
+                elif value_class == 'text':
+                    pool.append(value)
+
+        return cls(columns, type_mix, classes, samples, decimal_columns, len(client_ids) / max(rows, 1),
+                   first_names, last_names)
+
+    @classmethod
+    def from_file(cls, source_file=SOURCE_FILE):
+        return cls.from_records(iter_records(source_file))
+
+
+def _weighted(counter):
+    items = list(counter.items())
+    return [item for item, _ in items], [count for _, count in items]
+
+
+def generate_records(count, profile, seed=DEFAULT_SEED):
+    """Yield `count` synthetic tableConvert records (deterministic for a seed)"""
+    rng = random.Random(seed)
+    types, type_weights = _weighted(profile.type_mix)
+    class_choices = {key: _weighted(counter) for key, counter in profile.classes.items()}
+    first_names, first_weights = _weighted(profile.first_names)
+    last_names, last_weights = _weighted(profile.last_names)
+
+    client_count = max(1, int(count * profile.clients_per_row))
+    clients = [
+        (str(index + 1), f"{rng.choices(first_names, first_weights)[0]} {rng.choices(last_names, last_weights)[0]}")
+        for index in range(client_count)
+    ]
+
+    for row in range(count):
+        product_type = rng.choices(types, type_weights)[0]
+        client_id, client_name = clients[rng.randrange(client_count)]
+        record = {}
+        for column in profile.columns:
+            key = (product_type, column)
+            value_classes, weights = class_choices.get(key, (['NULL'], [1]))
+            value_class = rng.choices(value_classes, weights)[0]
+            pool = profile.samples.get(key, {}).get(value_class)
+
+            if value_class == 'NULL':
+                value = 'NULL'
+            elif value_class == 'empty':
+                value = ''
+            elif column == _SALE_ID:
+                value = str(row + 1)
+            elif column == _CLIENT_ID:
+                value = client_id
+            elif column == _CLIENT_NAME:
+                value = client_name
+            elif column == _PRODUCT_TYPE:
+                value = product_type
+            elif value_class in ('iso', 'short'):
+                day = rng.choice(pool) + timedelta(days=rng.randint(-15, 15))
+                if value_class == 'iso':
+                    value = f"{day.isoformat()} 00:00:00"
+                else:
+                    value = f"{day.month}/{day.day}/{day.year % 100:02d}"
+            elif value_class in ('comma', 'number'):
+                sample = rng.choice(pool)
+                amount = sample * rng.uniform(0.5, 1.5)
+                if value_class == 'comma':
+                    value = f"{amount:,.2f}"
+                elif column in profile.decimal_columns:
+                    value = f"{amount:.2f}"
+                else:
+                    value = str(round(amount))
+            else:
+                value = rng.choice(pool)
+            record[column] = value
+        yield record
+
+
+def write_dataset(path, count, profile, seed=DEFAULT_SEED):
+    """Stream a synthetic export to `path` in the tableConvert layout"""
+    write_json_array(generate_records(count, profile, seed), path)
+    return path
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_stage(stage, source_file, output_dir):
+    """Runs in a fresh process: (seconds, records read, peak RSS in MB)"""
+    from extraction_engine import run_extraction
+
+    options = STAGES[stage]
+    start = time.perf_counter()
+    total, _ = run_extraction(source_file, products=options['products'],
+                              include_clients=options['include_clients'], output_dir=output_dir,
+                              keep_records=False)
+    return time.perf_counter() - start, total, _peak_rss_mb()
+
+
+def measure(stage, source_file, output_dir, repeat=1):
+    """Best-of-`repeat` timing; each run in its own spawned process"""
+    context = multiprocessing.get_context('spawn')
+    best = None
+    for _ in range(repeat):
+        with context.Pool(1) as pool:
+            seconds, total, peak = pool.apply(_run_stage, (stage, source_file, output_dir))
+        if best is None or seconds < best['seconds']:
+            best = {
+                'seconds': round(seconds, 4),
+                'rowsPerSecond': round(total / seconds, 1) if seconds else 0.0,
+                'peakRssMb': round(peak, 1),
+            }
+    return best
+
+
+def compare(results, baseline, tolerance):
+    """List of regressions (strings) against the baseline"""
+    regressions = []
+    for rows, stages in results.items():
+        for stage, current in stages.items():
+            reference = baseline.get(rows, {}).get(stage)
+            if reference is None:
+                continue
+            if current['rowsPerSecond'] < reference['rowsPerSecond'] * (1 - tolerance):
+                regressions.append(f"{stage} @ {rows} rows: {current['rowsPerSecond']:,.0f} rows/s "
+                                   f"(baseline {reference['rowsPerSecond']:,.0f})")
+            if current['peakRssMb'] > reference['peakRssMb'] * (1 + tolerance):
+                regressions.append(f"{stage} @ {rows} rows: peak RSS {current['peakRssMb']:.1f} MB "
+                                   f"(baseline {reference['peakRssMb']:.1f} MB)")
+    return regressions
+
+
+def run_benchmarks(rows_list, stages, profile, data_dir, seed=DEFAULT_SEED, repeat=1):
+    """{rows: {stage: result}}; datasets are generated into data_dir when missing"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='benchmark_output_') as output_dir:
+        for rows in rows_list:
+            source_file = os.path.join(data_dir, f"synthetic_{rows}_{seed}.json")
+            if not os.path.exists(source_file):
+                print(f"🧪 Generating {rows:,} rows (seed {seed})...")
+                start = time.perf_counter()
+                write_dataset(source_file, rows, profile, seed)
+                print(f"  {os.path.getsize(source_file) / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+            print(f"\n⏱️  {rows:,} rows")
+            print(f"{'stage':<12}{'seconds':>10}{'rows/s':>14}{'peak RSS':>12}")
+            measured = {}
+            for stage in stages:
+                result = measured[stage] = measure(stage, source_file, output_dir, repeat)
+                print(f"{stage:<12}{result['seconds']:>10.3f}{result['rowsPerSecond']:>14,.0f}"
+                      f"{result['peakRssMb']:>9.1f} MB")
+            results[str(rows)] = measured
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the extraction pipeline on synthetic data')
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_ROWS),
+                        help='Dataset sizes (default: 2000 20000; up to millions of rows)')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=1, help='Take the best of N runs per stage')
+    parser.add_argument('--profile-source', default=SOURCE_FILE,
+                        help='Real export the generator is profiled from')
+    parser.add_argument('--data-dir', help='Keep generated datasets here (reused between runs)')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown / memory growth vs the baseline (default: 0.25)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.profile_source):
+        print(f"❌ Error: {args.profile_source} not found")
+        sys.exit(1)
+
+    profile = DataProfile.from_file(args.profile_source)
+    # Generated datasets are kept only when --data-dir names where to put them
+    datasets = nullcontext(args.data_dir) if args.data_dir else tempfile.TemporaryDirectory(prefix='benchmark_pipeline_')
+    with datasets as data_dir:
+        os.makedirs(data_dir, exist_ok=True)
+        results = run_benchmarks(args.rows, args.stages, profile, data_dir, args.seed, args.repeat)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as file:
+                baseline = json.load(file)
+        for rows, stages in results.items():
+            baseline.setdefault(rows, {}).update(stages)
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(baseline, file, indent=2, ensure_ascii=False)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Extract-time capital summaries per client, product and company.
+
+Uses the same definitions as functions/utils/unified-statistics.js so the
+dashboard and analytics endpoints can read precomputed numbers instead of
+scanning every investment per request:
+
+    totalValue                 = remainingCapital + remainingInterest
+    viableCapital              = remainingCapital WHERE productStatus = Aktywny
+    majorityThreshold          = viableCapital * 0.51
+    capitalSecuredByRealEstate = max(remainingCapital - capitalForRestructuring, 0)
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+from field_mapping import INVESTMENT_COLLECTIONS
+
+ACTIVE_STATUS = 'Aktywny'
+MAJORITY_RATIO = 0.51
+
+DEFINITIONS = {
+    'TOTAL_VALUE': 'remainingCapital + remainingInterest',
+    'VIABLE_CAPITAL': 'remainingCapital WHERE productStatus = Aktywny',
+    'MAJORITY_THRESHOLD': 'viableCapital * 0.51',
+    'ACTIVE_STATUS': ACTIVE_STATUS,
+    'CAPITAL_SECURED_BY_REAL_ESTATE': 'remainingCapital - capitalForRestructuring',
+}
+
+SUMMARY_FILES = {
+    'system': 'summary_system.json',
+    'clients': 'summary_clients.json',
+    'products': 'summary_products.json',
+    'companies': 'summary_companies.json',
+}
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+
+def investment_metrics(investment):
+    """Unified per-investment figures (see module docstring)"""
+    remaining_capital = _number(investment.get('remainingCapital'))
+    remaining_interest = _number(investment.get('remainingInterest'))
+    restructuring = _number(investment.get('capitalForRestructuring'))
+    is_active = investment.get('productStatus') == ACTIVE_STATUS
+    # Shares and loans keep realizedCapital in additionalInfo
+    realized = investment.get('realizedCapital')
+    if realized is None:
+        realized = (investment.get('additionalInfo') or {}).get('realizedCapital')
+
+    return {
+        'isActive': is_active,
+        'investmentAmount': _number(investment.get('investmentAmount')),
+        'realizedCapital': _number(realized),
+        'remainingCapital': remaining_capital,
+        'totalValue': remaining_capital + remaining_interest,
+        'viableCapital': remaining_capital if is_active else 0.0,
+        'capitalForRestructuring': restructuring,
+        'capitalSecuredByRealEstate': max(remaining_capital - restructuring, 0.0),
+    }
+
+
+_SUMMED_FIELDS = (
+    'investmentAmount', 'realizedCapital', 'remainingCapital', 'totalValue',
+    'viableCapital', 'capitalForRestructuring', 'capitalSecuredByRealEstate',
+)
+
+
+def _empty_bucket():
+    bucket = {'count': 0, 'activeCount': 0}
+    for field in _SUMMED_FIELDS:
+        bucket[field] = 0.0
+    return bucket
+
+
+def _accumulate(bucket, metrics):
+    bucket['count'] += 1
+    if metrics['isActive']:
+        bucket['activeCount'] += 1
+    for field in _SUMMED_FIELDS:
+        bucket[field] += metrics[field]
+
+
+def product_name(investment):
+    """Apartments carry the product name as projectName"""
+    return investment.get('productName') or investment.get('projectName') or 'Nieznany'
+
+
+class CapitalSummaryBuilder:
+    """Accumulates all summaries in one pass over the investments"""
+
+    def __init__(self):
+        self.system = _empty_bucket()
+        self.product_types = {}
+        self.clients = {}
+        self.products = {}
+        self.companies = {}
+        self._product_investors = {}
+
+    def add(self, investment):
+        metrics = investment_metrics(investment)
+        product_type = investment.get('productType') or 'Nieznany'
+        client_id = investment.get('clientId') or ''
+        name = product_name(investment)
+        company_id = investment.get('companyId') or 'Nieznana'
+
+        _accumulate(self.system, metrics)
+
+        if product_type not in self.product_types:
+            self.product_types[product_type] = _empty_bucket()
+        _accumulate(self.product_types[product_type], metrics)
+
+        client = self.clients.get(client_id)
+        if client is None:
+            client = _empty_bucket()
+            client.update({'clientName': investment.get('clientName'), 'productTypes': [], 'productNames': []})
+            self.clients[client_id] = client
+        _accumulate(client, metrics)
+        if product_type not in client['productTypes']:
+            client['productTypes'].append(product_type)
+        if name not in client['productNames']:
+            client['productNames'].append(name)
+
+        product = self.products.get(name)
+        if product is None:
+            product = _empty_bucket()
+            product.update({'productType': product_type, 'companyId': company_id, 'investorCount': 0})
+            self.products[name] = product
+            self._product_investors[name] = set()
+        _accumulate(product, metrics)
+        investors = self._product_investors[name]
+        if client_id not in investors:
+            investors.add(client_id)
+            product['investorCount'] += 1
+
+        if company_id not in self.companies:
+            self.companies[company_id] = _empty_bucket()
+        _accumulate(self.companies[company_id], metrics)
+
+    def system_summary(self):
+        """Same shape as calculateUnifiedSystemStats() in unified-statistics.js"""
+        system = self.system
+        return {
+            'totalValue': system['totalValue'],
+            'totalViableCapital': system['viableCapital'],
+            'totalInvestmentAmount': system['investmentAmount'],
+            'majorityThreshold': system['viableCapital'] * MAJORITY_RATIO,
+            'activeCount': system['activeCount'],
+            'inactiveCount': system['count'] - system['activeCount'],
+            'totalCount': system['count'],
+            'capitalSecuredByRealEstate': system['capitalSecuredByRealEstate'],
+            'capitalForRestructuring': system['capitalForRestructuring'],
+            'productTypeStats': {
+                product_type: {
+                    'count': bucket['count'],
+                    'totalValue': bucket['totalValue'],
+                    'viableCapital': bucket['viableCapital'],
+                    'investmentAmount': bucket['investmentAmount'],
+                }
+                for product_type, bucket in self.product_types.items()
+            },
+            'calculatedAt': datetime.now().isoformat(),
+            'unifiedVersion': '1.0',
+            'definitions': DEFINITIONS,
+        }
+
+    def product_summaries(self):
+        for product in self.products.values():
+            product['majorityThreshold'] = product['viableCapital'] * MAJORITY_RATIO
+        return self.products
+
+    def summaries(self):
+        return {
+            'system': self.system_summary(),
+            'clients': self.clients,
+            'products': self.product_summaries(),
+            'companies': self.companies,
+        }
+
+
+def build_summaries(results):
+    """Build {'system', 'clients', 'products', 'companies'} from extractor results"""
+    builder = CapitalSummaryBuilder()
+    for collection in INVESTMENT_COLLECTIONS:
+        for investment in results.get(collection, ()):
+            builder.add(investment)
+    return builder.summaries()
+
+
+def write_summaries(results, output_dir='.'):
+    """Write the summary_*.json artifacts and return the summaries"""
+    return save_summaries(build_summaries(results), output_dir)
+
+
+def save_summaries(summaries, output_dir='.'):
+    for key, filename in SUMMARY_FILES.items():
+        with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as file:
+            json.dump(summaries[key], file, indent=2, ensure_ascii=False)
+    return summaries
+
+
+def main():
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+
+    results = {}
+    for collection in INVESTMENT_COLLECTIONS:
+        path = os.path.join(output_dir, f"{collection}_extracted.json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                results[collection] = json.load(file)
+
+    if not results:
+        print(f"❌ No *_extracted.json files found in {output_dir}")
+        sys.exit(1)
+
+    summaries = write_summaries(results, output_dir)
+    system = summaries['system']
+    print(f"✅ Summaries written for {system['totalCount']} investments")
+    print(f"  Viable capital: {system['totalViableCapital']:,.2f}")
+    print(f"  Majority threshold: {system['majorityThreshold']:,.2f}")
+    print(f"  Clients: {len(summaries['clients'])}, products: {len(summaries['products'])}, "
+          f"companies: {len(summaries['companies'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Single-pass JSON validator and repairer for broken exports.
+
+Reads the file once, in chunks, and reports every problem with its byte
+offset, line and column. Known export defects are repaired on the fly:
+
+    bom        UTF-8 byte order mark at the start of the file
+    comma      trailing commas before } or ]
+    null       bare NULL / Null / None / undefined literals -> null
+    truncated  file ends inside a record: the partial record is dropped and
+               the top-level array/object is closed
+
+Everything else is copied byte for byte. Only the current top-level record
+is buffered (it has to be dropped if the file turns out to be truncated),
+so memory does not grow with the file size.
+
+The repairs for every known defect are pinned in test_check_json.py.
+--verify parses the repaired output with the json module.
+
+Usage:
+    python check_json.py shares_normalized.json
+    python check_json.py shares_normalized.json --fix shares_fixed.json
+    python check_json.py shares_normalized.json --in-place
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import shutil
+import sys
+from collections import Counter, namedtuple
+
+FIXES = ('bom', 'comma', 'null', 'truncated')
+
+BOM = b'\xef\xbb\xbf'
+BARE_NULLS = {b'NULL', b'Null', b'None', b'undefined'}
+LITERALS = {b'true', b'false', b'null'}
+CHUNK_SIZE = 1 << 20
+
+# Unterminated strings match up to the end of the buffer (carried over to
+# the next chunk, or reported as truncation at EOF)
+_TOKEN = re.compile(
+    rb'(?P<ws>[ \t\r\n]+)'
+    rb'|(?P<str>"(?:[^"\\]|\\.)*(?:"|\\?\Z))'
+    rb'|(?P<punct>[{}\[\]:,])'
+    rb'|(?P<num>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)'
+    rb'|(?P<ident>[A-Za-z_][A-Za-z0-9_]*)'
+    rb'|(?P<other>.)',
+    re.S,
+)
+# Fast path: a complete, valid object of scalars (the usual export record)
+# is consumed with one match instead of token by token
+_STRING = rb'"(?:[^"\\]|\\.)*"'
+_SCALAR = rb'(?:' + _STRING + rb'|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)'
+_MEMBER = _STRING + rb'[ \t\r\n]*:[ \t\r\n]*' + _SCALAR + rb'[ \t\r\n]*'
+_FLAT_OBJECT = re.compile(
+    rb'\{[ \t\r\n]*(?:' + _MEMBER + rb'(?:,[ \t\r\n]*' + _MEMBER + rb')*)?\}'
+)
+_CLOSERS = {b'{': b'}', b'[': b']'}
+
+Issue = namedtuple('Issue', 'kind offset line column fixed message')
+
+# Frame states
+_FIRST, _KEY, _COLON, _VALUE, _AFTER = range(5)
+
+
+def _chars(data):
+    return len(data.decode('utf-8', 'replace'))
+
+
+class JsonRepairer:
+    """
+    Streaming scanner: feed() bytes, then finish(). Repaired output goes to
+    `output` (any binary file-like object), problems to self.issues.
+    """
+
+    def __init__(self, output, fixes=FIXES):
+        self.output = output
+        self.fixes = frozenset(fixes)
+        self.issues = []
+
+        self._buf = b''
+        self._buf_offset = 0       # absolute offset of _buf[0]
+        self._pos = 0              # scan position in _buf
+        self._copy_from = 0        # absolute offset: input not yet moved to _pending
+        self._pending = []         # output since the last complete top-level element
+        self._held_comma = None    # absolute offset of a comma that may be trailing
+        self._lines_before = 0     # newlines before _buf_offset
+        self._lines_counted = 0    # newlines in _buf[:_counted_to]
+        self._counted_to = 0
+        self._column_base = 0      # characters of the current line before _buf_offset
+        self._stack = []           # [opening bracket, state]
+        self._top_done = False
+        self._started = False
+        self._truncated_string = None
+
+    # --- positions and issues -------------------------------------------------
+
+    def _location(self, offset):
+        index = offset - self._buf_offset
+        # Issues arrive (almost) in order: count newlines incrementally
+        if index >= self._counted_to:
+            self._lines_counted += self._buf.count(b'\n', self._counted_to, index)
+            self._counted_to = index
+            line = self._lines_before + self._lines_counted + 1
+        else:
+            line = self._lines_before + self._lines_counted - self._buf.count(b'\n', index, self._counted_to) + 1
+        newline = self._buf.rfind(b'\n', 0, index)
+        if newline >= 0:
+            column = _chars(self._buf[newline + 1:index]) + 1
+        else:
+            column = self._column_base + _chars(self._buf[:index]) + 1
+        return line, column
+
+    def _issue(self, kind, offset, fixed, message):
+        line, column = self._location(offset)
+        self.issues.append(Issue(kind, offset, line, column, fixed, message))
+
+    # --- output ---------------------------------------------------------------
+
+    def _copy_to(self, offset):
+        if offset > self._copy_from:
+            self._pending.append(self._buf[self._copy_from - self._buf_offset:offset - self._buf_offset])
+            self._copy_from = offset
+
+    def _replace(self, start, end, replacement):
+        self._copy_to(start)
+        if replacement:
+            self._pending.append(replacement)
+        self._copy_from = end
+
+    def _flush(self, offset):
+        """Everything up to `offset` is final (a complete top-level element)"""
+        self._copy_to(offset)
+        self.output.write(b''.join(self._pending))
+        self._pending = []
+
+    # --- structure ------------------------------------------------------------
+
+    def _expects_value(self):
+        if not self._stack:
+            return not self._top_done
+        bracket, state = self._stack[-1]
+        if bracket == b'[':
+            return state in (_FIRST, _VALUE)
+        return state == _VALUE
+
+    def _value_done(self, end):
+        if not self._stack:
+            self._top_done = True
+            return
+        self._stack[-1][1] = _AFTER
+        if len(self._stack) == 1:
+            self._flush(end)
+
+    def _begin_value(self, start, token):
+        if not self._expects_value():
+            if self._stack and self._stack[-1][1] == _AFTER:
+                self._issue('syntax', start, False, f"missing comma before {token[:20]!r}")
+            elif not self._stack:
+                self._issue('syntax', start, False, f"data after the top-level value: {token[:20]!r}")
+            else:
+                self._issue('syntax', start, False, f"unexpected value {token[:20]!r}")
+
+    def _token(self, kind, start, end, token):
+        stack = self._stack
+
+        comma = self._held_comma
+        if comma is not None:
+            self._held_comma = None
+            if token in (b'}', b']') and 'comma' in self.fixes:
+                self._replace(comma, comma + 1, b'')
+                self._issue('comma', comma, True, "trailing comma")
+
+        if kind == 'punct':
+            if token in _CLOSERS:
+                self._begin_value(start, token)
+                stack.append([token, _FIRST])
+                if len(stack) == 1:
+                    self._flush(end)
+            elif token in (b'}', b']'):
+                if not stack or _CLOSERS[stack[-1][0]] != token:
+                    self._issue('syntax', start, False, f"unmatched {token.decode()!r}")
+                    return
+                bracket, state = stack[-1]
+                if bracket == b'[' and state == _VALUE or bracket == b'{' and state == _KEY:
+                    if comma is not None and 'comma' not in self.fixes:
+                        self._issue('comma', comma, False, "trailing comma")
+                elif state in (_COLON, _VALUE):
+                    self._issue('syntax', start, False, "object key without value")
+                stack.pop()
+                self._value_done(end)
+            elif token == b':':
+                if stack and stack[-1][1] == _COLON:
+                    stack[-1][1] = _VALUE
+                else:
+                    self._issue('syntax', start, False, "unexpected ':'")
+            else:
+                if stack and stack[-1][1] == _AFTER:
+                    stack[-1][1] = _KEY if stack[-1][0] == b'{' else _VALUE
+                    self._held_comma = start
+                else:
+                    self._issue('syntax', start, False, "unexpected ','")
+            return
+
+        if kind == 'str':
+            if stack and stack[-1][0] == b'{' and stack[-1][1] in (_FIRST, _KEY):
+                stack[-1][1] = _COLON
+                return
+            self._begin_value(start, token)
+            self._value_done(end)
+            return
+
+        if kind == 'num':
+            self._begin_value(start, token)
+            self._value_done(end)
+            return
+
+        if kind == 'ident':
+            if token in BARE_NULLS:
+                fixed = 'null' in self.fixes
+                if fixed:
+                    self._replace(start, end, b'null')
+                self._issue('null', start, fixed, f"bare {token.decode()}")
+            elif token not in LITERALS:
+                self._issue('syntax', start, False, f"invalid literal {token[:20].decode(errors='replace')!r}")
+            self._begin_value(start, token)
+            self._value_done(end)
+            return
+
+        self._issue('syntax', start, False, f"unexpected character {token.decode(errors='replace')!r}")
+
+    # --- scanning -------------------------------------------------------------
+
+    def _scan(self, eof):
+        buf = self._buf
+        pos = self._pos
+        size = len(buf)
+        match_at = _TOKEN.match
+        match_flat = _FLAT_OBJECT.match
+        while pos < size:
+            if buf[pos] == 0x7b and self._expects_value():
+                match = match_flat(buf, pos)
+                if match is not None and (match.end() < size or eof):
+                    self._held_comma = None
+                    pos = match.end()
+                    self._value_done(self._buf_offset + pos)
+                    continue
+            match = match_at(buf, pos)
+            end = match.end()
+            if end == size and not eof:
+                break
+            kind = match.lastgroup
+            if kind != 'ws':
+                token = match.group()
+                if kind == 'str' and eof and end == size and not _is_closed_string(token):
+                    self._truncated_string = self._buf_offset + pos
+                else:
+                    self._token(kind, self._buf_offset + pos, self._buf_offset + end, token)
+            pos = end
+        self._pos = pos
+
+    def _trim(self):
+        """Drop consumed input, keeping what is still needed for output"""
+        keep = self._pos
+        if self._held_comma is not None:
+            keep = min(keep, self._held_comma - self._buf_offset)
+        self._copy_to(self._buf_offset + keep)
+        consumed = self._buf[:keep]
+        newline = consumed.rfind(b'\n')
+        if newline >= 0:
+            self._column_base = _chars(consumed[newline + 1:])
+        else:
+            self._column_base += _chars(consumed)
+        self._lines_before += consumed.count(b'\n')
+        self._lines_counted = 0
+        self._counted_to = 0
+        self._buf = self._buf[keep:]
+        self._buf_offset += keep
+        self._pos -= keep
+
+    def feed(self, data):
+        if not self._started:
+            self._buf += data
+            if len(self._buf) < len(BOM) and BOM.startswith(self._buf):
+                return
+            self._started = True
+            if self._buf.startswith(BOM):
+                if 'bom' in self.fixes:
+                    self._copy_from = len(BOM)
+                self._issue('bom', 0, 'bom' in self.fixes, "UTF-8 byte order mark")
+                self._pos = len(BOM)
+                # The BOM decodes to one character; columns start after it
+                self._column_base = -1
+        else:
+            self._buf += data
+        self._scan(eof=False)
+        self._trim()
+
+    def finish(self):
+        """Process the rest of the input and write the remaining output"""
+        self._started = True
+        self._scan(eof=True)
+        end = self._buf_offset + len(self._buf)
+
+        if self._truncated_string is not None:
+            self._issue('truncated', self._truncated_string, 'truncated' in self.fixes and bool(self._stack),
+                        "unterminated string")
+
+        if self._stack:
+            fixed = 'truncated' in self.fixes
+            self._issue('truncated', end, fixed,
+                        f"unexpected end of file inside {len(self._stack)} open bracket(s)")
+            if fixed:
+                self._pending = [b'\n', _CLOSERS[self._stack[0][0]]]
+                self._copy_from = end
+                self._stack = []
+        elif not self._top_done:
+            self._issue('syntax', end, False, "no JSON value")
+
+        self._flush(end)
+        self._buf = b''
+        return self.issues
+
+
+def _escaped_quote(token):
+    """True when the final quote of `token` is escaped (odd run of backslashes)"""
+    backslashes = len(token) - 1 - len(token[:-1].rstrip(b'\\'))
+    return backslashes % 2 == 1
+
+
+def _is_closed_string(token):
+    return len(token) >= 2 and token.endswith(b'"') and not _escaped_quote(token)
+
+
+def repair_stream(source, output, fixes=FIXES, chunk_size=CHUNK_SIZE):
+    """Repair a binary stream into `output` in one pass; returns the issues"""
+    repairer = JsonRepairer(output, fixes)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        repairer.feed(chunk)
+    return repairer.finish()
+
+
+def repair_bytes(data, fixes=FIXES, chunk_size=CHUNK_SIZE):
+    """Returns (repaired bytes, issues)"""
+    output = io.BytesIO()
+    issues = repair_stream(io.BytesIO(data), output, fixes, chunk_size)
+    return output.getvalue(), issues
+
+
+def context(data, offset, width=40):
+    """Text around a byte offset, for error messages"""
+    start = max(offset - width, 0)
+    return data[start:offset + width].decode('utf-8', 'replace')
+
+
+class _NullOutput:
+    def write(self, data):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate and repair a JSON export in one pass')
+    parser.add_argument('file')
+    parser.add_argument('--fix', metavar='OUTPUT', help='Write the repaired JSON to OUTPUT')
+    parser.add_argument('--in-place', action='store_true',
+                        help='Repair the file in place (keeps FILE.backup_check_json)')
+    parser.add_argument('--report', metavar='PATH', help='Write all issues to a JSON report')
+    parser.add_argument('--verify', action='store_true',
+                        help='Check that the output parses as JSON (reads it into memory)')
+    parser.add_argument('--show', type=int, default=20, help='Number of issues to print (default: 20)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ Error: {args.file} not found")
+        sys.exit(1)
+
+    target = args.fix
+    if args.in_place:
+        target = args.file + '.tmp_check_json'
+
+    with open(args.file, 'rb') as source:
+        if target:
+            with open(target, 'wb') as output:
+                issues = repair_stream(source, output)
+        else:
+            issues = repair_stream(source, _NullOutput())
+
+    counts = Counter(issue.kind for issue in issues)
+    unfixed = [issue for issue in issues if not issue.fixed]
+    if not issues:
+        print(f"✅ {args.file}: valid JSON")
+    else:
+        print(f"⚠️ {args.file}: {len(issues)} issue(s), {len(issues) - len(unfixed)} fixable")
+        for kind, count in counts.most_common():
+            print(f"  {kind}: {count}")
+        for issue in issues[:args.show]:
+            mark = '🔧' if issue.fixed else '❌'
+            print(f"  {mark} byte {issue.offset}, line {issue.line}, column {issue.column}: {issue.message}")
+        if len(issues) > args.show:
+            print(f"  ... {len(issues) - args.show} more")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            json.dump({
+                'file': args.file,
+                'counts': dict(counts),
+                'issues': [issue._asdict() for issue in issues],
+            }, file, indent=2, ensure_ascii=False)
+        print(f"📄 Report: {args.report}")
+
+    if target:
+        if args.verify:
+            with open(target, 'rb') as file:
+                try:
+                    json.loads(file.read())
+                except ValueError as e:
+                    print(f"❌ Repaired output is not valid JSON: {e}")
+                    sys.exit(2)
+            print("✅ Repaired output parses as JSON")
+
+        if args.in_place:
+            if issues:
+                shutil.copy2(args.file, args.file + '.backup_check_json')
+                os.replace(target, args.file)
+                print(f"💾 {args.file} repaired (backup: {args.file}.backup_check_json)")
+            else:
+                os.remove(target)
+        else:
+            print(f"💾 Repaired JSON written to {target}")
+
+    sys.exit(1 if unfixed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Indexed client deduplication with normalized-name blocking.
+
+Names are normalized once (case, Polish diacritics, punctuation, company
+suffixes such as "Sp. z o.o." / "S.A.") and clients with the same
+normalized key are merged automatically. Employee and blocklist entries are
+filtered with a single compiled multi-pattern matcher instead of testing
+every indicator against every record.
+
+Likely duplicates that are not exact after normalization (swapped first and
+last name, typos) are found through blocking keys: only clients sharing a
+block are compared, so the stage stays near-linear as the client base
+grows. They are reported for review in client_dedup_report.json rather
+than merged, since two real people can have very similar names.
+
+When a client absorbs another ID_Klient, ClientDeduplicator.aliases maps
+that ID to the first ID of the client. The extraction engine uses it to
+rewrite clientId on the investments, so no investment points at an ID
+that has no client document.
+"""
+
+import json
+import os
+import re
+import sys
+import unicodedata
+from difflib import SequenceMatcher
+
+# Employee-like entries that must not be extracted as clients
+EMPLOYEE_INDICATORS = [
+    "Michał Ostrowski", "Ewelina Morzywołek", "Damian Kijowski",
+    "MISA", "Metropolitan", "Biuro", "Oddział", "Opiekun"
+]
+
+REPORT_FILE = 'client_dedup_report.json'
+
+# Candidates need at least this similarity of their sorted-token names
+SIMILARITY_THRESHOLD = 0.9
+# Blocks larger than this are not compared pairwise (keeps the stage near-linear)
+MAX_BLOCK_SIZE = 50
+
+_POLISH = str.maketrans('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ', 'acelnoszzACELNOSZZ')
+# Applied to folded text (see _fold), hence no diacritics. The suffix must
+# follow a separator, or "Kosa" / "Rusa" would lose their "sa"
+_COMPANY_SUFFIX = re.compile(
+    r'(?:^|[\s,]+)(?:'
+    r'sp\.?\s*z\s*o\.?\s*o\.?'
+    r'|spolka\s+z\s+ograniczona\s+odpowiedzialnoscia'
+    r'|spolka\s+akcyjna|spolka\s+komandytowa|spolka\s+jawna|spolka\s+cywilna'
+    r'|sp\.?\s*k\.?(?:\s*a\.?)?|sp\.?\s*j\.?|s\.?\s*a\.?|s\.?\s*c\.?'
+    r')\s*$'
+)
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def _fold(name):
+    """Casefold and strip diacritics (including ł, which NFKD keeps)"""
+    text = unicodedata.normalize('NFKC', name).casefold().translate(_POLISH)
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _tokens(folded):
+    return _NON_ALNUM.sub(' ', folded).split()
+
+
+def normalize_name(name):
+    """
+    Matching key for a client name: casefolded, without diacritics,
+    punctuation or trailing company suffixes.
+
+    "ABC Sp. z o.o." and "abc sp.z o.o" both become "abc". A suffix has to
+    be a separate word ("Joanna Kosa" stays "joanna kosa") and a one-word
+    name is never stripped.
+    """
+    folded = _fold(name).strip()
+    while len(_tokens(folded)) > 1:
+        stripped = _COMPANY_SUFFIX.sub('', folded)
+        if stripped == folded or not stripped:
+            break
+        folded = stripped
+    return ' '.join(_tokens(folded))
+
+
+class PatternMatcher:
+    """One compiled regex matching any of the patterns as whole words,
+    insensitive to case and Polish diacritics"""
+
+    def __init__(self, patterns):
+        keys = sorted({' '.join(_tokens(_fold(pattern))) for pattern in patterns if pattern.strip()},
+                      key=len, reverse=True)
+        self.patterns = keys
+        if keys:
+            alternation = '|'.join(re.escape(key).replace(r'\ ', r'\s+') for key in keys)
+            self._regex = re.compile(rf'\b(?:{alternation})\b')
+        else:
+            self._regex = None
+
+    def search(self, name):
+        """Return the matched pattern (normalized) or None"""
+        if self._regex is None:
+            return None
+        match = self._regex.search(' '.join(_tokens(_fold(name))))
+        return match.group(0) if match else None
+
+
+def blocking_keys(key):
+    """
+    Blocking keys for a normalized name: the sorted tokens (catches swapped
+    first/last names) and the longest token's prefix plus the initials of
+    the other tokens (catches typos later in the name).
+    """
+    tokens = key.split()
+    if not tokens:
+        return ()
+    longest = max(range(len(tokens)), key=lambda index: len(tokens[index]))
+    others = sorted(token[0] for index, token in enumerate(tokens) if index != longest)
+    return ('s:' + ' '.join(sorted(tokens)), f"p:{tokens[longest][:4]}|{''.join(others)}")
+
+
+class ClientDeduplicator:
+    """
+    Online deduplication used by the extraction engine.
+
+    add() returns the canonical entry for a client name (creating it on
+    first sight) or None when the name is empty or blocklisted. aliases
+    maps every ID merged into another client to that client's first ID;
+    an ID that is also the first ID of a client of its own is never an
+    alias.
+    """
+
+    def __init__(self, blocklist=()):
+        self.matcher = PatternMatcher(list(EMPLOYEE_INDICATORS) + list(blocklist))
+        self.by_key = {}
+        self.entries = []
+        self.excluded = 0
+        self.aliases = {}
+        self._first_ids = set()
+
+    def add(self, client_name, client_id):
+        """Return (entry, is_new) or (None, False) for excluded names"""
+        if not client_name or client_name == "NULL":
+            return None, False
+        if self.matcher.search(client_name):
+            self.excluded += 1
+            return None, False
+
+        key = normalize_name(client_name)
+        entry = self.by_key.get(key)
+        if entry is not None:
+            if client_name not in entry['names']:
+                entry['names'].append(client_name)
+            if client_id and client_id not in entry['ids']:
+                entry['ids'].append(client_id)
+                self._add_id(entry, client_id)
+            return entry, False
+
+        entry = {'key': key, 'names': [client_name], 'ids': [client_id] if client_id else []}
+        self.by_key[key] = entry
+        self.entries.append(entry)
+        if client_id:
+            self._add_id(entry, client_id)
+        return entry, True
+
+    def _add_id(self, entry, client_id):
+        if entry['ids'][0] == client_id:
+            self._first_ids.add(client_id)
+            self.aliases.pop(client_id, None)
+        elif client_id not in self._first_ids:
+            self.aliases[client_id] = entry['ids'][0]
+
+    def resolve_id(self, client_id):
+        """The ID of the client `client_id` was merged into, else client_id itself"""
+        return self.aliases.get(client_id, client_id)
+
+    def merged(self):
+        """Entries that absorbed name variants or additional client IDs"""
+        return [entry for entry in self.entries if len(entry['names']) > 1 or len(entry['ids']) > 1]
+
+    def candidates(self, threshold=SIMILARITY_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+        """Likely duplicates found through blocking keys, best match first"""
+        blocks = {}
+        for index, entry in enumerate(self.entries):
+            for block in blocking_keys(entry['key']):
+                blocks.setdefault(block, []).append(index)
+
+        seen_pairs = set()
+        found = []
+        for block, members in blocks.items():
+            if len(members) < 2 or len(members) > max_block_size:
+                continue
+            for i, left in enumerate(members):
+                for right in members[i + 1:]:
+                    if (left, right) in seen_pairs:
+                        continue
+                    seen_pairs.add((left, right))
+                    a = self.entries[left]
+                    b = self.entries[right]
+                    sorted_a = ' '.join(sorted(a['key'].split()))
+                    sorted_b = ' '.join(sorted(b['key'].split()))
+                    score = SequenceMatcher(None, sorted_a, sorted_b).ratio()
+                    if score >= threshold:
+                        found.append({
+                            'names': [a['names'][0], b['names'][0]],
+                            'ids': [next(iter(a['ids']), None), next(iter(b['ids']), None)],
+                            'score': round(score, 4),
+                            'reason': 'token order' if sorted_a == sorted_b else 'similar name',
+                        })
+        found.sort(key=lambda candidate: -candidate['score'])
+        return found
+
+    def report(self):
+        return {
+            'excludedRecords': self.excluded,
+            'uniqueClients': len(self.entries),
+            'merged': [
+                {'canonicalName': entry['names'][0], 'names': entry['names'], 'ids': entry['ids']}
+                for entry in self.merged()
+            ],
+            'candidates': self.candidates(),
+        }
+
+
+def write_report(deduplicator, output_dir='.'):
+    report = deduplicator.report()
+    with open(os.path.join(output_dir, REPORT_FILE), 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    return report
+
+
+def main():
+    from json_stream import iter_records
+
+    source_file = sys.argv[1] if len(sys.argv) > 1 else 'tableConvert.com_n0b2g7.json'
+    deduplicator = ClientDeduplicator()
+    for record in iter_records(source_file):
+        name = str(record.get('Klient') or '').strip()
+        deduplicator.add(name, str(record.get('ID_Klient') or '').strip())
+
+    report = write_report(deduplicator)
+    print(f"✅ {report['uniqueClients']} unique clients, {report['excludedRecords']} excluded records")
+    print(f"🔗 {len(report['merged'])} merged, {len(report['candidates'])} candidates for review in {REPORT_FILE}")
+
+
+if __name__ == '__main__':
+    main()
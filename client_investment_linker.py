@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Hash-join linker producing clients_with_investments.json in one pass.
+
+Builds hash indexes over the extracted clients (ID_Klient, merged IDs and
+normalized name) and joins the bond, share, loan and apartment outputs to
+them in O(clients + investments). The nested client documents are streamed
+to disk one at a time. Investments without a matching client and clients
+without investments are listed in client_investment_link_report.json.
+
+Inside the extraction engine, InvestmentLinker receives the investments
+through run_extraction's consumers, which saves re-reading the output
+files. It still holds every investment in memory and links nothing
+until the extraction has finished, because a later source row can merge
+an ID into an earlier client.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+from client_dedup import normalize_name
+from field_mapping import INVESTMENT_COLLECTIONS
+from json_writers import write_json_array
+
+OUTPUT_FILE = 'clients_with_investments.json'
+REPORT_FILE = 'client_investment_link_report.json'
+
+
+def _product_name(investment):
+    return investment.get('productName') or investment.get('projectName')
+
+
+def _realized_capital(investment):
+    realized = investment.get('realizedCapital')
+    if realized is None:
+        realized = (investment.get('additionalInfo') or {}).get('realizedCapital')
+    return realized or 0.0
+
+
+class ClientIndex:
+    """Hash indexes over clients: by ID (incl. merged IDs) and by normalized name"""
+
+    def __init__(self, clients):
+        self.by_id = {}
+        self.by_name = {}
+        for position, client in enumerate(clients):
+            additional_info = client.get('additionalInfo') or {}
+            ids = [client.get('id'), client.get('excelId')] + list(additional_info.get('mergedClientIds', ()))
+            for client_id in ids:
+                if client_id:
+                    self.by_id.setdefault(str(client_id), position)
+            for name in [client.get('fullName') or client.get('name')] + list(additional_info.get('nameVariants', ())):
+                if name:
+                    self.by_name.setdefault(normalize_name(name), position)
+
+    def lookup(self, investment):
+        """Return (client position, match type) or (None, None)"""
+        client_id = investment.get('clientId')
+        if client_id not in (None, '', 'NULL'):
+            position = self.by_id.get(str(client_id))
+            if position is not None:
+                return position, 'by_id'
+        name = investment.get('clientName')
+        if name:
+            position = self.by_name.get(normalize_name(name))
+            if position is not None:
+                return position, 'by_name'
+        return None, None
+
+
+def link(clients, investments_by_collection):
+    """
+    Join investments to clients.
+
+    Returns (groups, orphans, match_counts): groups[i] lists the investments
+    of clients[i] in collection order, orphans the unmatched investments.
+    """
+    index = ClientIndex(clients)
+    groups = [[] for _ in clients]
+    orphans = []
+    match_counts = {'by_id': 0, 'by_name': 0}
+
+    for collection in INVESTMENT_COLLECTIONS:
+        for investment in investments_by_collection.get(collection, ()):
+            position, match_type = index.lookup(investment)
+            if position is None:
+                orphans.append(investment)
+                continue
+            match_counts[match_type] += 1
+            groups[position].append(investment)
+
+    return groups, orphans, match_counts
+
+
+def investment_summary(investments):
+    """Same block as investment_summary in the existing clients_with_investments.json"""
+    product_types = []
+    product_names = []
+    for investment in investments:
+        product_type = investment.get('productType')
+        if product_type and product_type not in product_types:
+            product_types.append(product_type)
+        name = _product_name(investment)
+        if name and name not in product_names:
+            product_names.append(name)
+
+    return {
+        'total_investments': len(investments),
+        'total_investment_amount': sum(investment.get('investmentAmount') or 0.0 for investment in investments),
+        'total_realized_capital': sum(_realized_capital(investment) for investment in investments),
+        'total_remaining_capital': sum(investment.get('remainingCapital') or 0.0 for investment in investments),
+        'product_types': product_types,
+        'product_names': product_names,
+        'has_investments': bool(investments),
+    }
+
+
+def iter_client_documents(clients, groups):
+    for client, investments in zip(clients, groups):
+        document = dict(client)
+        document['investment_summary'] = investment_summary(investments)
+        document['investments'] = investments
+        yield document
+
+
+def link_and_write(clients, investments_by_collection, output_dir='.'):
+    """Link, stream clients_with_investments.json and write the report"""
+    groups, orphans, match_counts = link(clients, investments_by_collection)
+
+    write_json_array(iter_client_documents(clients, groups), os.path.join(output_dir, OUTPUT_FILE))
+
+    without_investments = [
+        {'id': client.get('id'), 'name': client.get('fullName')}
+        for client, investments in zip(clients, groups) if not investments
+    ]
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'statistics': {
+            'totalClients': len(clients),
+            'totalInvestments': sum(len(group) for group in groups) + len(orphans),
+            'linkedById': match_counts['by_id'],
+            'linkedByName': match_counts['by_name'],
+            'orphanedInvestments': len(orphans),
+            'clientsWithoutInvestments': len(without_investments),
+        },
+        'orphanedInvestments': [
+            {'id': investment.get('id'), 'clientId': investment.get('clientId'),
+             'clientName': investment.get('clientName'), 'productType': investment.get('productType')}
+            for investment in orphans
+        ],
+        'clientsWithoutInvestments': without_investments,
+    }
+    with open(os.path.join(output_dir, REPORT_FILE), 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    return report
+
+
+class InvestmentLinker:
+    """
+    Consumer for run_extraction(consumers=...): buffers every investment as
+    it is extracted; link_and_write() joins them once the clients are
+    complete (a later source row can still merge IDs into an earlier
+    client).
+    """
+
+    def __init__(self):
+        self.investments_by_collection = {collection: [] for collection in INVESTMENT_COLLECTIONS}
+
+    def __call__(self, collection, investment):
+        investments = self.investments_by_collection.get(collection)
+        if investments is not None:
+            investments.append(investment)
+
+    def link_and_write(self, clients, output_dir='.'):
+        return link_and_write(clients, self.investments_by_collection, output_dir)
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def main():
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+
+    clients_path = os.path.join(output_dir, 'clients_extracted.json')
+    if not os.path.exists(clients_path):
+        print(f"❌ Error: {clients_path} not found")
+        sys.exit(1)
+
+    clients = _load(clients_path)
+    investments = {}
+    for collection in INVESTMENT_COLLECTIONS:
+        path = os.path.join(output_dir, f"{collection}_extracted.json")
+        if os.path.exists(path):
+            investments[collection] = _load(path)
+
+    print(f"🔗 Linking {len(clients)} clients with {sum(map(len, investments.values()))} investments...")
+    statistics = link_and_write(clients, investments, output_dir)['statistics']
+    print(f"✅ {OUTPUT_FILE} written")
+    print(f"  Linked by ID: {statistics['linkedById']}, by name: {statistics['linkedByName']}")
+    print(f"  ⚠️ Orphaned investments: {statistics['orphanedInvestments']}")
+    print(f"  ⚠️ Clients without investments: {statistics['clientsWithoutInvestments']}")
+
+
+if __name__ == '__main__':
+    main()
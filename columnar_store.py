@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Compact binary columnar format for extractor output (*.icol).
+
+Written alongside the indented *_extracted.json files. Every field becomes
+a typed column and all text shares one string dictionary, so a file is a
+fraction of the JSON size and a reader can mmap it and touch only the
+columns it needs, without parsing the rest.
+
+Layout (little-endian, every block 8-byte aligned):
+
+    magic      b'ICOL\\x00\\x01\\x00\\x00'
+    u64        header length
+    header     UTF-8 JSON: rows, column list (name, type, block offsets),
+               string dictionary offsets
+    blocks     column data / null masks / dictionary
+
+Column types:
+    f8    float64 values + u8 null mask
+    i8    int64 values + u8 null mask
+    bool  u8 values (0/1, 2 = null)
+    str   u32 codes into the string dictionary (0xFFFFFFFF = null)
+    json  like str, but the dictionary entry is the JSON encoding of the
+          value (nested dicts such as additionalInfo, lists, mixed types)
+    null  no data, every value is None
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b'ICOL\x00\x01\x00\x00'
+NULL_CODE = 0xFFFFFFFF
+_ALIGN = 8
+
+if sys.byteorder != 'little':  # pragma: no cover - all our machines are little-endian
+    raise ImportError('columnar_store requires a little-endian platform')
+
+
+def _infer_type(values):
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kinds.add('bool')
+        elif isinstance(value, int):
+            kinds.add('int')
+        elif isinstance(value, float):
+            kinds.add('float')
+        elif isinstance(value, str):
+            kinds.add('str')
+        else:
+            return 'json'
+
+    if not kinds:
+        return 'null'
+    if kinds == {'bool'}:
+        return 'bool'
+    if kinds == {'int'}:
+        return 'i8'
+    if kinds <= {'int', 'float'}:
+        return 'f8'
+    if kinds == {'str'}:
+        return 'str'
+    return 'json'
+
+
+class _StringDictionary:
+    def __init__(self):
+        self.codes = {}
+        self.strings = []
+
+    def code(self, text):
+        code = self.codes.get(text)
+        if code is None:
+            code = len(self.strings)
+            self.codes[text] = code
+            self.strings.append(text)
+        return code
+
+
+class _BlockWriter:
+    def __init__(self):
+        self.blocks = []
+        self.size = 0
+
+    def add(self, data):
+        """Append a block and return (offset relative to data start, length)"""
+        data = bytes(data)
+        offset = self.size
+        padding = -len(data) % _ALIGN
+        self.blocks.append(data + b'\x00' * padding)
+        self.size += len(data) + padding
+        return offset, len(data)
+
+
+def write_columnar(records, path):
+    """Write a list of flat-ish dicts (extractor output) as a .icol file"""
+    names = []
+    seen = set()
+    for record in records:
+        for name in record:
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+
+    dictionary = _StringDictionary()
+    blocks = _BlockWriter()
+    columns = []
+
+    for name in names:
+        values = [record.get(name) for record in records]
+        column_type = _infer_type(values)
+        column = {'name': name, 'type': column_type}
+
+        if column_type in ('f8', 'i8'):
+            typecode = 'd' if column_type == 'f8' else 'q'
+            default = 0.0 if column_type == 'f8' else 0
+            data = array(typecode, (default if value is None else value for value in values))
+            nulls = bytes(1 if value is None else 0 for value in values)
+            column['data'] = blocks.add(data.tobytes())
+            column['nulls'] = blocks.add(nulls)
+        elif column_type == 'bool':
+            column['data'] = blocks.add(bytes(2 if value is None else int(value) for value in values))
+        elif column_type in ('str', 'json'):
+            codes = array('I')
+            for value in values:
+                if value is None:
+                    codes.append(NULL_CODE)
+                elif column_type == 'str':
+                    codes.append(dictionary.code(value))
+                else:
+                    codes.append(dictionary.code(json.dumps(value, ensure_ascii=False)))
+            column['data'] = blocks.add(codes.tobytes())
+
+        columns.append(column)
+
+    encoded = [text.encode('utf-8') for text in dictionary.strings]
+    offsets = array('Q', [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    dictionary_offsets = blocks.add(offsets.tobytes())
+    dictionary_blob = blocks.add(b''.join(encoded))
+
+    header = json.dumps({
+        'rows': len(records),
+        'columns': columns,
+        'dictionary': {'count': len(encoded), 'offsets': dictionary_offsets, 'blob': dictionary_blob},
+    }, ensure_ascii=False).encode('utf-8')
+    header += b' ' * (-(len(MAGIC) + 8 + len(header)) % _ALIGN)
+
+    with open(path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<Q', len(header)))
+        file.write(header)
+        for block in blocks.blocks:
+            file.write(block)
+    return path
+
+
+class ColumnarFile:
+    """
+    Memory-mapped reader for .icol files.
+
+    Opening only parses the header; column data is read on demand
+    straight from the mapping. Use as a context manager or call close().
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an .icol file")
+
+        (header_length,) = struct.unpack_from('<Q', self._map, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._map[header_start:header_start + header_length])
+
+        self._data_start = header_start + header_length
+        self._view = memoryview(self._map)
+        self.rows = header['rows']
+        self._columns = {column['name']: column for column in header['columns']}
+        self.column_names = [column['name'] for column in header['columns']]
+
+        dictionary = header['dictionary']
+        self._dictionary_offsets = self._block(dictionary['offsets']).cast('Q')
+        self._dictionary_blob = self._block(dictionary['blob'])
+        self._strings = {}
+
+    def _block(self, location):
+        offset, length = location
+        start = self._data_start + offset
+        return self._view[start:start + length]
+
+    def close(self):
+        if getattr(self, '_view', None) is not None:
+            self._dictionary_offsets.release()
+            self._dictionary_blob.release()
+            self._view.release()
+            self._view = None
+        if getattr(self, '_map', None) is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A caller still holds a raw() view; the mapping is freed with it
+                pass
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column_type(self, name):
+        return self._columns[name]['type']
+
+    def raw(self, name):
+        """
+        Zero-copy memoryview of a column's data: float64 ('d') / int64 ('q')
+        values, u8 for bool, u32 dictionary codes for str/json.
+        """
+        column = self._columns[name]
+        typecode = {'f8': 'd', 'i8': 'q', 'bool': 'B', 'str': 'I', 'json': 'I'}.get(column['type'])
+        if typecode is None:
+            return None
+        return self._block(column['data']).cast(typecode)
+
+    def nulls(self, name):
+        """u8 null mask for numeric columns (1 = null)"""
+        column = self._columns[name]
+        if 'nulls' not in column:
+            return None
+        return self._block(column['nulls'])
+
+    def string(self, code):
+        """Decode one dictionary entry (cached)"""
+        text = self._strings.get(code)
+        if text is None:
+            start = self._dictionary_offsets[code]
+            end = self._dictionary_offsets[code + 1]
+            text = bytes(self._dictionary_blob[start:end]).decode('utf-8')
+            self._strings[code] = text
+        return text
+
+    def values(self, name):
+        """Decode a column into a list of Python values"""
+        column_type = self.column_type(name)
+        if column_type == 'null':
+            return [None] * self.rows
+
+        data = self.raw(name)
+        if column_type in ('f8', 'i8'):
+            nulls = self.nulls(name)
+            return [None if null else value for value, null in zip(data.tolist(), nulls.tolist())]
+        if column_type == 'bool':
+            return [None if value == 2 else bool(value) for value in data.tolist()]
+
+        string = self.string
+        if column_type == 'str':
+            return [None if code == NULL_CODE else string(code) for code in data.tolist()]
+        # json: decoded per row so nested values are never shared between records
+        return [None if code == NULL_CODE else json.loads(string(code)) for code in data.tolist()]
+
+    def to_records(self, columns=None):
+        """Rebuild record dicts for the requested columns (default: all)"""
+        names = self.column_names if columns is None else list(columns)
+        decoded = [self.values(name) for name in names]
+        return [dict(zip(names, row)) for row in zip(*decoded)] if names else [{} for _ in range(self.rows)]
+
+
+def read_columnar(path, columns=None):
+    """Convenience: load records (or a subset of columns) from a .icol file"""
+    with ColumnarFile(path) as file:
+        return file.to_records(columns)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python columnar_store.py <file.json|file.icol> [column ...]")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as file:
+            records = json.load(file)
+        output = path[:-len('.json')] + '.icol'
+        write_columnar(records, output)
+        print(f"✅ {len(records)} records written to {output}")
+        return
+
+    with ColumnarFile(path) as file:
+        print(f"📦 {path}: {file.rows} rows")
+        for name in sys.argv[2:] or file.column_names:
+            print(f"  {name} ({file.column_type(name)})")
+
+
+if __name__ == '__main__':
+    main()
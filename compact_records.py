@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory record types for extracted investments.
+
+A transformed record used to be a fresh dict of ~30 keys plus a nested
+additionalInfo dict. record_type() instead generates a class with
+__slots__ for one fixed layout: values sit in the instance itself, the key
+names live once on the class, and additionalInfo is stored flattened in
+the same instance, so a record is one GC-tracked object instead of two.
+
+Low-cardinality values (branch, advisor, productName, statuses, dates...)
+go through CategoryPool, so all records share one string object per
+distinct value. In CPython a pointer to a shared string costs the same
+8 bytes as a dictionary code would, without a decode step on access.
+
+Records behave like read-mostly mappings (record['id'], .get(), .items(),
+iteration over keys, record['id'] = ...), so consumers written for dicts
+keep working. They become plain dicts only when serialized: to_dict(), or
+plain() as the json `default=` hook, which produces byte-identical JSON.
+"""
+
+import re
+import sys
+
+_TYPES = {}
+
+
+class CategoryPool(dict):
+    """value -> the one shared instance of that value (pool[value])"""
+
+    def __missing__(self, value):
+        self[value] = value
+        return value
+
+
+CATEGORIES = CategoryPool()
+
+
+def intern_category(value):
+    return CATEGORIES[value]
+
+
+def _restore(name, values):
+    return _TYPES[name](*values)
+
+
+class CompactRecord:
+    """Base class of the generated record types (see record_type)"""
+
+    __slots__ = ()
+    # Output layout: ((key, slot or None, ((sub key, slot), ...) or None), ...)
+    _layout = ()
+    _slot_by_key = {}
+    _nested = {}
+
+    def to_dict(self):
+        raise NotImplementedError
+
+    def values_tuple(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __getitem__(self, key):
+        slot = self._slot_by_key.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        nested = self._nested.get(key)
+        if nested is not None:
+            return {sub_key: getattr(self, sub_slot) for sub_key, sub_slot in nested}
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = self._slot_by_key.get(key)
+        if slot is not None:
+            setattr(self, slot, value)
+        elif key in self._nested:
+            for sub_key, sub_slot in self._nested[key]:
+                setattr(self, sub_slot, value.get(sub_key))
+        else:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+
+    def get(self, key, default=None):
+        slot = self._slot_by_key.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        if key in self._nested:
+            return self[key]
+        return default
+
+    def __contains__(self, key):
+        return key in self._slot_by_key or key in self._nested
+
+    def __iter__(self):
+        return (key for key, _, _ in self._layout)
+
+    def __len__(self):
+        return len(self._layout)
+
+    def keys(self):
+        return [key for key, _, _ in self._layout]
+
+    def values(self):
+        return [self[key] for key, _, _ in self._layout]
+
+    def items(self):
+        return [(key, self[key]) for key, _, _ in self._layout]
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.values_tuple() == other.values_tuple()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return _restore, (type(self).__name__, self.values_tuple())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def _slot_name(key, taken):
+    slot = re.sub(r'\W', '_', key)
+    if not slot.isidentifier():
+        slot = '_' + slot
+    while slot in taken or slot in dir(CompactRecord):
+        slot += '_'
+    taken.add(slot)
+    return slot
+
+
+def record_type(name, fields):
+    """
+    Generate (or reuse) the record class `name` for a layout.
+
+    `fields` lists (key, None) for plain fields and (key, [sub keys]) for
+    nested dicts such as additionalInfo, in output order. The constructor
+    takes every value positionally in that order, sub keys inlined.
+    """
+    fields = tuple((key, tuple(sub_keys) if sub_keys is not None else None) for key, sub_keys in fields)
+    existing = _TYPES.get(name)
+    if existing is not None:
+        if existing._fields != fields:
+            raise ValueError(f"Record type {name} already exists with a different layout")
+        return existing
+
+    taken = set()
+    slots = []
+    layout = []
+    for key, sub_keys in fields:
+        if sub_keys is None:
+            slot = _slot_name(key, taken)
+            slots.append(slot)
+            layout.append((key, slot, None))
+        else:
+            nested = tuple((sub_key, _slot_name(f"{key}_{sub_key}", taken)) for sub_key in sub_keys)
+            slots.extend(slot for _, slot in nested)
+            layout.append((key, None, nested))
+
+    def entry(key, slot, nested):
+        if nested is None:
+            return f"{key!r}: self.{slot}"
+        return f"{key!r}: {{{', '.join(f'{sub_key!r}: self.{sub_slot}' for sub_key, sub_slot in nested)}}}"
+
+    source = (
+        f"def __init__(self, {', '.join(slots)}):\n"
+        + ''.join(f"    self.{slot} = {slot}\n" for slot in slots)
+        + ("    pass\n" if not slots else '')
+        + "\n"
+        f"def to_dict(self):\n"
+        f"    return {{{', '.join(entry(*item) for item in layout)}}}\n"
+    )
+    namespace = {}
+    exec(compile(source, f"<compact_records:{name}>", 'exec'), namespace)
+
+    cls = type(name, (CompactRecord,), {
+        '__slots__': tuple(slots),
+        '__init__': namespace['__init__'],
+        'to_dict': namespace['to_dict'],
+        '__module__': __name__,
+        '_fields': fields,
+        '_layout': tuple(layout),
+        '_slot_by_key': {key: slot for key, slot, nested in layout if nested is None},
+        '_nested': {key: nested for key, _, nested in layout if nested is not None},
+    })
+    cls.__source__ = source
+    _TYPES[name] = cls
+    return cls
+
+
+def from_dict(record, categorical=()):
+    """
+    Compact copy of a plain record (e.g. one loaded from *_extracted.json).
+
+    Values of the `categorical` keys (top-level and nested) are pooled.
+    Records with the same keys share one generated type.
+    """
+    fields = []
+    values = []
+    for key, value in record.items():
+        if isinstance(value, dict):
+            fields.append((key, tuple(value)))
+            values.extend(CATEGORIES[sub_value] if sub_key in categorical and isinstance(sub_value, str)
+                          else sub_value for sub_key, sub_value in value.items())
+        else:
+            fields.append((key, None))
+            values.append(CATEGORIES[value] if key in categorical and isinstance(value, str) else value)
+    signature = tuple((key, tuple(sub_keys) if sub_keys is not None else None) for key, sub_keys in fields)
+    cls = _LOADED_TYPES.get(signature)
+    if cls is None:
+        cls = _LOADED_TYPES[signature] = record_type(f"LoadedRecord{len(_LOADED_TYPES)}", signature)
+    return cls(*values)
+
+
+_LOADED_TYPES = {}
+
+
+def as_dict(record):
+    """Plain dict for a compact record; anything else is returned unchanged"""
+    return record.to_dict() if isinstance(record, CompactRecord) else record
+
+
+def plain(value):
+    """json `default=` hook: serializes compact records as their dict"""
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def main():
+    import json
+    import tracemalloc
+
+    from json_stream import iter_records
+
+    if len(sys.argv) < 2:
+        print("Usage: python compact_records.py <name>_extracted.json")
+        sys.exit(1)
+
+    from field_mapping import CATEGORICAL_FIELDS
+
+    tracemalloc.start()
+    records = list(iter_records(sys.argv[1]))
+    as_dicts, _ = tracemalloc.get_traced_memory()
+    del records
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    compact = [from_dict(record, CATEGORICAL_FIELDS) for record in iter_records(sys.argv[1])]
+    as_compact, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = max(len(compact), 1)
+    print(f"📦 {len(compact)} records from {sys.argv[1]}")
+    print(f"  dicts:   {as_dicts / count:,.0f} B/record")
+    print(f"  compact: {as_compact / count:,.0f} B/record ({as_dicts / max(as_compact, 1):.1f}x smaller)")
+    if compact and json.dumps(compact[0], default=plain) != json.dumps(next(iter_records(sys.argv[1]))):
+        print("❌ Round trip differs")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
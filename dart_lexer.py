@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Minimal Dart lexer for the source maintenance scripts.
+
+Understands everything that can hide brackets or identifiers from a naive
+regex: line, block (nested) and doc comments, single/double quoted and
+triple-quoted strings, raw strings (r'...') and interpolation ($name and
+${expression}, which may itself contain strings).
+
+A string with interpolation is split the way the Dart scanner does it:
+
+    'Hello ${user.name}!'  ->  STRING "'Hello ${"  IDENT user  PUNCT .
+                                IDENT name  STRING "}!'"
+
+so brackets inside string text never appear as PUNCT tokens while
+identifiers referenced from interpolations still do.
+"""
+
+import re
+import sys
+from collections import namedtuple
+
+IDENT = 'ident'
+NUMBER = 'number'
+STRING = 'string'
+PUNCT = 'punct'
+COMMENT = 'comment'
+
+Token = namedtuple('Token', 'kind text start end')
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<line>//[^\n]*)
+  | (?P<block>/\*)
+  | (?P<quote>r?(?:'''|\"\"\"|'|"))
+  | (?P<ident>[A-Za-z_$][A-Za-z0-9_$]*)
+  | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+(?:\.\d+)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<punct>\?\.\.|\.\.\.|\?\.|\.\.|=>|\?\?=?|>>>=?|>>=?|<<=?|[=!<>+\-*/%&|^~]=|&&|\|\||\+\+|--|[^\s])
+""", re.VERBOSE)
+
+# Identifier after a bare `$` in a string ($ is not allowed there)
+_INTERPOLATED_IDENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_BLOCK_DELIMITER = re.compile(r'/\*|\*/')
+
+# Run of plain string characters for each (non-raw) quote
+_STRING_BODY = {
+    "'": re.compile(r"[^\\$'\n]*"),
+    '"': re.compile(r'[^\\$"\n]*'),
+    "'''": re.compile(r"[^\\$']*"),
+    '"""': re.compile(r'[^\\$"]*'),
+}
+
+
+def _block_comment_end(source, pos):
+    """End of a block comment whose opening /* ends at `pos` (Dart block comments nest)"""
+    depth = 1
+    for match in _BLOCK_DELIMITER.finditer(source, pos):
+        depth += 1 if match.group() == '/*' else -1
+        if depth == 0:
+            return match.end()
+    return len(source)
+
+
+def _string(source, start, pos, quote, comments):
+    """Tokens of a string literal opened at `start`; returns the end position"""
+    length = len(source)
+    if source[start] == 'r':
+        end = source.find(quote, pos)
+        if len(quote) == 1:
+            newline = source.find('\n', pos)
+            if newline != -1 and (end == -1 or newline < end):
+                end = newline - len(quote)  # unterminated: ends at the line break
+        end = length if end == -1 else end + len(quote)
+        yield Token(STRING, source[start:end], start, end)
+        return end
+
+    body = _STRING_BODY[quote]
+    piece = start
+    while True:
+        pos = body.match(source, pos).end()
+        if pos >= length:
+            break
+        char = source[pos]
+        if char == '\\':
+            pos += 2
+        elif char == '$':
+            if source.startswith('{', pos + 1):
+                yield Token(STRING, source[piece:pos + 2], piece, pos + 2)
+                pos = yield from _tokens(source, pos + 2, comments, True)
+                piece = pos
+                pos += 1
+            else:
+                match = _INTERPOLATED_IDENT.match(source, pos + 1)
+                if match is None:
+                    pos += 1
+                    continue
+                yield Token(STRING, source[piece:pos + 1], piece, pos + 1)
+                yield Token(IDENT, match.group(), pos + 1, match.end())
+                piece = pos = match.end()
+        elif char == '\n':
+            break  # unterminated single-line string
+        elif source.startswith(quote, pos):
+            pos += len(quote)
+            break
+        else:
+            pos += 1  # a lone quote inside a triple-quoted string
+    pos = min(pos, length)
+    yield Token(STRING, source[piece:pos], piece, pos)
+    return pos
+
+
+def _tokens(source, pos, comments, interpolation=False):
+    """
+    Tokens from `pos`; inside ${...} stops before the closing brace.
+    Returns the position where it stopped.
+    """
+    length = len(source)
+    match = _TOKEN.match
+    depth = 0
+    while pos < length:
+        token = match(source, pos)
+        kind = token.lastgroup
+        end = token.end()
+        if kind == 'quote':
+            pos = yield from _string(source, pos, end, token.group().lstrip('r'), comments)
+            continue
+        if kind == PUNCT:
+            text = token.group()
+            if interpolation:
+                if text == '{':
+                    depth += 1
+                elif text == '}':
+                    if depth == 0:
+                        return pos
+                    depth -= 1
+            yield Token(PUNCT, text, pos, end)
+        elif kind == IDENT or kind == NUMBER:
+            yield Token(kind, token.group(), pos, end)
+        elif kind == 'block':
+            end = _block_comment_end(source, end)
+            if comments:
+                yield Token(COMMENT, source[pos:end], pos, end)
+        elif kind == 'line' and comments:
+            yield Token(COMMENT, token.group(), pos, end)
+        pos = end
+    return pos
+
+
+def tokenize(source, comments=False):
+    """Generator of Token(kind, text, start, end); whitespace is skipped, comments unless asked for"""
+    return _tokens(source, 0, comments)
+
+
+def matching_bracket(tokens, index):
+    """Index of the bracket closing tokens[index] ('(', '[' or '{'), or None if unbalanced"""
+    opening = tokens[index].text
+    closing = {'(': ')', '[': ']', '{': '}'}[opening]
+    depth = 0
+    for position in range(index, len(tokens)):
+        token = tokens[position]
+        if token.kind != PUNCT:
+            continue
+        if token.text == opening:
+            depth += 1
+        elif token.text == closing:
+            depth -= 1
+            if depth == 0:
+                return position
+    return None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python dart_lexer.py <file.dart>")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as file:
+        source = file.read()
+    for token in tokenize(source, comments=True):
+        line = source.count('\n', 0, token.start) + 1
+        print(f"{line:>6}  {token.kind:<8}{token.text!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Declaration/reference index of private Dart members, for dead-code removal.
+
+Every file is tokenized once (dart_lexer.py) and reduced to:
+
+- declarations: private methods, top-level functions, getters and setters
+  (`_name`) declared at class or top level, with their source span and the
+  private identifiers referenced from inside them;
+- roots: private identifiers referenced from anywhere else (public
+  members, field initializers, other private code that is not a member).
+
+Dart privacy is per library (a file plus its `part` files), so private
+names resolve within the library only. A private member is reachable if
+its name is referenced from a root or from a reachable member; everything
+else, including members that only call each other, is dead.
+
+The index is persisted in .dart_tool/dart_symbol_index.json. Files whose
+size and mtime did not change are not read again, files whose content
+hash did not change are not parsed again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import defaultdict, deque
+
+from dart_lexer import IDENT, PUNCT, STRING, matching_bracket, tokenize
+
+DEFAULT_ROOT = 'lib'
+INDEX_FILE = os.path.join('.dart_tool', 'dart_symbol_index.json')
+# Bump when the extracted facts change shape or meaning
+INDEX_VERSION = 1
+
+_TYPE_KEYWORDS = frozenset({'class', 'mixin', 'extension', 'enum'})
+_BODY_MODIFIERS = frozenset({'async', 'sync'})
+# Tokens that can directly precede a member name (return type, modifier, member boundary)
+_BEFORE_NAME = frozenset({'>', '>>', '>>>', '?', ']', ';', '{', '}', ')'})
+_OPENING = {')': '(', ']': '[', '}': '{'}
+_BLANK_LINE_BEFORE = re.compile(r'\n[ \t]*\n[ \t]*$')
+_BLANK_LINE_AFTER = re.compile(r'[ \t]*\n')
+
+
+def _is_private(name):
+    return len(name) > 1 and name[0] == '_'
+
+
+def _body_span(tokens, index):
+    """
+    For tokens[index] just after a member signature, return the index of
+    the last token of its body, or None if this is not a member with a body.
+    """
+    token = tokens[index] if index < len(tokens) else None
+    while token is not None and token.kind == IDENT and token.text in _BODY_MODIFIERS:
+        index += 1
+        if index < len(tokens) and tokens[index].text == '*':
+            index += 1
+        token = tokens[index] if index < len(tokens) else None
+    if token is None or token.kind != PUNCT:
+        return None
+    if token.text == '{':
+        return matching_bracket(tokens, index)
+    if token.text == '=>':
+        depth = 0
+        for position in range(index + 1, len(tokens)):
+            text = tokens[position].text
+            if tokens[position].kind != PUNCT:
+                continue
+            if text in '([{':
+                depth += 1
+            elif text in ')]}':
+                depth -= 1
+                if depth < 0:
+                    return None
+            elif text == ';' and depth == 0:
+                return position
+    return None
+
+
+def _declaration_start(source, tokens, first, boundary_end):
+    """
+    Start offset of a member whose first token is tokens[first]: its line,
+    plus the comment lines directly above it (doc comments).
+    """
+    start = source.rfind('\n', 0, tokens[first].start) + 1
+    while start > boundary_end:
+        previous = source.rfind('\n', 0, start - 1) + 1
+        if previous < boundary_end or not source[previous:start].lstrip().startswith('//'):
+            break
+        start = previous
+    return max(start, boundary_end)
+
+
+def _line_end(source, end):
+    newline = source.find('\n', end)
+    if newline == -1 or source[end:newline].strip():
+        return end
+    return newline + 1
+
+
+def parse_source(source):
+    """Index facts of one Dart file (see module docstring)"""
+    tokens = list(tokenize(source))
+    declarations = []
+    roots = set()
+    parts = []
+    part_of = None
+    library_name = None
+
+    # One entry per open '{': (is a class-like body, class name)
+    scopes = []
+    # Token index where the current member/statement started, per level
+    member_start = 0
+    boundary_end = 0
+    current = None  # declaration whose body is being scanned
+
+    index = 0
+    length = len(tokens)
+    while index < length:
+        token = tokens[index]
+        kind, text = token.kind, token.text
+
+        if current is not None and index > current['_last']:
+            declarations.append(current)
+            current = None
+
+        at_member_level = not scopes or scopes[-1][0]
+
+        if kind == IDENT:
+            if at_member_level and index == member_start and text in ('part', 'library'):
+                if text == 'part' and index + 1 < length:
+                    following = tokens[index + 1]
+                    if following.kind == STRING:
+                        parts.append(following.text[1:-1])
+                    elif following.text == 'of' and index + 2 < length:
+                        target = tokens[index + 2]
+                        part_of = ('uri', target.text[1:-1]) if target.kind == STRING else ('name', _dotted(tokens, index + 2))
+                elif text == 'library' and index + 1 < length and tokens[index + 1].kind == IDENT:
+                    library_name = _dotted(tokens, index + 1)
+
+            if _is_private(text):
+                previous = tokens[index - 1] if index else None
+                is_declaration = False
+                if at_member_level and current is None and (previous is None or previous.text != '.'):
+                    class_name = scopes[-1][1] if scopes else None
+                    accessor = previous is not None and previous.kind == IDENT and previous.text in ('get', 'set')
+                    if text != class_name and (accessor or previous is None or previous.kind == IDENT
+                                               or previous.text in _BEFORE_NAME):
+                        after = index + 1
+                        if after < length and tokens[after].text == '<':
+                            closing = _closing_angle(tokens, after)
+                            after = length if closing is None else closing + 1
+                        if after < length and tokens[after].text == '(' and not (accessor and previous.text == 'get'):
+                            closing = matching_bracket(tokens, after)
+                            last = None if closing is None else _body_span(tokens, closing + 1)
+                        elif accessor and previous.text == 'get':
+                            last = _body_span(tokens, after)
+                        else:
+                            last = None
+                        if last is not None:
+                            is_declaration = True
+                            member_kind = ('getter' if previous.text == 'get' else 'setter') if accessor else 'method'
+                            start = _declaration_start(source, tokens, member_start, boundary_end)
+                            end = _line_end(source, tokens[last].end)
+                            current = {
+                                'name': text,
+                                'kind': member_kind if scopes else ('function' if member_kind == 'method' else member_kind),
+                                'class': scopes[-1][1] if scopes else None,
+                                'line': source.count('\n', 0, token.start) + 1,
+                                'start': start,
+                                'end': end,
+                                'references': set(),
+                                '_last': last,
+                            }
+                if not is_declaration:
+                    (current['references'] if current is not None else roots).add(text)
+        elif kind == PUNCT:
+            if text == '{':
+                header = tokens[member_start:index] if at_member_level else ()
+                is_type = any(t.kind == IDENT and t.text in _TYPE_KEYWORDS for t in header)
+                class_name = _type_name(header) if is_type else None
+                scopes.append((is_type, class_name))
+                if is_type:
+                    member_start = index + 1
+                    boundary_end = token.end
+            elif text == '}':
+                if scopes:
+                    scopes.pop()
+                if not scopes or scopes[-1][0]:
+                    member_start = index + 1
+                    boundary_end = token.end
+            elif text == ';' and at_member_level:
+                member_start = index + 1
+                boundary_end = token.end
+        index += 1
+
+    if current is not None:
+        declarations.append(current)
+
+    for declaration in declarations:
+        declaration['references'] = sorted(declaration['references'])
+        del declaration['_last']
+
+    return {
+        'balanced': _balanced(tokens),
+        'declarations': declarations,
+        'roots': sorted(roots),
+        'parts': parts,
+        'partOf': part_of,
+        'libraryName': library_name,
+    }
+
+
+def _balanced(tokens):
+    stack = []
+    for token in tokens:
+        if token.kind != PUNCT:
+            continue
+        if token.text in ('(', '[', '{'):
+            stack.append(token.text)
+        elif token.text in (')', ']', '}'):
+            if not stack or stack.pop() != _OPENING[token.text]:
+                return False
+    return not stack
+
+
+def _dotted(tokens, index):
+    names = []
+    while index < len(tokens) and tokens[index].kind == IDENT:
+        names.append(tokens[index].text)
+        if index + 1 < len(tokens) and tokens[index + 1].text == '.':
+            index += 2
+        else:
+            break
+    return '.'.join(names)
+
+
+def _closing_angle(tokens, index):
+    depth = 0
+    for position in range(index, len(tokens)):
+        text = tokens[position].text
+        if text == '<':
+            depth += 1
+        elif text in ('>', '>>', '>>>'):
+            depth -= len(text)
+            if depth <= 0:
+                return position
+        elif text in ('{', ';', '=>'):
+            return None
+    return None
+
+
+def _type_name(header):
+    for position, token in enumerate(header):
+        if token.kind == IDENT and token.text in _TYPE_KEYWORDS:
+            for following in header[position + 1:]:
+                if following.kind == IDENT and following.text not in ('type', 'on'):
+                    return following.text
+                if following.kind == PUNCT:
+                    break
+            return None
+    return None
+
+
+def _content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class SymbolIndex:
+    """Persisted per-file index over all Dart files below `root`"""
+
+    def __init__(self, root=DEFAULT_ROOT, index_file=INDEX_FILE):
+        self.root = root
+        self.index_file = index_file
+        self.files = {}
+        self.parsed = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION and data.get('root') == self.root:
+            self.files = data['files']
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+        temporary = self.index_file + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'version': INDEX_VERSION, 'root': self.root, 'files': self.files}, file, ensure_ascii=False)
+        os.replace(temporary, self.index_file)
+
+    def update(self):
+        """Re-index new and changed files, drop deleted ones; returns the changed paths"""
+        changed = []
+        seen = set()
+        for directory, _, names in os.walk(self.root):
+            for name in sorted(names):
+                if not name.endswith('.dart'):
+                    continue
+                path = os.path.join(directory, name)
+                seen.add(path)
+                if self.refresh(path):
+                    changed.append(path)
+        for path in set(self.files) - seen:
+            del self.files[path]
+            changed.append(path)
+        return changed
+
+    def refresh(self, path):
+        """Re-index one file if it changed on disk; returns True if its facts changed"""
+        stat = os.stat(path)
+        entry = self.files.get(path)
+        if entry is not None and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return False
+        with open(path, 'rb') as file:
+            data = file.read()
+        digest = _content_hash(data)
+        if entry is not None and entry['hash'] == digest:
+            entry['mtime'], entry['size'] = stat.st_mtime_ns, stat.st_size
+            return False
+        entry = parse_source(data.decode('utf-8'))
+        entry.update({'hash': digest, 'mtime': stat.st_mtime_ns, 'size': stat.st_size})
+        self.files[path] = entry
+        self.parsed += 1
+        return True
+
+    def libraries(self):
+        """{library file: [library file, part files...]}"""
+        by_name = {entry['libraryName']: path for path, entry in self.files.items() if entry['libraryName']}
+        libraries = defaultdict(list)
+        for path, entry in self.files.items():
+            part_of = entry['partOf']
+            owner = path
+            if part_of is not None:
+                if part_of[0] == 'uri':
+                    owner = os.path.normpath(os.path.join(os.path.dirname(path), part_of[1]))
+                else:
+                    owner = by_name.get(part_of[1], path)
+                if owner not in self.files:
+                    owner = path
+            libraries[owner].append(path)
+        return libraries
+
+    def unbalanced(self):
+        """Files with unbalanced brackets: their members are never reported as dead"""
+        return sorted(path for path, entry in self.files.items() if not entry['balanced'])
+
+    def unreachable(self):
+        """Dead private members: [(path, declaration)] in file and source order"""
+        dead = []
+        for paths in self.libraries().values():
+            edges = defaultdict(set)
+            declared = []
+            roots = set()
+            for path in paths:
+                entry = self.files[path]
+                roots.update(entry['roots'])
+                for declaration in entry['declarations']:
+                    edges[declaration['name']].update(declaration['references'])
+                    declared.append((path, declaration))
+
+            reached = set(roots)
+            queue = deque(roots)
+            while queue:
+                for name in edges.get(queue.popleft(), ()):
+                    if name not in reached:
+                        reached.add(name)
+                        queue.append(name)
+            dead.extend((path, declaration) for path, declaration in declared
+                        if declaration['name'] not in reached and self.files[path]['balanced'])
+        dead.sort(key=lambda item: (item[0], item[1]['start']))
+        return dead
+
+
+def remove_declarations(path, declarations):
+    """Cut the given declarations out of one file in a single pass; returns the new source"""
+    with open(path, 'rb') as file:
+        source = file.read().decode('utf-8')
+    pieces = []
+    position = 0
+    for declaration in sorted(declarations, key=lambda item: item['start']):
+        start, end = declaration['start'], declaration['end']
+        pieces.append(source[position:start])
+        position = end
+        # Keep a single blank line between the neighbours
+        if _BLANK_LINE_BEFORE.search(source, 0, start):
+            blank = _BLANK_LINE_AFTER.match(source, position)
+            if blank is not None:
+                position = blank.end()
+    pieces.append(source[position:])
+    return ''.join(pieces)
+
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ROOT
+    index = SymbolIndex(root)
+    index.update()
+    index.save()
+    declarations = sum(len(entry['declarations']) for entry in index.files.values())
+    print(f"📇 {len(index.files)} files, {declarations} private members ({index.parsed} files parsed)")
+    for path, declaration in index.unreachable():
+        print(f"  {path}:{declaration['line']}  {declaration['name']}")
+    for path in index.unbalanced():
+        print(f"⚠️ Unbalanced brackets, skipped: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Date normalization shared by all extractors.
+
+Every date becomes the ISO form the Flutter models read,
+"YYYY-MM-DDT00:00:00.000Z". Recognized source shapes:
+
+    iso     "2019-01-30 00:00:00", "2019-01-30"
+    us      "2/8/19", "12/31/2019"   (month/day/year; 2-digit years < 30 are 20xx)
+    dotted  "30.01.2019"             (day.month.year)
+
+A DateColumn remembers the format of the first value it sees and tries it
+first for the rest of the column, so mixed columns (data_emisji is mostly
+"M/D/YY" with a few ISO rows) still parse. "YYYY-MM-DD 00:00:00" never
+reaches a parser at all, only a calendar check of its day. Results are
+cached per column in a bounded dict (an export has only a few thousand
+distinct dates), so records share one string per date.
+
+NULL / empty dates return None and unparseable ones return None as well;
+both are counted in pipeline_metrics.DATA_QUALITY (nullDates, badDates).
+
+to_date_array() converts a whole column into a compact numpy datetime64[D]
+array (NaT for missing dates), parsing each distinct value once.
+"""
+
+import re
+import sys
+from datetime import date
+
+from pipeline_metrics import DATA_QUALITY
+
+ISO_SUFFIX = 'T00:00:00.000Z'
+CACHE_SIZE = 4096
+# Two-digit years below the pivot are 20xx, the rest 19xx
+CENTURY_PIVOT = 30
+
+_ISO = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?Z?)?')
+_US = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})')
+_DOTTED = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})')
+
+
+def _year(text):
+    year = int(text)
+    if len(text) == 2:
+        year += 2000 if year < CENTURY_PIVOT else 1900
+    return year
+
+
+def _iso_parts(match):
+    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+
+def _us_parts(match):
+    return _year(match.group(3)), int(match.group(1)), int(match.group(2))
+
+
+def _dotted_parts(match):
+    return int(match.group(3)), int(match.group(2)), int(match.group(1))
+
+
+# Format name -> (pattern, (year, month, day) from a match)
+FORMATS = {
+    'iso': (_ISO, _iso_parts),
+    'us': (_US, _us_parts),
+    'dotted': (_DOTTED, _dotted_parts),
+}
+
+
+def detect_format(value):
+    """Name of the format `value` is written in, or None"""
+    for name, (pattern, _) in FORMATS.items():
+        if pattern.fullmatch(value):
+            return name
+    return None
+
+
+def _parse(value, format_name):
+    """(year, month, day) of a valid date in the given format, else None"""
+    pattern, parts = FORMATS[format_name]
+    match = pattern.fullmatch(value)
+    if match is None:
+        return None
+    year, month, day = parts(match)
+    try:
+        date(year, month, day)
+    except ValueError:
+        return None
+    return year, month, day
+
+
+def _is_iso_day(value):
+    """True when value starts with a real calendar day written as YYYY-MM-DD"""
+    year, month, day = value[:4], value[5:7], value[8:10]
+    if not (value[4] == value[7] == '-' and value.isascii() and year.isdigit() and month.isdigit() and day.isdigit()):
+        return False
+    try:
+        date(int(year), int(month), int(day))
+    except ValueError:
+        return False
+    return True
+
+
+class DateColumn:
+    """Memoized date normalizer for one source column (see module docstring)"""
+
+    def __init__(self, name=None, cache_size=CACHE_SIZE):
+        self.name = name
+        self.format = None
+        self._cache = {}
+        self._cache_size = cache_size
+
+    def __call__(self, value):
+        if value.__class__ is str:
+            cached = self._cache.get(value)
+            if cached is not None:
+                return cached
+            # Fast path: "YYYY-MM-DD 00:00:00", the shape of most source dates; impossible
+            # days such as "2019-13-45 00:00:00" go through the parser and count as bad
+            if len(value) == 19 and value.endswith(' 00:00:00') and _is_iso_day(value):
+                return self._remember(value, value[:10] + ISO_SUFFIX)
+        return self._convert(value)
+
+    def classify(self, value):
+        """
+        ((year, month, day) or None, problem) where problem is None,
+        'nullDates' or 'badDates'. Nothing is counted.
+        """
+        if value is None:
+            return None, 'nullDates'
+        if value.__class__ is not str:
+            return None, 'badDates'
+        value = value.strip()
+        if not value or value.upper() == 'NULL':
+            return None, 'nullDates'
+
+        parsed = _parse(value, self.format) if self.format is not None else None
+        if parsed is None:
+            detected = detect_format(value)
+            if detected is not None:
+                parsed = _parse(value, detected)
+                if parsed is not None and self.format is None:
+                    self.format = detected
+        return parsed, (None if parsed is not None else 'badDates')
+
+    def parts(self, value):
+        """(year, month, day) or None; null and bad dates are counted"""
+        parsed, problem = self.classify(value)
+        if problem is not None:
+            DATA_QUALITY[problem] += 1
+        return parsed
+
+    def _convert(self, value):
+        parsed = self.parts(value)
+        if parsed is None:
+            return None
+        return self._remember(value, f"{parsed[0]:04d}-{parsed[1]:02d}-{parsed[2]:02d}{ISO_SUFFIX}")
+
+    def _remember(self, value, result):
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[value] = result
+        return result
+
+
+_COLUMNS = {}
+
+
+def date_column(name):
+    """The shared DateColumn for a source column (one per column and process)"""
+    column = _COLUMNS.get(name)
+    if column is None:
+        column = _COLUMNS[name] = DateColumn(name)
+    return column
+
+
+_default_column = DateColumn()
+
+
+def clear_caches():
+    """Forget every column's cached results and detected format"""
+    for column in (_default_column, *_COLUMNS.values()):
+        column._cache.clear()
+        column.format = None
+
+
+def normalize_date(value):
+    """Normalize a single date of unknown column to "YYYY-MM-DDT00:00:00.000Z" (or None)"""
+    return _default_column(value)
+
+
+def to_date_array(values, column=None):
+    """
+    Vectorized conversion of a column of raw date cells to numpy
+    datetime64[D] (NaT for missing or unparseable dates).
+
+    Each distinct value is parsed once. Requires numpy.
+    """
+    import numpy as np
+
+    column = column or DateColumn()
+    text = np.array(['' if value is None else str(value) for value in values], dtype=str)
+    distinct, inverse, counts = np.unique(text, return_inverse=True, return_counts=True)
+    converted = np.full(len(distinct), np.datetime64('NaT'), dtype='datetime64[D]')
+    for position, value in enumerate(distinct.tolist()):
+        parsed, problem = column.classify(value)
+        if problem is not None:
+            DATA_QUALITY[problem] += int(counts[position])
+        else:
+            converted[position] = np.datetime64(f"{parsed[0]:04d}-{parsed[1]:02d}-{parsed[2]:02d}", 'D')
+    return converted[inverse.reshape(-1)]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python date_normalization.py <date> [<date> ...]")
+        sys.exit(1)
+
+    column = DateColumn()
+    for value in sys.argv[1:]:
+        print(f"{value!r} -> {column(value)!r} ({detect_format(value.strip()) or 'unrecognized'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import json
+
+from extraction_engine import SOURCE_FILE, run_extraction
+
+def main():
+    print("🔍 Extracting apartments from JSON data...")
+    
+    try:
+        total, results = run_extraction(products=['apartments'], include_clients=False)
+    except FileNotFoundError:
+        print(f"❌ Error: {SOURCE_FILE} not found")
+        return
+    except json.JSONDecodeError as e:
+        print(f"❌ Error parsing JSON: {e}")
+        return
+
+    transformed_apartments = results['apartments']
+    
+    print(f"📊 Found {len(transformed_apartments)} apartment products out of {total} total products")
+    
+    if not transformed_apartments:
+        print("⚠️ No apartments found in the data")
+        return
+
+    output_file = 'apartments_extracted.json'
+    print(f"✅ Successfully extracted {len(transformed_apartments)} apartments to {output_file}")
+    
+    # Show sample data
+    print("\n📋 Sample apartment data:")
+    sample = transformed_apartments[0]
+    print(f"  ID: {sample['id']}")
+    print(f"  Client: {sample['clientName']}")
+    print(f"  Project: {sample['projectName']}")
+    print(f"  Investment: {sample['investmentAmount']}")
+    print(f"  Remaining: {sample['remainingCapital']}")
+    print(f"  Signed Date: {sample['signedDate']}")
+
+if __name__ == "__main__":
+    main()
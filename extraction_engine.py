@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Single-pass extraction engine for the tableConvert.com export.
+
+Reads the source JSON once and routes every record to the per-product
+writers (Obligacje, Udziały, Pożyczka, Apartamenty) and to the client
+collector in the same pass. The per-type transforms are compiled from the
+schemas in field_mapping.py. The extract_*.py scripts are thin wrappers
+around this module.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
+
+from capital_summaries import CapitalSummaryBuilder, save_summaries
+from client_investment_linker import InvestmentLinker
+from client_dedup import ClientDeduplicator, write_report
+from columnar_store import write_columnar
+from field_mapping import (  # noqa: F401 - re-exported for the extract_*.py scripts
+    SOURCE_FILE,
+    parse_date,
+    safe_to_double,
+    safe_to_int,
+    safe_to_string,
+    transform_apartment,
+    transform_bond,
+    transform_loan,
+    transform_share,
+)
+from incremental_extraction import base_record_id, stable_client_id, unique_record_id, write_changes
+from json_stream import iter_records
+from json_writers import JsonArrayWriter, NdjsonWriter, write_json_array, write_ndjson
+from pipeline_metrics import DATA_QUALITY, METRICS_FILE, Metrics, SamplingProfiler, profile_to
+from record_validation import RecordValidator
+from upload_batches import DEFAULT_BATCH_DIR, write_upload_batches
+from xlsx_reader import XlsxError
+
+def transform_client(record, client_name, record_id, current_time):
+    """Map a source record to the Client model (client.dart)"""
+    client_id = safe_to_string(record.get("ID_Klient"))
+    return {
+        "id": record_id,  # ID_Klient, or a name hash when it is missing
+        "excelId": client_id,
+        "fullName": client_name,
+        "name": client_name,
+        "email": "",  # Not available in this dataset
+        "phone": "",  # Not available in this dataset
+        "address": "",  # Not available in this dataset
+        "pesel": None,  # Not available in this dataset
+        "companyName": None,
+        "type": "individual",  # Default to individual
+        "notes": "",
+        "votingStatus": "undecided",
+        "colorCode": "#FFFFFF",
+        "unviableInvestments": [],
+        "createdAt": current_time,
+        "updatedAt": current_time,
+        "isActive": True,
+        "additionalInfo": {
+            "sourceFile": SOURCE_FILE,
+            "originalClientId": client_id,
+            "extractedAt": current_time
+        }
+    }
+
+
+class ProductSpec:
+    """Describes one product type handled by the engine"""
+
+    def __init__(self, key, product_type, id_prefix, output_file, transform):
+        self.key = key
+        self.product_type = product_type
+        self.id_prefix = id_prefix
+        self.output_file = output_file
+        self.transform = transform
+
+
+PRODUCT_SPECS = [
+    ProductSpec('bonds', 'Obligacje', 'bond', 'bonds_extracted.json', transform_bond),
+    ProductSpec('shares', 'Udziały', 'share', 'shares_extracted.json', transform_share),
+    ProductSpec('loans', 'Pożyczka', 'loan', 'loans_extracted.json', transform_loan),
+    ProductSpec('apartments', 'Apartamenty', 'apartment', 'apartments_extracted.json', transform_apartment),
+]
+
+SPECS_BY_TYPE = {spec.product_type: spec for spec in PRODUCT_SPECS}
+
+CLIENTS_OUTPUT_FILE = 'clients_extracted.json'
+
+# Records per shard sent to a worker process. Inputs smaller than one shard
+# are always extracted serially.
+DEFAULT_SHARD_SIZE = 20000
+
+
+def _columnar_path(json_path):
+    """bonds_extracted.json -> bonds_extracted.icol"""
+    return os.path.splitext(json_path)[0] + '.icol'
+
+
+def _ndjson_path(json_path):
+    """bonds_extracted.json -> bonds_extracted.ndjson"""
+    return os.path.splitext(json_path)[0] + '.ndjson'
+
+
+class ProductWriter:
+    """
+    Transforms the records of a single product type and streams them to its
+    *_extracted.json file (see json_writers.py) as they are produced.
+    """
+
+    def __init__(self, spec, current_time, keep_records=True):
+        self.spec = spec
+        self.current_time = current_time
+        self.keep_records = keep_records
+        self.records = []
+        self.count = 0
+        self._seen_ids = set()
+        self._outputs = []
+        self._columnar_path = None
+
+    def transform(self, record):
+        record_id = base_record_id(self.spec.id_prefix, record)
+        return self.resolve(self.spec.transform(record, record_id, self.current_time))
+
+    def resolve(self, transformed):
+        """Resolve ID collisions of an already transformed record"""
+        transformed['id'] = unique_record_id(transformed['id'], self._seen_ids)
+        return transformed
+
+    def open(self, output_dir='.', ndjson=False, columnar=False):
+        output_path = os.path.join(output_dir, self.spec.output_file)
+        self._outputs.append(JsonArrayWriter(output_path))
+        if ndjson:
+            self._outputs.append(NdjsonWriter(_ndjson_path(output_path)))
+        if columnar:
+            # The columnar layout needs every value of a column up front
+            self.keep_records = True
+            self._columnar_path = _columnar_path(output_path)
+        return output_path
+
+    def write(self, transformed):
+        for output in self._outputs:
+            output.write(transformed)
+        if self.keep_records:
+            self.records.append(transformed)
+        self.count += 1
+
+    def add(self, record):
+        """Transform one source record and write it"""
+        self.write(self.transform(record))
+
+    def close(self):
+        for output in self._outputs:
+            output.close()
+        self._outputs = []
+        if self._columnar_path:
+            write_columnar(self.records, self._columnar_path)
+            self._columnar_path = None
+
+    def abort(self):
+        """Drop partial output; files from the previous run stay untouched"""
+        for output in self._outputs:
+            output.abort()
+        self._outputs = []
+        self._columnar_path = None
+
+
+class ClientCollector:
+    """
+    Collects unique, non-employee clients in source order.
+
+    Unlike the product writers, clients are kept in memory until the end:
+    a later record can still merge another ID or spelling into a client
+    that was already seen.
+
+    Names are deduplicated on their normalized form (see client_dedup.py);
+    IDs and spellings absorbed by a client are kept in additionalInfo as
+    mergedClientIds / nameVariants, and investments carrying a merged ID
+    are written with the client's own ID (see _resolve_client_ids).
+    """
+
+    def __init__(self, current_time):
+        self.current_time = current_time
+        self.records = []
+        self.deduplicator = ClientDeduplicator()
+        self._records_by_key = {}
+        self._seen_ids = set()
+
+    def add(self, record):
+        client_name, client_id = _client_name_and_id(record)
+
+        entry, is_new = self.deduplicator.add(client_name, client_id)
+        if entry is None:
+            return
+
+        if is_new:
+            record_id = stable_client_id(record, client_name, self._seen_ids)
+            client = transform_client(record, client_name, record_id, self.current_time)
+            self._records_by_key[entry['key']] = client
+            self.records.append(client)
+            return
+
+        if len(entry['names']) > 1 or len(entry['ids']) > 1:
+            additional_info = self._records_by_key[entry['key']]['additionalInfo']
+            additional_info['mergedClientIds'] = entry['ids'][1:]
+            additional_info['nameVariants'] = entry['names'][1:]
+
+    def save(self, output_dir='.', columnar=False, ndjson=False):
+        output_path = os.path.join(output_dir, CLIENTS_OUTPUT_FILE)
+        write_json_array(self.records, output_path)
+        if ndjson:
+            write_ndjson(self.records, _ndjson_path(output_path))
+        if columnar:
+            write_columnar(self.records, _columnar_path(output_path))
+        write_report(self.deduplicator, output_dir)
+        return output_path
+
+
+def _client_name_and_id(record):
+    return safe_to_string(record.get("Klient", "")), safe_to_string(record.get("ID_Klient"))
+
+
+def _resolve_client_ids(stream, deduplicator):
+    """
+    Pass (writer, transformed record) through, replacing a clientId that
+    was merged into another client with that client's ID. The source
+    record reaches the deduplicator before its transform comes out of
+    the stream, so every merge known at that point is applied.
+    """
+    aliases = deduplicator.aliases
+    for writer, transformed in stream:
+        if aliases:
+            client_id = aliases.get(transformed.get('clientId'))
+            if client_id is not None:
+                transformed['clientId'] = client_id
+        yield writer, transformed
+
+
+def get_product_spec(key):
+    """Return the ProductSpec registered under the given key"""
+    for spec in PRODUCT_SPECS:
+        if spec.key == key:
+            return spec
+    raise KeyError(f"Unknown product type: {key}")
+
+
+def _transform_shard(task):
+    """
+    Worker: transform one shard of source records, keeping source order.
+
+    Returns (transformed, seconds, data quality counts) so the parent can
+    include the worker's share in its metrics.
+    """
+    shard, product_types, current_time = task
+    start = time.perf_counter()
+    quality_before = Counter(DATA_QUALITY)
+    transformed = []
+    for record in shard:
+        spec = SPECS_BY_TYPE.get(record.get('Typ_produktu'))
+        if spec is not None and spec.product_type in product_types:
+            record_id = base_record_id(spec.id_prefix, record)
+            transformed.append((spec.product_type, spec.transform(record, record_id, current_time)))
+    quality = Counter(DATA_QUALITY)
+    quality.subtract(quality_before)
+    return transformed, time.perf_counter() - start, +quality
+
+
+def _iter_shards(records, shard_size):
+    shard = []
+    for record in records:
+        shard.append(record)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def _iter_serial(records, writers, metrics=None):
+    """Generator of (writer, transformed record), transforming in this process"""
+    if metrics is None:
+        for record in records:
+            writer = writers.get(record.get('Typ_produktu'))
+            if writer is not None:
+                yield writer, writer.transform(record)
+        return
+
+    clock = time.perf_counter
+    elapsed = 0.0
+    try:
+        for record in records:
+            writer = writers.get(record.get('Typ_produktu'))
+            if writer is not None:
+                start = clock()
+                transformed = writer.transform(record)
+                elapsed += clock() - start
+                yield writer, transformed
+    finally:
+        metrics.add_time('transform', elapsed)
+
+
+def _iter_parallel(records, writers, current_time, workers, shard_size, metrics=None):
+    """
+    Generator of (writer, transformed record): shards are transformed in a
+    process pool and merged back in source order.
+
+    Only 2 * workers shards are in flight at a time, so memory stays
+    bounded. Stable IDs are de-duplicated during the ordered merge, which
+    makes the output identical to a serial run.
+    """
+    product_types = frozenset(writers)
+    shards = _iter_shards(records, shard_size)
+
+    first = next(shards, None)
+    if first is None:
+        return
+    if len(first) < shard_size:
+        # Small input: not worth starting a pool
+        yield from _iter_serial(first, writers, metrics)
+        return
+
+    def merge(future):
+        transformed_shard, seconds, quality = future.result()
+        if metrics is not None:
+            # Worker CPU time, summed over all shards
+            metrics.add_time('transform', seconds)
+            for key, count in quality.items():
+                metrics.count('dataQuality', key, count)
+        for product_type, transformed in transformed_shard:
+            writer = writers[product_type]
+            yield writer, writer.resolve(transformed)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque([pool.submit(_transform_shard, (first, product_types, current_time))])
+        for shard in shards:
+            pending.append(pool.submit(_transform_shard, (shard, product_types, current_time)))
+            if len(pending) >= 2 * workers:
+                yield from merge(pending.popleft())
+        while pending:
+            yield from merge(pending.popleft())
+
+
+def iter_extracted(source_file=SOURCE_FILE, products=None, workers=1, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Generator of (product key, transformed record) in source order, without
+    writing anything: for stages that consume investments as they are
+    extracted.
+    """
+    specs = PRODUCT_SPECS if products is None else [get_product_spec(key) for key in products]
+    investment_time = datetime.now().isoformat() + 'Z'
+    writers = {spec.product_type: ProductWriter(spec, investment_time, keep_records=False) for spec in specs}
+
+    deduplicator = ClientDeduplicator()
+
+    def observe(records):
+        for record in records:
+            deduplicator.add(*_client_name_and_id(record))
+            yield record
+
+    records = observe(iter_records(source_file))
+    if workers > 1:
+        stream = _iter_parallel(records, writers, investment_time, workers, shard_size)
+    else:
+        stream = _iter_serial(records, writers)
+    for writer, transformed in _resolve_client_ids(stream, deduplicator):
+        yield writer.spec.key, transformed
+
+
+def run_extraction(source_file=SOURCE_FILE, products=None, include_clients=True,
+                   output_dir='.', save=True, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                   columnar=False, metrics=None, ndjson=False, keep_records=True, consumers=()):
+    """
+    Extract the selected product types (and clients) in a single pass.
+
+    Returns (total_records, results) where results maps the product key
+    ('bonds', 'shares', 'loans', 'apartments', 'clients') to its records.
+    The source is streamed record by record (see json_stream.py) and every
+    transformed investment goes straight to its output file (and to each
+    `consumers` callable as consumer(key, record)), so output starts
+    flowing immediately. With keep_records=False investments are not
+    collected at all and results maps each product key to its record
+    count; memory then stays flat regardless of the size of the export.
+    Clients are always collected (see ClientCollector).
+
+    With workers > 1 the transforms run in a process pool on shards of
+    `shard_size` records; the output is identical to a serial run. With
+    columnar=True every output is also written as a .icol file (see
+    columnar_store.py), with ndjson=True as *_extracted.ndjson. Raises
+    FileNotFoundError / json.JSONDecodeError for a broken source; output
+    files from a previous run are then left untouched.
+
+    With a pipeline_metrics.Metrics instance, stage timings ('extract' =
+    the whole pass, 'transform', 'clients', 'write', 'consumers', and
+    'read' for serial runs), records per product type and data quality
+    counts are recorded on it.
+    """
+    specs = PRODUCT_SPECS if products is None else [get_product_spec(key) for key in products]
+
+    investment_time = datetime.now().isoformat() + 'Z'
+    writers = {spec.product_type: ProductWriter(spec, investment_time, keep_records) for spec in specs}
+    clients = ClientCollector(datetime.now().isoformat()) if include_clients else None
+    if clients is not None:
+        deduplicator, add_client = clients.deduplicator, clients.add
+    else:
+        # Not collected, but the investments still need the merged client IDs
+        deduplicator = ClientDeduplicator()
+
+        def add_client(record):
+            deduplicator.add(*_client_name_and_id(record))
+
+    total = 0
+
+    def observe(records):
+        # Counting and client de-duplication depend on source order and stay serial
+        nonlocal total
+        for record in records:
+            total += 1
+            add_client(record)
+            yield record
+
+    def observe_timed(records):
+        nonlocal total
+        clock = time.perf_counter
+        by_type = Counter()
+        elapsed = 0.0
+        for record in records:
+            total += 1
+            by_type[record.get('Typ_produktu')] += 1
+            start = clock()
+            add_client(record)
+            elapsed += clock() - start
+            yield record
+        metrics.add_time('clients', elapsed)
+        for product_type, count in by_type.items():
+            metrics.count('recordsByType', product_type, count)
+
+    records = observe(iter_records(source_file)) if metrics is None else observe_timed(iter_records(source_file))
+    if workers > 1:
+        stream = _iter_parallel(records, writers, investment_time, workers, shard_size, metrics)
+    else:
+        stream = _iter_serial(records, writers, metrics)
+    stream = _resolve_client_ids(stream, deduplicator)
+
+    start = time.perf_counter()
+    try:
+        if save:
+            for writer in writers.values():
+                writer.open(output_dir, ndjson, columnar)
+
+        if metrics is None:
+            for writer, transformed in stream:
+                writer.write(transformed)
+                for consumer in consumers:
+                    consumer(writer.spec.key, transformed)
+        else:
+            clock = time.perf_counter
+            write_elapsed = consume_elapsed = 0.0
+            for writer, transformed in stream:
+                started = clock()
+                writer.write(transformed)
+                written = clock()
+                for consumer in consumers:
+                    consumer(writer.spec.key, transformed)
+                consume_elapsed += clock() - written
+                write_elapsed += written - started
+            metrics.add_time('write', write_elapsed)
+            if consumers:
+                metrics.add_time('consumers', consume_elapsed)
+
+        with metrics.stage('write') if metrics is not None else nullcontext():
+            for writer in writers.values():
+                writer.close()
+            if save and clients is not None:
+                clients.save(output_dir, columnar, ndjson)
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    if metrics is not None:
+        stages = metrics.stages
+        metrics.add_time('extract', time.perf_counter() - start)
+        if workers <= 1:
+            accounted = sum(stages[name]['seconds'] for name in ('clients', 'transform', 'write', 'consumers')
+                            if name in stages)
+            metrics.add_time('read', stages['extract']['seconds'] - accounted)
+        metrics.count('records', 'total', total)
+
+    results = {
+        writer.spec.key: writer.records if writer.keep_records else writer.count
+        for writer in writers.values()
+    }
+    if clients is not None:
+        results['clients'] = clients.records
+    return total, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract all product types and clients in one pass')
+    parser.add_argument('--source', default=SOURCE_FILE, help='tableConvert JSON export or the source .xlsx workbook')
+    parser.add_argument('--output-dir', default='.', help='Directory for *_extracted.json files')
+    parser.add_argument('--only', nargs='+', choices=[spec.key for spec in PRODUCT_SPECS],
+                        help='Extract only the given product types')
+    parser.add_argument('--no-clients', action='store_true', help='Skip client extraction')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Transform in a process pool with N workers (default: serial)')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help='Records per worker shard; smaller inputs run serially')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Also write compact binary *.icol files next to the JSON output')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Also write *_extracted.ndjson (one JSON document per line)')
+    parser.add_argument('--summaries', action='store_true',
+                        help='Write precomputed summary_*.json capital aggregates')
+    parser.add_argument('--majority', action='store_true',
+                        help='Write majority_control.json (majority holders and voting capital per product)')
+    parser.add_argument('--link', action='store_true',
+                        help='Also write clients_with_investments.json (hash-join of clients and investments)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Write *_changes.json with records added/changed/removed since the last run')
+    parser.add_argument('--validate', action='store_true',
+                        help='Check records against the Dart models while extracting, write validation_report.json')
+    parser.add_argument('--batches', nargs='?', const=DEFAULT_BATCH_DIR, metavar='DIR',
+                        help=f'Write upload-ready NDJSON batches for firestore_uploader.py (default: {DEFAULT_BATCH_DIR})')
+    parser.add_argument('--metrics', nargs='?', const=METRICS_FILE, metavar='PATH',
+                        help=f'Write stage timings and data quality counts (default: {METRICS_FILE})')
+    parser.add_argument('--profile', metavar='PATH', help='cProfile the run and dump pstats to PATH')
+    parser.add_argument('--sample', metavar='PATH',
+                        help='Sample the stack every --sample-interval seconds, write folded stacks to PATH')
+    parser.add_argument('--sample-interval', type=float, default=0.005)
+    args = parser.parse_args()
+
+    metrics = Metrics() if args.metrics else None
+    with ExitStack() as stack:
+        if args.profile:
+            stack.enter_context(profile_to(args.profile))
+        if args.sample:
+            sampler = stack.enter_context(SamplingProfiler(args.sample_interval))
+        succeeded = _run_cli(args, metrics)
+
+    if args.sample:
+        sampler.write(args.sample)
+        print(f"🔬 {sum(sampler.samples.values())} stack samples written to {args.sample}")
+    if args.profile:
+        print(f"🔬 Profile written to {args.profile}")
+    if metrics is not None:
+        metrics.write(args.metrics)
+        quality = metrics.data_quality()
+        print(f"⏱️  Metrics written to {args.metrics}"
+              + (f" (data quality: {', '.join(f'{key}={count}' for key, count in quality.items())})"
+                 if quality else ""))
+    if not succeeded:
+        sys.exit(1)
+
+
+def _run_cli(args, metrics):
+    """Run the extraction and the requested analyses; False when extraction failed"""
+    stage = metrics.stage if metrics is not None else (lambda name: nullcontext())
+
+    if not os.path.isfile(args.source):
+        print(f"❌ Error: {args.source} not found")
+        return False
+    try:
+        os.makedirs(args.output_dir, exist_ok=True)
+    except OSError as e:
+        print(f"❌ Error: cannot create output directory {args.output_dir}: {e.strerror}")
+        return False
+
+    print(f"🚀 Extracting all products from {args.source} in a single pass...")
+
+    # Summaries and linking consume investments while they are extracted;
+    # only incremental diffs and upload batches need the full lists
+    consumers = []
+    if args.summaries:
+        builder = CapitalSummaryBuilder()
+        consumers.append(lambda key, record: builder.add(record))
+    majority = None
+    if args.majority:
+        # numpy is only needed for this analysis
+        from majority_control import MajorityControl
+        majority = MajorityControl()
+        consumers.append(lambda key, record: majority.add(record))
+    linker = InvestmentLinker() if args.link and not args.no_clients else None
+    if linker is not None:
+        consumers.append(linker)
+    validator = RecordValidator() if args.validate else None
+    if validator is not None:
+        consumers.append(validator)
+
+    try:
+        total, results = run_extraction(
+            source_file=args.source,
+            products=args.only,
+            include_clients=not args.no_clients,
+            output_dir=args.output_dir,
+            workers=args.workers,
+            shard_size=args.shard_size,
+            columnar=args.columnar,
+            metrics=metrics,
+            ndjson=args.ndjson,
+            keep_records=bool(args.incremental or args.batches),
+            consumers=consumers,
+        )
+    except OSError as e:
+        print(f"❌ Error: {e.filename or args.source}: {e.strerror or e}")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"❌ Error parsing JSON: {e}")
+        return False
+    except XlsxError as e:
+        print(f"❌ Error reading workbook: {e}")
+        return False
+
+    print(f"📊 Processed {total} records")
+    for key, records in results.items():
+        print(f"  ✅ {key}: {records if isinstance(records, int) else len(records)}")
+
+    if args.summaries:
+        with stage('summaries'):
+            summaries = save_summaries(builder.summaries(), args.output_dir)
+        print(f"\n💰 Summaries: viable capital {summaries['system']['totalViableCapital']:,.2f}, "
+              f"{len(summaries['clients'])} clients, {len(summaries['products'])} products")
+
+    if majority is not None:
+        with stage('majority'):
+            majority.compute(results.get('clients', ()))
+            majority.write(args.output_dir)
+        viable = int((majority.total > 0).sum())
+        print(f"\n🏆 Majority control computed for {viable} products with viable capital")
+
+    if linker is not None:
+        with stage('link'):
+            statistics = linker.link_and_write(results['clients'], args.output_dir)['statistics']
+        print(f"\n🔗 Linked {statistics['totalInvestments'] - statistics['orphanedInvestments']} investments, "
+              f"{statistics['orphanedInvestments']} orphaned, "
+              f"{statistics['clientsWithoutInvestments']} clients without investments")
+
+    if validator is not None:
+        with stage('validate'):
+            validator.validate_all('clients', results.get('clients', ()))
+            report_path = validator.write(args.output_dir)
+        print()
+        validator.print_summary()
+        print(f"📝 Validation report written to {report_path}")
+
+    if args.batches:
+        with stage('batches'):
+            manifest = write_upload_batches(results, args.batches)
+        batch_count = sum(len(entries) for entries in manifest['collections'].values())
+        print(f"\n📦 {batch_count} upload batches written to {args.batches}")
+
+    if args.incremental:
+        with stage('incremental'):
+            changes = write_changes(results, args.output_dir)
+        print("\n🔄 Changes since last run:")
+        for key, diff in changes.items():
+            print(f"  {key}: +{len(diff['added'])} ~{len(diff['changed'])} -{len(diff['removed'])}")
+    return True
+
+
+if __name__ == "__main__":
+    main()
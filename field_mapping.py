@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Declarative field mapping shared by all extractors.
+
+Each product type has one schema describing how the Polish tableConvert
+columns map to the English model fields, in the spirit of FIELD_MAPPING in
+functions/utils/unified-statistics.js. compile_schema() turns a schema into
+a specialized transform function once, so the hot loop runs straight-line
+code (one constructor call with local lookups) instead of interpreting the
+mapping or calling safe_to_double/.get generically for every field.
+Every date column gets its own memoized normalizer (date_normalization.py).
+
+Compiled transforms return compact slotted records (compact_records.py);
+low-cardinality columns marked category() share one string per distinct
+value. interpret_schema() still builds plain dicts as the reference.
+"""
+
+import re
+
+from compact_records import CATEGORIES, intern_category, record_type
+from date_normalization import clear_caches as clear_date_caches
+from date_normalization import date_column, normalize_date
+from pipeline_metrics import DATA_QUALITY
+
+SOURCE_FILE = 'tableConvert.com_n0b2g7.json'
+DOUBLE_CACHE_SIZE = 4096
+# Output collections (<collection>_extracted.json, Firestore collection names)
+INVESTMENT_COLLECTIONS = ('bonds', 'shares', 'loans', 'apartments')
+COLLECTIONS = INVESTMENT_COLLECTIONS + ('clients',)
+
+_DOUBLES = {}
+
+
+def safe_to_double(value):
+    """Safely convert value to double/float"""
+    if value is None or value == 'NULL' or value == '':
+        DATA_QUALITY['nullNumbers'] += 1
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        if value.strip() == '' or value.upper() == 'NULL':
+            DATA_QUALITY['nullNumbers'] += 1
+            return 0.0
+        # Handle comma-separated numbers like "305,700.00"
+        cleaned = value.replace(',', '')
+        try:
+            return float(cleaned)
+        except ValueError:
+            DATA_QUALITY['unparseableNumbers'] += 1
+            return 0.0
+    DATA_QUALITY['unparseableNumbers'] += 1
+    return 0.0
+
+
+def safe_to_int(value):
+    """Safely convert value to int"""
+    if value is None or value == 'NULL' or value == '':
+        DATA_QUALITY['nullNumbers'] += 1
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        if value.strip() == '' or value.upper() == 'NULL':
+            DATA_QUALITY['nullNumbers'] += 1
+            return 0
+        try:
+            return int(float(value))
+        except ValueError:
+            DATA_QUALITY['unparseableNumbers'] += 1
+            return 0
+    DATA_QUALITY['unparseableNumbers'] += 1
+    return 0
+
+
+def safe_to_string(value):
+    """Safely convert value to string, handling None and various types"""
+    if value is None or value == "NULL":
+        return ""
+    return str(value).strip()
+
+
+def parse_date(date_str):
+    """Parse date string to ISO format (see date_normalization.py)"""
+    return normalize_date(date_str)
+
+
+def fast_to_double(value, _float=float):
+    """
+    safe_to_double with a fast path for plain numeric strings like
+    "70000.00". Parsed amounts are cached by source text (an export repeats
+    a few hundred distinct amounts), so records share one float per amount.
+    NULL and unparseable values are not cached: they are counted each time.
+    """
+    cached = _DOUBLES.get(value)
+    if cached is not None:
+        return cached
+    try:
+        result = _float(value)
+    except (TypeError, ValueError):
+        if value.__class__ is not str or ',' not in value:
+            return safe_to_double(value)
+        # "305,700.00"
+        try:
+            result = _float(value.replace(',', ''))
+        except ValueError:
+            return safe_to_double(value)
+    if len(_DOUBLES) >= DOUBLE_CACHE_SIZE:
+        _DOUBLES.clear()
+    _DOUBLES[value] = result
+    return result
+
+
+def clear_caches():
+    """Empty the amount, category and date caches, e.g. to time the transforms cold"""
+    _DOUBLES.clear()
+    CATEGORIES.clear()
+    clear_date_caches()
+
+
+def fast_to_int(value, _int=int):
+    """safe_to_int with a fast path for plain integer strings like "8" """
+    if value.__class__ is str:
+        try:
+            return _int(value)
+        except ValueError:
+            pass
+    return safe_to_int(value)
+
+
+# --- Schema building blocks -------------------------------------------------
+
+class Column:
+    """Value taken from a source column, optionally converted"""
+
+    def __init__(self, name, convert='raw', default=None):
+        self.name = name
+        self.convert = convert  # 'raw', 'double', 'int', 'date' or 'category'
+        self.default = default
+
+
+class Const:
+    """Fixed value, the same for every record"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class RecordId:
+    """The stable ID computed by the engine"""
+
+
+class Timestamp:
+    """The run timestamp (createdAt / uploadedAt)"""
+
+
+def double(name):
+    return Column(name, 'double')
+
+
+def integer(name):
+    return Column(name, 'int')
+
+
+def date(name):
+    return Column(name, 'date')
+
+
+def category(name, default=None):
+    """Raw value from a low-cardinality column, pooled (see compact_records.py)"""
+    return Column(name, 'category', default)
+
+
+# Conversion name -> (reference converter, compiled converter)
+CONVERTERS = {
+    'double': (safe_to_double, fast_to_double),
+    'int': (safe_to_int, fast_to_int),
+    'date': (parse_date, parse_date),
+    'category': (intern_category, intern_category),
+}
+
+
+# --- Product schemas ----------------------------------------------------------
+
+BOND_SCHEMA = [
+    ('id', RecordId()),
+    ('productType', category('Typ_produktu', default='Obligacje')),
+    ('investmentAmount', double('Kwota_inwestycji')),
+    ('realizedCapital', double('Kapital zrealizowany')),
+    ('remainingCapital', double('Kapital Pozostaly')),
+    ('realizedInterest', Const(0.0)),  # Not in source data
+    ('remainingInterest', Const(0.0)),  # Not in source data
+    ('realizedTax', Const(0.0)),  # Not in source data
+    ('remainingTax', Const(0.0)),  # Not in source data
+    ('transferToOtherProduct', double('Przekaz na inny produkt')),
+    ('capitalForRestructuring', double('Kapitał do restrukturyzacji')),
+    ('capitalSecuredByRealEstate', double('Kapitał zabezpieczony nieruchomością')),
+    ('sourceFile', Const(SOURCE_FILE)),
+    ('createdAt', Timestamp()),
+    ('uploadedAt', Timestamp()),
+    ('clientId', category('ID_Klient')),
+    ('clientName', category('Klient')),
+    ('companyId', category('ID_Spolka')),
+    ('salesId', Column('ID_Sprzedaz')),
+    ('sharesCount', Const(None)),  # NULL for bonds
+    ('paymentAmount', double('Kwota_wplat')),
+    ('branch', category('Oddzial')),
+    ('advisor', category('Opiekun z MISA')),
+    ('productName', category('Produkt_nazwa')),
+    ('productStatusEntry', category('Produkt_status_wejscie')),
+    ('productStatus', category('Status_produktu')),
+    ('signedDate', date('Data_podpisania')),
+    ('investmentEntryDate', date('Data_wejscia_do_inwestycji')),
+    ('issueDate', date('data_emisji')),
+    ('maturityDate', date('data_wykupu')),  # data_wykupu for bonds
+    ('redemptionDate', date('data_wykupu')),
+    ('interestRate', Column('oprocentowanie')),
+    ('additionalInfo', [
+        ('wierzyciel_spolka', category('wierzyciel_spolka')),
+    ]),
+]
+
+SHARE_SCHEMA = [
+    ('id', RecordId()),
+    ('productType', category('Typ_produktu', default='Udziały')),
+    ('investmentAmount', double('Kwota_inwestycji')),
+    ('sharesCount', integer('Ilosc_Udzialow')),
+    ('remainingCapital', double('Kapital Pozostaly')),
+    ('capitalForRestructuring', double('Kapitał do restrukturyzacji')),
+    ('capitalSecuredByRealEstate', double('Kapitał zabezpieczony nieruchomością')),
+    ('sourceFile', Const(SOURCE_FILE)),
+    ('createdAt', Timestamp()),
+    ('uploadedAt', Timestamp()),
+    ('clientId', category('ID_Klient')),
+    ('clientName', category('Klient')),
+    ('companyId', category('ID_Spolka')),
+    ('salesId', Column('ID_Sprzedaz')),
+    ('paymentAmount', double('Kwota_wplat')),
+    ('branch', category('Oddzial')),
+    ('advisor', category('Opiekun z MISA')),
+    ('productName', category('Produkt_nazwa')),
+    ('productStatusEntry', category('Produkt_status_wejscie')),
+    ('productStatus', category('Status_produktu')),
+    ('signedDate', date('Data_podpisania')),
+    ('investmentEntryDate', date('Data_wejscia_do_inwestycji')),
+    ('issueDate', date('data_emisji')),
+    ('maturityDate', date('data_wykupu')),
+    ('additionalInfo', [
+        ('wierzyciel_spolka', category('wierzyciel_spolka')),
+        ('realizedCapital', double('Kapital zrealizowany')),
+        ('transferToOtherProduct', double('Przekaz na inny produkt')),
+    ]),
+]
+
+LOAN_SCHEMA = [
+    ('id', RecordId()),
+    ('productType', category('Typ_produktu', default='Pożyczka')),
+    ('investmentAmount', double('Kwota_inwestycji')),
+    ('remainingCapital', double('Kapital Pozostaly')),
+    ('capitalForRestructuring', double('Kapitał do restrukturyzacji')),
+    ('capitalSecuredByRealEstate', double('Kapitał zabezpieczony nieruchomością')),
+    ('sourceFile', Const(SOURCE_FILE)),
+    ('createdAt', Timestamp()),
+    ('uploadedAt', Timestamp()),
+    ('clientId', category('ID_Klient')),
+    ('clientName', category('Klient')),
+    ('companyId', category('ID_Spolka')),
+    ('salesId', Column('ID_Sprzedaz')),
+    ('paymentAmount', double('Kwota_wplat')),
+    ('branch', category('Oddzial')),
+    ('advisor', category('Opiekun z MISA')),
+    ('productName', category('Produkt_nazwa')),
+    ('productStatusEntry', category('Produkt_status_wejscie')),
+    ('productStatus', category('Status_produktu')),
+    ('signedDate', date('Data_podpisania')),
+    ('investmentEntryDate', date('Data_wejscia_do_inwestycji')),
+    ('issueDate', date('data_emisji')),
+    ('maturityDate', date('data_wykupu')),
+    ('loanNumber', Const(None)),  # Not in current data structure
+    ('borrower', category('Klient')),  # Use client name as borrower for now
+    ('creditorCompany', category('wierzyciel_spolka')),
+    ('interestRate', Column('oprocentowanie')),
+    ('disbursementDate', date('Data_wejscia_do_inwestycji')),  # Use investment entry date
+    ('repaymentDate', date('data_wykupu')),
+    ('accruedInterest', Const(0.0)),  # Not in current data structure
+    ('collateral', Const(None)),  # Not in current data structure
+    ('status', category('Status_produktu')),
+    ('additionalInfo', [
+        ('realizedCapital', double('Kapital zrealizowany')),
+        ('transferToOtherProduct', double('Przekaz na inny produkt')),
+        ('sharesCount', category('Ilosc_Udzialow')),  # Keep original even if NULL for loans
+    ]),
+]
+
+APARTMENT_SCHEMA = [
+    ('id', RecordId()),
+    ('productType', category('Typ_produktu', default='Apartamenty')),
+    ('investmentAmount', double('Kwota_inwestycji')),
+    ('capitalForRestructuring', double('Kapitał do restrukturyzacji')),
+    ('capitalSecuredByRealEstate', double('Kapitał zabezpieczony nieruchomością')),
+    ('sourceFile', Const(SOURCE_FILE)),
+    ('createdAt', Timestamp()),
+    ('uploadedAt', Timestamp()),
+    ('saleId', Column('ID_Sprzedaz')),
+    ('clientId', category('ID_Klient')),
+    ('clientName', category('Klient')),
+    ('advisor', category('Opiekun z MISA')),
+    ('branch', category('Oddzial')),
+    ('productStatus', category('Status_produktu')),
+    ('marketEntry', category('Produkt_status_wejscie')),
+    ('projectName', category('Produkt_nazwa')),
+    ('creditorCompany', category('wierzyciel_spolka')),
+    ('companyId', category('ID_Spolka')),
+    ('shareCount', category('Ilosc_Udzialow')),
+    ('paymentAmount', double('Kwota_wplat')),
+    ('realizedCapital', double('Kapital zrealizowany')),
+    ('transferToOtherProduct', double('Przekaz na inny produkt')),
+    ('remainingCapital', double('Kapital Pozostaly')),
+    ('signedDate', date('Data_podpisania')),
+    ('investmentEntryDate', date('Data_wejscia_do_inwestycji')),
+    ('issueDate', date('data_emisji')),
+    ('redemptionDate', date('data_wykupu')),
+    ('additionalInfo', []),
+]
+
+
+# --- Interpreter and compiler -------------------------------------------------
+
+def interpret_schema(schema, record, record_id, current_time):
+    """Reference implementation: walk the schema field by field.
+
+    Used by benchmark_field_mapping.py and to check compiled transforms.
+    """
+    result = {}
+    for target, spec in schema:
+        if isinstance(spec, list):
+            result[target] = interpret_schema(spec, record, record_id, current_time)
+        elif isinstance(spec, RecordId):
+            result[target] = record_id
+        elif isinstance(spec, Timestamp):
+            result[target] = current_time
+        elif isinstance(spec, Const):
+            result[target] = spec.value
+        else:
+            value = record.get(spec.name, spec.default)
+            if spec.convert != 'raw':
+                value = CONVERTERS[spec.convert][0](value)
+            result[target] = value
+    return result
+
+
+def _date_converter_name(column):
+    return '_date_' + re.sub(r'\W', '_', column)
+
+
+def _column_expression(spec):
+    default = '' if spec.default is None else f", {spec.default!r}"
+    expression = f"get({spec.name!r}{default})"
+    if spec.convert == 'date':
+        expression = f"{_date_converter_name(spec.name)}({expression})"
+    elif spec.convert == 'category':
+        expression = f"_category[{expression}]"
+    elif spec.convert != 'raw':
+        expression = f"_{spec.convert}({expression})"
+    return expression
+
+
+def _date_columns(schema, columns):
+    for _, spec in schema:
+        if isinstance(spec, list):
+            _date_columns(spec, columns)
+        elif isinstance(spec, Column) and spec.convert == 'date':
+            columns.add(spec.name)
+    return columns
+
+
+def _count_columns(schema, counts):
+    for _, spec in schema:
+        if isinstance(spec, list):
+            _count_columns(spec, counts)
+        elif isinstance(spec, Column):
+            expression = _column_expression(spec)
+            counts[expression] = counts.get(expression, 0) + 1
+    return counts
+
+
+def _emit_value(spec, constants, shared):
+    if isinstance(spec, RecordId):
+        return 'record_id'
+    if isinstance(spec, Timestamp):
+        return 'current_time'
+    if isinstance(spec, Const):
+        if spec.value is None or isinstance(spec.value, (bool, int, float, str)):
+            return repr(spec.value)
+        name = f"_const_{len(constants)}"
+        constants[name] = spec.value
+        return name
+    expression = _column_expression(spec)
+    return shared.get(expression, expression)
+
+
+def _emit_arguments(schema, constants, shared):
+    """Constructor arguments in record layout order (nested fields inlined)"""
+    lines = []
+    for target, spec in schema:
+        if isinstance(spec, list):
+            for sub_target, sub_spec in spec:
+                lines.append(f"        {_emit_value(sub_spec, constants, shared)},  # {target}.{sub_target}")
+        else:
+            lines.append(f"        {_emit_value(spec, constants, shared)},  # {target}")
+    return '\n'.join(lines)
+
+
+def schema_fields(schema):
+    """record_type() layout of a schema: (target, None | [nested targets])"""
+    return [(target, [sub_target for sub_target, _ in spec] if isinstance(spec, list) else None)
+            for target, spec in schema]
+
+
+def _categorical_fields(schemas):
+    """Target names holding pooled or date values, at any nesting level"""
+    fields = set()
+    for schema in schemas:
+        for target, spec in schema:
+            if isinstance(spec, list):
+                fields |= _categorical_fields([spec])
+            elif isinstance(spec, Column) and spec.convert in ('category', 'date'):
+                fields.add(target)
+    return fields
+
+
+def compile_schema(name, schema, record_name):
+    """
+    Compile a schema into `name(record, record_id, current_time)` returning
+    a `record_name` compact record (see compact_records.py).
+
+    Columns converted more than once (e.g. data_wykupu feeding both
+    maturityDate and redemptionDate) are evaluated once into a local. The
+    generated source is kept on the function as `__source__` for debugging
+    and the record class as `record_type`.
+    """
+    constants = {}
+    counts = _count_columns(schema, {})
+    shared = {}
+    prologue = ''
+    for expression, count in counts.items():
+        if count > 1 and expression.startswith('_'):
+            local = f"v{len(shared)}"
+            shared[expression] = local
+            prologue += f"    {local} = {expression}\n"
+
+    arguments = _emit_arguments(schema, constants, shared)
+    source = (
+        f"def {name}(record, record_id, current_time):\n"
+        f"    get = record.get\n"
+        f"{prologue}"
+        f"    return _record(\n{arguments}\n    )\n"
+    )
+    namespace = {f"_{kind}": compiled for kind, (_, compiled) in CONVERTERS.items()}
+    namespace['_category'] = CATEGORIES
+    namespace['_record'] = record_type(record_name, schema_fields(schema))
+    for column in _date_columns(schema, set()):
+        namespace[_date_converter_name(column)] = date_column(column)
+    namespace.update(constants)
+    exec(compile(source, f"<field_mapping:{name}>", 'exec'), namespace)
+    function = namespace[name]
+    function.__source__ = source
+    function.record_type = namespace['_record']
+    return function
+
+
+transform_bond = compile_schema('transform_bond', BOND_SCHEMA, 'BondRecord')
+transform_share = compile_schema('transform_share', SHARE_SCHEMA, 'ShareRecord')
+transform_loan = compile_schema('transform_loan', LOAN_SCHEMA, 'LoanRecord')
+transform_apartment = compile_schema('transform_apartment', APARTMENT_SCHEMA, 'ApartmentRecord')
+
+# Fields worth pooling when loading extracted records (query_service.py)
+CATEGORICAL_FIELDS = frozenset(_categorical_fields([BOND_SCHEMA, SHARE_SCHEMA, LOAN_SCHEMA, APARTMENT_SCHEMA]))
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Async Firestore uploader for the NDJSON batches from upload_batches.py.
+
+Every batch file becomes one `documents:commit` call of the Firestore REST
+API (at most 500 writes). Up to --concurrency commits are in flight at once
+over a bounded pool of keep-alive HTTP/1.1 connections, built on asyncio
+streams only (no aiohttp / firebase-admin needed).
+
+Documents are written under their extractor `id` (the field itself is
+dropped, like tools/upload_split_investments.js does), so a retried or
+resumed batch overwrites the same documents instead of creating
+duplicates. Committed batches are appended to upload_checkpoint.ndjson;
+after a crash simply run the same command again.
+
+Targets:
+    --emulator localhost:8080     local Firestore emulator (firebase emulators:start)
+    --stub-server 8085            run a stub commit endpoint to test against
+    (default)                     firestore.googleapis.com, token from --token
+                                  or FIRESTORE_TOKEN (gcloud auth print-access-token)
+
+Usage:
+    python extraction_engine.py --batches
+    python firestore_uploader.py --emulator localhost:8080
+    python firestore_uploader.py --project metropolitan-investment --concurrency 16
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import signal
+import ssl
+import sys
+import time
+from http import HTTPStatus
+from urllib.parse import quote
+
+from upload_batches import (
+    DEFAULT_BATCH_DIR,
+    CheckpointLog,
+    iter_batch_documents,
+    load_checkpoint,
+    load_manifest,
+    reset_checkpoint,
+)
+
+DEFAULT_PROJECT = 'metropolitan-investment'
+DEFAULT_DATABASE = '(default)'
+PRODUCTION_HOST = 'firestore.googleapis.com'
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 5
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    """A batch could not be committed"""
+
+
+# --- Firestore value encoding -------------------------------------------------
+
+def encode_value(value):
+    """Python/JSON value -> Firestore REST Value"""
+    if value is None:
+        return {'nullValue': None}
+    if isinstance(value, bool):
+        return {'booleanValue': value}
+    if isinstance(value, int):
+        return {'integerValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, str):
+        return {'stringValue': value}
+    if isinstance(value, list):
+        return {'arrayValue': {'values': [encode_value(item) for item in value]}}
+    if isinstance(value, dict):
+        return {'mapValue': {'fields': {key: encode_value(item) for key, item in value.items()}}}
+    raise TypeError(f"Unsupported value type: {type(value).__name__}")
+
+
+def document_id(document):
+    """Extractor ID, or a content hash for documents without one"""
+    if document.get('id'):
+        return str(document['id'])
+    encoded = json.dumps(document, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=10).hexdigest()
+
+
+def commit_body(documents, collection, project, database=DEFAULT_DATABASE):
+    prefix = f"projects/{project}/databases/{database}/documents/{collection}"
+    writes = []
+    for document in documents:
+        fields = {key: encode_value(value) for key, value in document.items() if key != 'id'}
+        writes.append({'update': {'name': f"{prefix}/{quote(document_id(document), safe='')}",
+                                  'fields': fields}})
+    return json.dumps({'writes': writes}, ensure_ascii=False).encode('utf-8')
+
+
+# --- HTTP/1.1 over asyncio streams --------------------------------------------
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    async def request(self, method, host, path, headers, body):
+        head = [f"{method} {path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by server')
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            payload = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            payload = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            payload = await self.reader.read()
+            self.reusable = False
+
+        if response_headers.get('connection', '').lower() == 'close':
+            self.reusable = False
+        return status, payload
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """At most `size` keep-alive connections to one host; requests wait for a free slot"""
+
+    def __init__(self, host, port, use_ssl, size):
+        self.host = host
+        self.port = port
+        self.ssl = ssl.create_default_context() if use_ssl else None
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+
+    async def request(self, method, path, headers, body):
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+                connection = _Connection(reader, writer)
+            try:
+                status, payload = await connection.request(method, self.host, path, headers, body)
+            except BaseException:
+                connection.close()
+                raise
+            if connection.reusable:
+                self._idle.append(connection)
+            else:
+                connection.close()
+            return status, payload
+
+    async def close(self):
+        while self._idle:
+            connection = self._idle.pop()
+            connection.close()
+            try:
+                await connection.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+
+# --- uploader -----------------------------------------------------------------
+
+class FirestoreUploader:
+    def __init__(self, batch_dir=DEFAULT_BATCH_DIR, host=PRODUCTION_HOST, port=443, use_ssl=True,
+                 project=DEFAULT_PROJECT, database=DEFAULT_DATABASE, token=None,
+                 concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES):
+        self.batch_dir = batch_dir
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.project = project
+        self.database = database
+        self.token = token
+        self.concurrency = concurrency
+        self.retries = retries
+        self.committed_batches = 0
+        self.committed_documents = 0
+        self.skipped_batches = 0
+
+    def _commit_path(self):
+        return f"/v1/projects/{self.project}/databases/{quote(self.database, safe='')}/documents:commit"
+
+    async def _commit(self, pool, collection, entry):
+        body = commit_body(iter_batch_documents(self.batch_dir, entry), collection, self.project, self.database)
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+
+        delay = 0.5
+        for attempt in range(self.retries + 1):
+            try:
+                status, payload = await pool.request('POST', self._commit_path(), headers, body)
+            except (ConnectionError, asyncio.IncompleteReadError, OSError) as error:
+                status, payload = None, str(error).encode()
+            if status == 200:
+                return
+            if status is not None and status not in RETRY_STATUSES or attempt == self.retries:
+                raise UploadError(f"{entry['file']}: HTTP {status}: {payload[:300].decode(errors='replace')}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def upload(self, collections=None):
+        manifest = load_manifest(self.batch_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"{self.batch_dir}/manifest.json not found")
+
+        done = load_checkpoint(self.batch_dir)
+        queue = asyncio.Queue()
+        for collection, entries in manifest['collections'].items():
+            if collections and collection not in collections:
+                continue
+            for entry in entries:
+                if (entry['file'], entry['hash']) in done:
+                    self.skipped_batches += 1
+                else:
+                    queue.put_nowait((collection, entry))
+
+        pool = ConnectionPool(self.host, self.port, self.use_ssl, self.concurrency)
+        checkpoint = CheckpointLog(self.batch_dir)
+        total = queue.qsize()
+
+        async def worker():
+            while True:
+                try:
+                    collection, entry = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self._commit(pool, collection, entry)
+                checkpoint.mark_done(entry)
+                self.committed_batches += 1
+                self.committed_documents += entry['documents']
+                if self.committed_batches % 20 == 0 or self.committed_batches == total:
+                    print(f"  ✅ {self.committed_batches}/{total} batches ({self.committed_documents} documents)")
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, min(self.concurrency, total)))]
+        try:
+            # The first failure cancels the rest; committed batches stay checkpointed
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        finally:
+            checkpoint.close()
+            await pool.close()
+
+
+# --- stub server ----------------------------------------------------------------
+
+async def run_stub_server(host='127.0.0.1', port=8085, fail_every=0):
+    """
+    Minimal commit endpoint for testing the uploader without the emulator.
+    Counts writes per collection; with fail_every=N every Nth request gets
+    a 503 to exercise retries.
+    """
+    counts = {}
+    requests = 0
+
+    async def handle(reader, writer):
+        nonlocal requests
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'content-length':
+                        length = int(value)
+                body = await reader.readexactly(length)
+                requests += 1
+
+                if fail_every and requests % fail_every == 0:
+                    status, payload = 503, b'{"error": "stub failure"}'
+                else:
+                    writes = json.loads(body).get('writes', [])
+                    if len(writes) > 500:
+                        status, payload = 400, b'{"error": "more than 500 writes"}'
+                    else:
+                        for write in writes:
+                            collection = write['update']['name'].split('/documents/')[1].split('/')[0]
+                            counts[collection] = counts.get(collection, 0) + 1
+                        status, payload = 200, json.dumps({'writeResults': [{} for _ in writes]}).encode()
+
+                writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"🧪 Stub Firestore commit endpoint on http://{host}:{port} (Ctrl+C to stop)", flush=True)
+    async with server:
+        await stop.wait()
+    print(f"📊 {requests} requests, writes: {counts}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload NDJSON batches to Firestore concurrently')
+    parser.add_argument('--batch-dir', default=DEFAULT_BATCH_DIR)
+    parser.add_argument('--collections', nargs='+', help='Upload only these collections')
+    parser.add_argument('--project', default=DEFAULT_PROJECT)
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    parser.add_argument('--emulator', default=os.environ.get('FIRESTORE_EMULATOR_HOST'),
+                        metavar='HOST:PORT', help='Firestore emulator (default: $FIRESTORE_EMULATOR_HOST)')
+    parser.add_argument('--token', default=os.environ.get('FIRESTORE_TOKEN'),
+                        help='OAuth access token for production (default: $FIRESTORE_TOKEN)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Connections / batches in flight (default: 8)')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES)
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and upload everything')
+    parser.add_argument('--stub-server', type=int, metavar='PORT', help='Run a stub commit endpoint instead')
+    parser.add_argument('--stub-fail-every', type=int, default=0, help='Stub: answer every Nth request with 503')
+    args = parser.parse_args()
+
+    if args.stub_server:
+        asyncio.run(run_stub_server(port=args.stub_server, fail_every=args.stub_fail_every))
+        return
+
+    if args.emulator:
+        host, _, port = args.emulator.rpartition(':')
+        # The emulator accepts the special "owner" token and bypasses security rules
+        uploader_args = {'host': host or 'localhost', 'port': int(port), 'use_ssl': False,
+                         'token': args.token or 'owner'}
+        target = f"emulator {args.emulator}"
+    else:
+        if not args.token:
+            print("❌ Error: --token or FIRESTORE_TOKEN is required outside the emulator")
+            sys.exit(1)
+        uploader_args = {'token': args.token}
+        target = PRODUCTION_HOST
+
+    if args.restart:
+        reset_checkpoint(args.batch_dir)
+
+    uploader = FirestoreUploader(args.batch_dir, project=args.project, database=args.database,
+                                 concurrency=args.concurrency, retries=args.retries, **uploader_args)
+    print(f"📤 Uploading {args.batch_dir} to {target} ({args.concurrency} in flight)...")
+    start = time.perf_counter()
+    try:
+        asyncio.run(uploader.upload(args.collections))
+    except FileNotFoundError as error:
+        print(f"❌ Error: {error}")
+        sys.exit(1)
+    except UploadError as error:
+        print(f"❌ Upload failed: {error}")
+        print(f"  {uploader.committed_batches} batches committed; run again to resume")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {uploader.committed_documents} documents in {uploader.committed_batches} batches "
+          f"({elapsed:.1f}s), {uploader.skipped_batches} batches already uploaded")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Stable record IDs and incremental change detection for the extractors.
+
+IDs are derived from the source keys (ID_Sprzedaz for investments,
+ID_Klient for clients) instead of the position in the export, so an
+inserted row no longer shifts every later ID. A manifest of per-record
+content hashes is kept between runs and only added, changed and removed
+records are emitted to *_changes.json files.
+"""
+
+import hashlib
+import json
+import os
+
+from compact_records import as_dict, plain
+
+MANIFEST_FILE = '.extraction_manifest.json'
+
+# Fields that change on every run and must not affect the content hash
+VOLATILE_FIELDS = ('createdAt', 'uploadedAt', 'updatedAt', 'extractedAt')
+
+# Source columns identifying a row when ID_Sprzedaz / ID_Klient is missing
+FALLBACK_KEY_FIELDS = ('Typ_produktu', 'Klient', 'Produkt_nazwa', 'Data_podpisania', 'ID_Spolka')
+
+
+def _is_missing(value):
+    return value is None or str(value).strip() in ('', 'NULL')
+
+
+def _short_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def _unique(record_id, seen_ids):
+    if record_id in seen_ids:
+        suffix = 2
+        while f"{record_id}_{suffix}" in seen_ids:
+            suffix += 1
+        record_id = f"{record_id}_{suffix}"
+
+    seen_ids.add(record_id)
+    return record_id
+
+
+def base_record_id(prefix, record):
+    """
+    Return the stable document ID for an investment record, before any
+    collision suffix: `<prefix>_<ID_Sprzedaz>` when the sale ID is filled,
+    otherwise a hash of FALLBACK_KEY_FIELDS.
+    """
+    sale_id = record.get('ID_Sprzedaz')
+    if _is_missing(sale_id):
+        fallback = '|'.join(str(record.get(field, '')) for field in FALLBACK_KEY_FIELDS)
+        return f"{prefix}_h{_short_hash(fallback)}"
+    return f"{prefix}_{str(sale_id).strip()}"
+
+
+def unique_record_id(record_id, seen_ids):
+    """
+    Make a base ID unique within one run. Collisions get a numeric suffix
+    in source order, so the result is still deterministic.
+    """
+    return _unique(record_id, seen_ids)
+
+
+def stable_client_id(record, client_name, seen_ids):
+    """Return ID_Klient, or a hash of the client name when it is missing"""
+    client_id = record.get('ID_Klient')
+    if _is_missing(client_id):
+        return _unique(f"client_h{_short_hash(client_name)}", seen_ids)
+    return _unique(str(client_id).strip(), seen_ids)
+
+
+def content_hash(record):
+    """Hash of a transformed record, ignoring run-specific timestamps"""
+    stable = {key: value for key, value in as_dict(record).items() if key not in VOLATILE_FIELDS}
+    additional = stable.get('additionalInfo')
+    if isinstance(additional, dict):
+        stable['additionalInfo'] = {
+            key: value for key, value in additional.items() if key not in VOLATILE_FIELDS
+        }
+    payload = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def load_manifest(output_dir='.'):
+    """Load {collection: {id: hash}} from the previous run (empty if none)"""
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_manifest(manifest, output_dir='.'):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, sort_keys=True)
+    return path
+
+
+def diff_records(records, previous_hashes):
+    """
+    Compare records with the hashes of the previous run.
+
+    Returns (changes, current_hashes) where changes holds the 'added' and
+    'changed' records and the 'removed' IDs.
+    """
+    current_hashes = {}
+    added = []
+    changed = []
+
+    for record in records:
+        record_id = record['id']
+        digest = content_hash(record)
+        current_hashes[record_id] = digest
+
+        previous = previous_hashes.get(record_id)
+        if previous is None:
+            added.append(record)
+        elif previous != digest:
+            changed.append(record)
+
+    removed = [record_id for record_id in previous_hashes if record_id not in current_hashes]
+    return {'added': added, 'changed': changed, 'removed': removed}, current_hashes
+
+
+def write_changes(results, output_dir='.'):
+    """
+    Write <collection>_changes.json for every extracted collection and
+    update the manifest. Returns {collection: changes}.
+    """
+    manifest = load_manifest(output_dir)
+    all_changes = {}
+
+    for collection, records in results.items():
+        changes, manifest[collection] = diff_records(records, manifest.get(collection, {}))
+        all_changes[collection] = changes
+
+        output_path = os.path.join(output_dir, f"{collection}_changes.json")
+        with open(output_path, 'w', encoding='utf-8') as file:
+            json.dump(changes, file, indent=2, ensure_ascii=False, default=plain)
+
+    save_manifest(manifest, output_dir)
+    return all_changes
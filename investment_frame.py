@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Columnar, NumPy-backed representation of the investment book.
+
+Instead of building one dict per row and calling safe_to_double/safe_to_int
+per cell, InvestmentFrame keeps every field as a column:
+
+- money columns as float64 arrays,
+- counts as int64 arrays,
+- low-cardinality text (product type, status, branch, advisor, ...) as
+  dictionary-encoded Categorical columns (int32 codes + category list),
+- dates as datetime64[D] arrays (NaT when missing), see
+  date_normalization.to_date_array,
+- a boolean null mask per column ('NULL', empty or unparseable cells).
+
+Parsing is vectorized per column and sums / group-bys run on whole arrays,
+which is the base for fast analytics over the whole book.
+
+Requires numpy (pip install numpy).
+"""
+
+import sys
+
+import numpy as np
+
+from date_normalization import date_column, to_date_array
+from field_mapping import SOURCE_FILE
+from json_stream import iter_records
+
+# Source column -> frame column
+MONEY_COLUMNS = {
+    'Kwota_inwestycji': 'investmentAmount',
+    'Kwota_wplat': 'paymentAmount',
+    'Kapital zrealizowany': 'realizedCapital',
+    'Przekaz na inny produkt': 'transferToOtherProduct',
+    'Kapital Pozostaly': 'remainingCapital',
+    'Kapitał zabezpieczony nieruchomością': 'capitalSecuredByRealEstate',
+    'Kapitał do restrukturyzacji': 'capitalForRestructuring',
+}
+
+COUNT_COLUMNS = {
+    'Ilosc_Udzialow': 'sharesCount',
+}
+
+DATE_COLUMNS = {
+    'Data_podpisania': 'signedDate',
+    'Data_wejscia_do_inwestycji': 'investmentEntryDate',
+    'data_emisji': 'issueDate',
+    'data_wykupu': 'maturityDate',
+}
+
+CATEGORICAL_COLUMNS = {
+    'Typ_produktu': 'productType',
+    'Status_produktu': 'productStatus',
+    'Produkt_status_wejscie': 'productStatusEntry',
+    'Oddzial': 'branch',
+    'Opiekun z MISA': 'advisor',
+    'Produkt_nazwa': 'productName',
+    'ID_Spolka': 'companyId',
+    'wierzyciel_spolka': 'creditorCompany',
+    'ID_Klient': 'clientId',
+    'Klient': 'clientName',
+    'ID_Sprzedaz': 'saleId',
+}
+
+_NULL_TOKENS = ('', 'NULL', 'null', 'None')
+
+
+def _as_text(values):
+    """Object values -> stripped unicode array (None becomes '')"""
+    text = np.array(['' if value is None else str(value) for value in values], dtype=str)
+    return np.char.strip(text)
+
+
+def _null_mask(text):
+    mask = np.zeros(text.shape, dtype=bool)
+    for token in _NULL_TOKENS:
+        mask |= text == token
+    return mask
+
+
+def parse_money(values):
+    """
+    Vectorized safe_to_double for a whole column.
+
+    Returns (float64 array, null mask). Null and unparseable cells are 0.0,
+    matching safe_to_double; comma-formatted values like "305,700.00" parse.
+    """
+    text = _as_text(values)
+    null = _null_mask(text)
+    cleaned = np.char.replace(text, ',', '')
+    cleaned[null] = '0'
+    try:
+        result = cleaned.astype(np.float64)
+    except ValueError:
+        # Rare path: find the bad cells, keep everything else vectorized
+        result = np.empty(len(cleaned), dtype=np.float64)
+        for i, value in enumerate(cleaned):
+            try:
+                result[i] = float(value)
+            except ValueError:
+                result[i] = 0.0
+                null[i] = True
+    return result, null
+
+
+def parse_count(values):
+    """Vectorized safe_to_int: (int64 array, null mask)"""
+    numbers, null = parse_money(values)
+    return numbers.astype(np.int64), null
+
+
+class Categorical:
+    """Dictionary-encoded text column; code -1 marks a null cell"""
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_values(cls, values):
+        text = _as_text(values)
+        null = _null_mask(text)
+        categories, codes = np.unique(text, return_inverse=True)
+        codes = codes.astype(np.int32)
+        # Drop the null tokens from the dictionary and re-number
+        keep = ~np.isin(categories, _NULL_TOKENS)
+        remap = np.full(len(categories), -1, dtype=np.int32)
+        remap[keep] = np.arange(int(keep.sum()), dtype=np.int32)
+        codes = remap[codes]
+        codes[null] = -1
+        return cls(codes, [str(category) for category in categories[keep]])
+
+    @property
+    def null_mask(self):
+        return self.codes < 0
+
+    def code_of(self, value):
+        """Code for a category value, or None when it does not occur"""
+        try:
+            return self.categories.index(value)
+        except ValueError:
+            return None
+
+    def equals(self, value):
+        """Boolean mask of rows equal to `value`"""
+        code = self.code_of(value)
+        if code is None:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+
+    def isin(self, values):
+        codes = [code for code in (self.code_of(value) for value in values) if code is not None]
+        return np.isin(self.codes, codes)
+
+    def take(self, index):
+        return Categorical(self.codes[index], self.categories)
+
+    def to_list(self):
+        lookup = self.categories
+        return [lookup[code] if code >= 0 else None for code in self.codes.tolist()]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class InvestmentFrame:
+    """Column store for extracted investments"""
+
+    def __init__(self, numeric, categorical, nulls, dates=None):
+        self.numeric = numeric          # name -> float64 / int64 array
+        self.categorical = categorical  # name -> Categorical
+        self.nulls = nulls              # name -> bool array
+        self.dates = dates or {}        # name -> datetime64[D] array
+
+    # --- construction -------------------------------------------------------
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build a frame from {source column: list of raw cell values}"""
+        numeric = {}
+        categorical = {}
+        nulls = {}
+        dates = {}
+
+        for source, name in MONEY_COLUMNS.items():
+            if source in columns:
+                numeric[name], nulls[name] = parse_money(columns[source])
+        for source, name in COUNT_COLUMNS.items():
+            if source in columns:
+                numeric[name], nulls[name] = parse_count(columns[source])
+        for source, name in CATEGORICAL_COLUMNS.items():
+            if source in columns:
+                categorical[name] = Categorical.from_values(columns[source])
+                nulls[name] = categorical[name].null_mask
+        for source, name in DATE_COLUMNS.items():
+            if source in columns:
+                dates[name] = to_date_array(columns[source], date_column(source))
+                nulls[name] = np.isnat(dates[name])
+
+        return cls(numeric, categorical, nulls, dates)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a frame from raw tableConvert records (any iterable)"""
+        sources = list(MONEY_COLUMNS) + list(COUNT_COLUMNS) + list(CATEGORICAL_COLUMNS) + list(DATE_COLUMNS)
+        columns = {source: [] for source in sources}
+        appenders = [(source, columns[source].append) for source in sources]
+        for record in records:
+            get = record.get
+            for source, append in appenders:
+                append(get(source))
+        return cls.from_columns(columns)
+
+    @classmethod
+    def load(cls, source_file=SOURCE_FILE):
+        """Stream the export straight into columns, without keeping row dicts"""
+        return cls.from_records(iter_records(source_file))
+
+    # --- access ---------------------------------------------------------------
+
+    def __len__(self):
+        for column in self.numeric.values():
+            return len(column)
+        for column in self.categorical.values():
+            return len(column)
+        for column in self.dates.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name):
+        if name in self.numeric:
+            return self.numeric[name]
+        if name in self.dates:
+            return self.dates[name]
+        return self.categorical[name]
+
+    @property
+    def columns(self):
+        return list(self.numeric) + list(self.categorical) + list(self.dates)
+
+    def filter(self, mask):
+        """Return a new frame with the rows where `mask` is True"""
+        index = np.flatnonzero(mask)
+        return InvestmentFrame(
+            {name: column[index] for name, column in self.numeric.items()},
+            {name: column.take(index) for name, column in self.categorical.items()},
+            {name: mask_column[index] for name, mask_column in self.nulls.items()},
+            {name: column[index] for name, column in self.dates.items()},
+        )
+
+    def where(self, **conditions):
+        """Mask of rows matching categorical equality conditions, e.g.
+        frame.where(productType='Obligacje', productStatus='Aktywny')"""
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in conditions.items():
+            if isinstance(value, (list, tuple, set)):
+                mask &= self.categorical[name].isin(value)
+            else:
+                mask &= self.categorical[name].equals(value)
+        return mask
+
+    # --- aggregation ----------------------------------------------------------
+
+    def sum(self, column, mask=None):
+        values = self.numeric[column]
+        if mask is not None:
+            values = values[mask]
+        return float(values.sum())
+
+    def groupby_sum(self, by, column, mask=None):
+        """{category: sum of column} using one bincount over the codes"""
+        categorical = self.categorical[by]
+        valid = categorical.codes >= 0
+        if mask is not None:
+            valid &= mask
+        totals = np.bincount(
+            categorical.codes[valid],
+            weights=self.numeric[column][valid],
+            minlength=len(categorical.categories),
+        )
+        return {category: float(total) for category, total in zip(categorical.categories, totals)}
+
+    def groupby_count(self, by, mask=None):
+        categorical = self.categorical[by]
+        valid = categorical.codes >= 0
+        if mask is not None:
+            valid &= mask
+        counts = np.bincount(categorical.codes[valid], minlength=len(categorical.categories))
+        return {category: int(count) for category, count in zip(categorical.categories, counts)}
+
+    def groupby_agg(self, by, columns, mask=None):
+        """{category: {'count': n, column: sum, ...}} for several columns at once"""
+        result = {category: {'count': count} for category, count in self.groupby_count(by, mask).items()}
+        for column in columns:
+            for category, total in self.groupby_sum(by, column, mask).items():
+                result[category][column] = total
+        return result
+
+
+def main():
+    source_file = sys.argv[1] if len(sys.argv) > 1 else SOURCE_FILE
+    frame = InvestmentFrame.load(source_file)
+
+    print(f"📊 {len(frame)} investments loaded from {source_file}")
+    summary = frame.groupby_agg('productType', ['investmentAmount', 'remainingCapital'])
+    for product_type, totals in summary.items():
+        print(f"  {product_type}: {totals['count']} rows, "
+              f"investment {totals['investmentAmount']:,.2f}, remaining {totals['remainingCapital']:,.2f}")
+
+    active = frame.where(productStatus='Aktywny')
+    print(f"💰 Viable capital (Aktywny): {frame.sum('remainingCapital', active):,.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Constant-memory streaming reader for the tableConvert.com JSON export.
+
+The export is one top-level array of flat objects. Instead of json.load()
+on the whole file, iter_records() reads it in fixed-size chunks and yields
+one record at a time, so peak memory is bounded by the chunk size plus the
+largest single record, no matter how large the file is.
+"""
+
+import codecs
+import json
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Largest accepted single record; anything bigger is treated as malformed
+DEFAULT_MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+class MalformedRecordError(json.JSONDecodeError):
+    """Raised when the stream hits a record that cannot be parsed.
+
+    Subclasses json.JSONDecodeError so callers handling json.load() errors
+    keep working. `pos` / `byte_offset` is the absolute byte offset in the
+    file and `record_index` the 0-based position in the top-level array.
+    """
+
+    def __init__(self, msg, byte_offset, record_index):
+        ValueError.__init__(self, f"{msg}: byte offset {byte_offset} (record {record_index})")
+        self.msg = msg
+        self.doc = None
+        self.pos = byte_offset
+        self.lineno = None
+        self.colno = None
+        self.byte_offset = byte_offset
+        self.record_index = record_index
+
+    def __reduce__(self):
+        return self.__class__, (self.msg, self.byte_offset, self.record_index)
+
+
+class _ChunkBuffer:
+    """Decoded text window over a binary file with absolute byte offsets"""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.base_offset = 0  # byte offset of self.text[0]
+        self.eof = False
+        self._first_chunk = True
+
+    def fill(self):
+        """Read one more chunk; returns False at end of file"""
+        if self.eof:
+            return False
+        data = self.file.read(self.chunk_size)
+        if self._first_chunk:
+            self._first_chunk = False
+            if data.startswith(codecs.BOM_UTF8):
+                data = data[len(codecs.BOM_UTF8):]
+                self.base_offset = len(codecs.BOM_UTF8)
+        if not data:
+            self.eof = True
+            self.text += self.decoder.decode(b'', final=True)
+            return False
+        # Drop the consumed prefix before growing the window
+        if self.pos:
+            self.base_offset += len(self.text[:self.pos].encode('utf-8'))
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        self.text += self.decoder.decode(data)
+        return True
+
+    def byte_offset(self, index):
+        return self.base_offset + len(self.text[:index].encode('utf-8'))
+
+    def next_char(self):
+        """Skip whitespace and return the next significant character (or '')"""
+        while True:
+            text = self.text
+            pos = self.pos
+            length = len(text)
+            while pos < length and text[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < length:
+                return text[pos]
+            if not self.fill():
+                return ''
+
+
+def _iter_stream(file, chunk_size, max_record_size):
+    decoder = json.JSONDecoder()
+    buffer = _ChunkBuffer(file, chunk_size)
+    index = 0
+
+    if buffer.next_char() != '[':
+        raise MalformedRecordError("Expecting '[' at start of export", buffer.byte_offset(buffer.pos), index)
+    buffer.pos += 1
+
+    if buffer.next_char() == ']':
+        return
+
+    while True:
+        char = buffer.next_char()
+        if char != '{':
+            message = 'Unexpected end of file' if char == '' else 'Expecting record object'
+            raise MalformedRecordError(message, buffer.byte_offset(buffer.pos), index)
+
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer.text, buffer.pos)
+                break
+            except json.JSONDecodeError as e:
+                # The record may simply continue in the next chunk
+                if len(buffer.text) - buffer.pos < max_record_size and buffer.fill():
+                    continue
+                raise MalformedRecordError(e.msg, buffer.byte_offset(e.pos), index) from None
+
+        buffer.pos = end
+        yield record
+        index += 1
+
+        char = buffer.next_char()
+        if char == ',':
+            buffer.pos += 1
+        elif char == ']':
+            return
+        else:
+            message = 'Unexpected end of file' if char == '' else "Expecting ',' delimiter"
+            raise MalformedRecordError(message, buffer.byte_offset(buffer.pos), index)
+
+
+def iter_records(source, chunk_size=DEFAULT_CHUNK_SIZE, max_record_size=DEFAULT_MAX_RECORD_SIZE):
+    """
+    Yield the objects of a top-level JSON array one at a time.
+
+    `source` is a path or a binary file object. Raises MalformedRecordError
+    with the absolute byte offset of the first problem found.
+
+    A path ending in .xlsx is read directly from the workbook instead
+    (see xlsx_reader.py), yielding the same record shape.
+    """
+    if isinstance(source, str) and source.lower().endswith('.xlsx'):
+        from xlsx_reader import iter_xlsx_records
+        yield from iter_xlsx_records(source)
+        return
+
+    if hasattr(source, 'read'):
+        yield from _iter_stream(source, chunk_size, max_record_size)
+        return
+
+    with open(source, 'rb') as file:
+        yield from _iter_stream(file, chunk_size, max_record_size)
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python json_stream.py <export.json|workbook.xlsx>")
+        sys.exit(1)
+
+    count = 0
+    try:
+        for _ in iter_records(sys.argv[1]):
+            count += 1
+    except MalformedRecordError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ {count} records streamed from {sys.argv[1]}")
+
+
+if __name__ == '__main__':
+    main()
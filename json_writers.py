@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Incremental writers for extractor output.
+
+JsonArrayWriter writes records one at a time and produces exactly the bytes
+of json.dump(records, file, indent=2, ensure_ascii=False), so the existing
+*_extracted.json consumers (tools/*.js, the Flutter import) see no
+difference. NdjsonWriter writes one compact JSON document per line.
+
+Records reach the disk as they are produced; nothing is kept in memory.
+Compact records (compact_records.py) are written as their plain dicts.
+Output goes to <path>.partial and replaces <path> only on close(), so an
+aborted run never leaves a truncated file behind.
+"""
+
+import json
+import os
+import sys
+
+from compact_records import plain
+
+
+class _StreamWriter:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._partial = path + '.partial'
+        self._file = open(self._partial, 'w', encoding='utf-8')
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        if self._file is None:
+            return
+        self._finish()
+        self._file.close()
+        self._file = None
+        os.replace(self._partial, self.path)
+
+    def abort(self):
+        """Discard everything written so far; `path` keeps its previous content"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.remove(self._partial)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class JsonArrayWriter(_StreamWriter):
+    """Streams records as an indented JSON array (same layout as json.dump(indent=2))"""
+
+    def __init__(self, path, indent=2):
+        super().__init__(path)
+        self._indent = indent
+        self._separator = '\n' + ' ' * indent
+        self._file.write('[')
+
+    def write(self, record):
+        text = json.dumps(record, indent=self._indent, ensure_ascii=False, default=plain)
+        self._file.write((self._separator if self.count == 0 else ',' + self._separator)
+                         + text.replace('\n', self._separator))
+        self.count += 1
+
+    def _finish(self):
+        self._file.write('\n]' if self.count else ']')
+
+
+class NdjsonWriter(_StreamWriter):
+    """Streams records as newline-delimited JSON"""
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=plain) + '\n')
+        self.count += 1
+
+
+def write_json_array(records, path):
+    """Write any iterable of records as an indented JSON array; returns the count"""
+    with JsonArrayWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+def write_ndjson(records, path):
+    with NdjsonWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+def iter_ndjson(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python json_writers.py <input.json|input.ndjson> <output.ndjson|output.json>")
+        sys.exit(1)
+
+    source, target = sys.argv[1], sys.argv[2]
+    if source.endswith('.ndjson'):
+        records = iter_ndjson(source)
+    else:
+        from json_stream import iter_records
+        records = iter_records(source)
+
+    count = write_ndjson(records, target) if target.endswith('.ndjson') else write_json_array(records, target)
+    print(f"✅ {count} records written to {target}")
+
+
+if __name__ == '__main__':
+    main()
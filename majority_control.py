@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Batch majority-control and voting-distribution analysis for every product.
+
+Same definitions as functions/utils/unified-statistics.js and
+calculateMajorityAnalysis / calculateVotingAnalysis in
+functions/services/premium-analytics-service.js:
+
+    viableCapital      = remainingCapital WHERE productStatus = Aktywny
+    majorityThreshold  = viableCapital * 0.51 (per product)
+    majority holders   = the fewest investors whose viable capital, taken
+                         largest first, reaches the threshold
+    votingStatus       = yes / no / abstain / undecided (unknown -> undecided)
+
+All products are computed at once on flat numpy arrays: capital is summed
+per (product, investor) pair with one bincount, pairs are sorted by capital
+within each product with one lexsort, and per-product cumulative sums find
+every minimal holder set in a single vectorized pass. Capital per voting
+status is another bincount over (product, status).
+
+Holder sets depend on capital only, so set_voting_status() moves one
+client's capital between status buckets of just the products it invests
+in instead of recomputing everything.
+
+Requires numpy (pip install numpy).
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from capital_summaries import ACTIVE_STATUS, MAJORITY_RATIO, product_name
+from field_mapping import INVESTMENT_COLLECTIONS
+
+VOTING_STATUSES = ('yes', 'no', 'abstain', 'undecided')
+DEFAULT_STATUS = VOTING_STATUSES.index('undecided')
+OUTPUT_FILE = 'majority_control.json'
+
+
+def _status_code(status):
+    try:
+        return VOTING_STATUSES.index(status)
+    except ValueError:
+        return DEFAULT_STATUS
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+
+class MajorityControl:
+    """Collects investments (add), then computes all products at once (compute)"""
+
+    def __init__(self, ratio=MAJORITY_RATIO):
+        self.ratio = ratio
+        self.product_names = []
+        self.client_ids = []
+        self.client_names = {}
+        self._product_codes = {}
+        self._client_codes = {}
+        self._rows_product = []
+        self._rows_client = []
+        self._rows_capital = []
+
+    def add(self, investment):
+        """Record one extracted investment (usable as a run_extraction consumer)"""
+        name = product_name(investment)
+        product = self._product_codes.get(name)
+        if product is None:
+            product = self._product_codes[name] = len(self.product_names)
+            self.product_names.append(name)
+
+        client_id = str(investment.get('clientId') or '')
+        client = self._client_codes.get(client_id)
+        if client is None:
+            client = self._client_codes[client_id] = len(self.client_ids)
+            self.client_ids.append(client_id)
+            self.client_names[client_id] = investment.get('clientName')
+
+        self._rows_product.append(product)
+        self._rows_client.append(client)
+        self._rows_capital.append(
+            _number(investment.get('remainingCapital')) if investment.get('productStatus') == ACTIVE_STATUS else 0.0)
+
+    def compute(self, clients=()):
+        """Majority holders and voting distribution for every product"""
+        statuses = np.full(len(self.client_ids), DEFAULT_STATUS, dtype=np.int8)
+        for client in clients:
+            for client_id in (client.get('id'), client.get('excelId')):
+                code = self._client_codes.get(str(client_id)) if client_id else None
+                if code is not None:
+                    statuses[code] = _status_code(client.get('votingStatus'))
+                    self.client_names[self.client_ids[code]] = client.get('fullName') or client.get('name')
+        self.statuses = statuses
+
+        product_count = len(self.product_names)
+        client_count = max(len(self.client_ids), 1)
+        rows_product = np.asarray(self._rows_product, dtype=np.int64)
+        rows_client = np.asarray(self._rows_client, dtype=np.int64)
+        rows_capital = np.asarray(self._rows_capital, dtype=np.float64)
+
+        # Capital per (product, investor) pair
+        keys, inverse = np.unique(rows_product * client_count + rows_client, return_inverse=True)
+        pair_capital = np.bincount(inverse.reshape(-1), weights=rows_capital, minlength=len(keys))
+        viable = pair_capital > 0
+        keys, pair_capital = keys[viable], pair_capital[viable]
+        pair_product = keys // client_count
+        pair_client = keys % client_count
+
+        # Largest capital first within each product
+        order = np.lexsort((pair_client, -pair_capital, pair_product))
+        self.pair_product = pair_product[order]
+        self.pair_client = pair_client[order]
+        self.pair_capital = pair_capital[order]
+
+        self.total = np.bincount(self.pair_product, weights=self.pair_capital, minlength=product_count)
+        self.investor_count = np.bincount(self.pair_product, minlength=product_count)
+        threshold = self.total * self.ratio
+
+        # Per-product running sums: global cumsum minus the sum before each product starts
+        starts = np.concatenate(([0], np.cumsum(self.investor_count)[:-1]))
+        cumulative = np.cumsum(self.pair_capital)
+        before = np.concatenate(([0.0], cumulative))[starts]
+        running = cumulative - before[self.pair_product]
+        # A pair is a holder if the running sum before it is still below the threshold
+        self.holder = (running - self.pair_capital) < threshold[self.pair_product]
+        self.holder_count = np.bincount(self.pair_product, weights=self.holder, minlength=product_count).astype(np.int64)
+        self.majority_capital = np.bincount(
+            self.pair_product, weights=self.pair_capital * self.holder, minlength=product_count)
+
+        # Capital and investor counts per (product, voting status)
+        bins = self.pair_product * len(VOTING_STATUSES) + statuses[self.pair_client]
+        size = product_count * len(VOTING_STATUSES)
+        self.capital_by_status = np.bincount(bins, weights=self.pair_capital, minlength=size).reshape(
+            product_count, len(VOTING_STATUSES))
+        self.count_by_status = np.bincount(bins, minlength=size).reshape(product_count, len(VOTING_STATUSES))
+
+        self._pairs_by_client = {}
+        for position, client in enumerate(self.pair_client.tolist()):
+            self._pairs_by_client.setdefault(client, []).append(position)
+        return self
+
+    def set_voting_status(self, client_id, status):
+        """Move one client's capital to another voting status; returns the affected products"""
+        code = self._client_codes.get(str(client_id))
+        if code is None:
+            return []
+        old, new = int(self.statuses[code]), _status_code(status)
+        if old == new:
+            return []
+        self.statuses[code] = new
+        affected = []
+        for position in self._pairs_by_client.get(code, ()):
+            product = self.pair_product[position]
+            capital = self.pair_capital[position]
+            self.capital_by_status[product, old] -= capital
+            self.capital_by_status[product, new] += capital
+            self.count_by_status[product, old] -= 1
+            self.count_by_status[product, new] += 1
+            affected.append(self.product_names[product])
+        return affected
+
+    def product(self, name):
+        """Analysis of one product (same fields as calculateMajorityAnalysis plus voting)"""
+        product = self._product_codes[name]
+        start = int(np.searchsorted(self.pair_product, product, side='left'))
+        end = start + int(self.investor_count[product])
+        holders = []
+        for position in range(start, start + int(self.holder_count[product])):
+            client_id = self.client_ids[self.pair_client[position]]
+            holders.append({
+                'clientId': client_id,
+                'clientName': self.client_names.get(client_id),
+                'viableCapital': float(self.pair_capital[position]),
+                'votingStatus': VOTING_STATUSES[self.statuses[self.pair_client[position]]],
+            })
+        total = float(self.total[product])
+        majority_capital = float(self.majority_capital[product])
+        statuses = range(len(VOTING_STATUSES))
+        return {
+            'productName': name,
+            'totalViableCapital': total,
+            'majorityThreshold': total * self.ratio,
+            'investorCount': end - start,
+            'holdersCount': len(holders),
+            'majorityCapital': majority_capital,
+            'majorityPercentage': majority_capital / total * 100 if total > 0 else 0.0,
+            'majorityHolders': holders,
+            'capitalByVotingStatus': {
+                VOTING_STATUSES[status]: float(self.capital_by_status[product, status]) for status in statuses},
+            'countByVotingStatus': {
+                VOTING_STATUSES[status]: int(self.count_by_status[product, status]) for status in statuses},
+        }
+
+    def to_dict(self):
+        totals = self.capital_by_status.sum(axis=0)
+        return {
+            'calculatedAt': datetime.now().isoformat(),
+            'majorityRatio': self.ratio,
+            'capitalByVotingStatus': {
+                status: float(totals[code]) for code, status in enumerate(VOTING_STATUSES)},
+            'products': {
+                name: self.product(name)
+                for code, name in enumerate(self.product_names) if self.total[code] > 0
+            },
+        }
+
+    def write(self, output_dir='.'):
+        path = os.path.join(output_dir, OUTPUT_FILE)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2, ensure_ascii=False)
+        return path
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def main():
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+
+    control = MajorityControl()
+    found = False
+    for collection in INVESTMENT_COLLECTIONS:
+        path = os.path.join(output_dir, f"{collection}_extracted.json")
+        if os.path.exists(path):
+            found = True
+            for investment in _load(path):
+                control.add(investment)
+    if not found:
+        print(f"❌ No *_extracted.json files found in {output_dir}")
+        sys.exit(1)
+
+    clients_path = os.path.join(output_dir, 'clients_extracted.json')
+    control.compute(_load(clients_path) if os.path.exists(clients_path) else ())
+    path = control.write(output_dir)
+
+    viable = int((control.total > 0).sum())
+    print(f"🏆 Majority control for {viable} products with viable capital written to {path}")
+    for code in np.argsort(-control.total)[:5]:
+        print(f"  {control.product_names[code]}: {int(control.holder_count[code])} of "
+              f"{int(control.investor_count[code])} investors hold ≥51% of {control.total[code]:,.2f}")
+
+
+if __name__ == '__main__':
+    main()
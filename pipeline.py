@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+One entry point for the data refresh: the extraction scripts and the npm
+helpers declared as a dependency graph.
+
+    extract            extraction_engine.py      -> *_extracted.json
+    validate           record_validation.py      -> validation_report.json
+    batches            upload_batches.py         -> upload_batches/
+    split-investments  npm run split-investments -> split_investment_data/  (JSON source only)
+    add-apartment-ids  npm run add-apartment-ids    (apartments_normalized.json, in place)
+    upload             firestore_uploader.py        (only when asked for by name)
+
+Every stage has a key: a blake2b hash over its command, its code (the
+script plus the repo modules it imports, found with ast) and its input
+files. A stage is skipped when its key and the hashes of its outputs match
+the last successful run stored in .pipeline_state.json. Files are only
+re-hashed when their size or mtime changed, so a no-change refresh is a
+few stat() calls. Stages whose dependencies are done run concurrently, each
+in its own process; this module only imports the standard library, and
+the heavy ones lazily, so `--help` and no-op runs start immediately.
+
+Usage:
+    python pipeline.py                     # everything except upload
+    python pipeline.py validate batches    # these and what they depend on
+    python pipeline.py upload              # refresh, then upload the batches
+    python pipeline.py --plan              # show what would run
+    python pipeline.py --force extract     # rerun extract even if it is up to date
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+from field_mapping import COLLECTIONS, SOURCE_FILE
+from upload_batches import DEFAULT_BATCH_DIR
+
+STATE_FILE = '.pipeline_state.json'
+STATE_VERSION = 1
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOG_TAIL = 20
+PLAN_ICONS = {'run': '▶️ ', 'maybe': '❔', 'skip': '✔️ ', 'missing input': '❌'}
+
+# `explicit` stages (side effects outside the repo) run only when named
+Stage = namedtuple('Stage', 'name command inputs outputs code after explicit')
+# Stages that cannot read an .xlsx source, and why
+JSON_ONLY_STAGES = {
+    'split-investments': 'tools/split_json_by_investment_type.js reads only the tableConvert JSON export',
+}
+
+
+def unsupported_stages(source):
+    """{stage name: reason} for the stages that cannot run on `source`"""
+    return dict(JSON_ONLY_STAGES) if source.lower().endswith('.xlsx') else {}
+
+
+def pipeline_stages(source=SOURCE_FILE, output_dir='.', batch_dir=DEFAULT_BATCH_DIR):
+    """The refresh graph for `source` (see unsupported_stages); paths are relative to the repository root"""
+    python = sys.executable
+    extracted = [os.path.join(output_dir, f"{collection}_extracted.json") for collection in COLLECTIONS]
+    apartments = os.path.join('split_investment_data_normalized', 'apartments_normalized.json')
+    stages = [
+        Stage('extract', [python, 'extraction_engine.py', '--source', source, '--output-dir', output_dir],
+              inputs=[source], outputs=extracted, code=['extraction_engine.py'], after=[], explicit=False),
+        Stage('validate', [python, 'record_validation.py', output_dir],
+              inputs=extracted + [os.path.join('lib', 'models', f"{name}.dart")
+                                  for name in ('bond', 'share', 'loan', 'apartment', 'client')],
+              outputs=[os.path.join(output_dir, 'validation_report.json')],
+              code=['record_validation.py'], after=['extract'], explicit=False),
+        Stage('batches', [python, 'upload_batches.py', output_dir, batch_dir],
+              inputs=extracted, outputs=[os.path.join(batch_dir, 'manifest.json')],
+              code=['upload_batches.py'], after=['extract'], explicit=False),
+        Stage('split-investments', ['npm', 'run', '--silent', 'split-investments', '--', source],
+              inputs=[source],
+              outputs=[os.path.join('split_investment_data', name)
+                       for name in ('bonds.json', 'shares.json', 'loans.json', 'metadata.json')],
+              code=['tools/split_json_by_investment_type.js', 'package.json'], after=[], explicit=False),
+        Stage('add-apartment-ids', ['npm', 'run', '--silent', 'add-apartment-ids'],
+              inputs=[apartments], outputs=[apartments],
+              code=['add_apartment_ids.js', 'package.json'], after=[], explicit=False),
+        Stage('upload', [python, 'firestore_uploader.py', '--batch-dir', batch_dir],
+              inputs=[os.path.join(batch_dir, 'manifest.json')], outputs=[],
+              code=['firestore_uploader.py'], after=['batches'], explicit=True),
+    ]
+    unsupported = unsupported_stages(source)
+    return [stage for stage in stages if stage.name not in unsupported]
+
+
+class FileHashes:
+    """blake2b of files, reused while size and mtime are unchanged"""
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+
+    def __call__(self, path):
+        """Hash of `path`, or None when it does not exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+
+        import hashlib
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        self.entries[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return self.entries[path][2]
+
+
+def python_imports(path, hashes, cache):
+    """Repository modules imported by a Python file (not transitively); cached by file hash"""
+    digest = hashes(path)
+    entry = cache.get(path)
+    if entry is not None and entry[0] == digest:
+        return entry[1]
+
+    import ast
+    with open(path, 'rb') as file:
+        tree = ast.parse(file.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    modules = sorted(f"{name}.py" for name in names if os.path.isfile(f"{name}.py"))
+    cache[path] = [digest, modules]
+    return modules
+
+
+def code_files(stage, hashes, cache):
+    """The stage's code files plus, for Python, every repo module they import"""
+    files = []
+    pending = list(stage.code)
+    while pending:
+        path = pending.pop()
+        if path in files:
+            continue
+        files.append(path)
+        if path.endswith('.py') and os.path.isfile(path):
+            pending.extend(python_imports(path, hashes, cache))
+    return sorted(files)
+
+
+class Pipeline:
+    """Runs a stage graph with cached, concurrent execution"""
+
+    def __init__(self, stages, state_file=STATE_FILE):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        state = self._load()
+        self.results = state.get('stages', {})
+        self.hashes = FileHashes(state.get('files'))
+        self.imports = state.get('imports', {})
+
+    def _load(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return state if state.get('version') == STATE_VERSION else {}
+
+    def save(self):
+        temporary = self.state_file + '.partial'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'version': STATE_VERSION, 'stages': self.results, 'files': self.hashes.entries,
+                       'imports': self.imports}, file, indent=1)
+        os.replace(temporary, self.state_file)
+
+    def check_names(self, names):
+        unknown = [name for name in names if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)} (stages: {', '.join(self.stages)})")
+
+    def selected(self, targets=None):
+        """Stage names needed for `targets` (default: all non-explicit), in dependency order"""
+        if not targets:
+            targets = [name for name, stage in self.stages.items() if not stage.explicit]
+        self.check_names(targets)
+
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].after:
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in targets:
+            visit(name)
+        return order
+
+    def key(self, stage):
+        """Hash of command, code and inputs; None when an input is missing"""
+        import hashlib
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(_display(stage.command).encode())
+        for path in code_files(stage, self.hashes, self.imports) + sorted(stage.inputs):
+            file_hash = self.hashes(path)
+            if file_hash is None and path in stage.inputs:
+                return None
+            digest.update(f"\0{path}\0{file_hash}".encode())
+        return digest.hexdigest()
+
+    def up_to_date(self, stage, key):
+        result = self.results.get(stage.name)
+        if result is None or key is None or result['key'] != key:
+            return False
+        return all(digest is not None and self.hashes(path) == digest for path, digest in result['outputs'].items())
+
+    def _record(self, stage, seconds):
+        # Keyed on the inputs as they are after the run, so a stage that
+        # rewrites its own input (add-apartment-ids) is not run again next time
+        self.results[stage.name] = {
+            'key': self.key(stage),
+            'outputs': {path: self.hashes(path) for path in stage.outputs},
+            'seconds': round(seconds, 3),
+            'finishedAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+
+    def plan(self, targets=None, force=()):
+        """
+        [(name, action)] with action 'run', 'skip', 'missing input' or
+        'maybe' (runs if a stage before it changes its inputs)
+        """
+        plan = []
+        running = set()
+        for name in self.selected(targets):
+            stage = self.stages[name]
+            if name in force:
+                running.add(name)
+                plan.append((name, 'run'))
+                continue
+            if running.intersection(stage.after):
+                running.add(name)
+                plan.append((name, 'maybe'))
+                continue
+            key = self.key(stage)
+            if key is None:
+                plan.append((name, 'missing input'))
+            elif self.up_to_date(stage, key):
+                plan.append((name, 'skip'))
+            else:
+                running.add(name)
+                plan.append((name, 'run'))
+        return plan
+
+    def run(self, targets=None, force=(), jobs=None, verbose=False):
+        """Run the stages that are out of date; returns {name: status}"""
+        order = self.selected(targets)
+        status = {}
+        pending = list(order)
+        running = {}
+        executor = None
+
+        try:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    dependencies = [status.get(dependency) for dependency in stage.after if dependency in order]
+                    if any(state in ('failed', 'blocked') for state in dependencies):
+                        status[name] = 'blocked'
+                        pending.remove(name)
+                        print(f"⏭️  {name}: blocked by a failed dependency")
+                        continue
+                    if any(state is None for state in dependencies):
+                        continue
+                    pending.remove(name)
+
+                    key = self.key(stage)
+                    if key is None:
+                        missing = [path for path in stage.inputs if self.hashes(path) is None]
+                        status[name] = 'failed'
+                        print(f"❌ {name}: missing input {', '.join(missing)}")
+                        continue
+                    # A rerun dependency with unchanged output leaves the key as it was
+                    if name not in force and self.up_to_date(stage, key):
+                        status[name] = 'skipped'
+                        print(f"✔️  {name}: up to date")
+                        continue
+
+                    if executor is None:
+                        from concurrent.futures import ThreadPoolExecutor
+                        executor = ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1)
+                    print(f"▶️  {name}: {_display(stage.command)}")
+                    running[executor.submit(_execute, stage.command)] = (stage, time.perf_counter())
+
+                if not running:
+                    continue
+                from concurrent.futures import FIRST_COMPLETED, wait
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, start = running.pop(future)
+                    returncode, output = future.result()
+                    seconds = time.perf_counter() - start
+                    lines = output.rstrip().splitlines()
+                    missing = [path for path in stage.outputs if not os.path.exists(path)] if returncode == 0 else []
+                    if missing:
+                        # Exit code 0 without the declared outputs is not a success
+                        status[stage.name] = 'failed'
+                        self.results.pop(stage.name, None)
+                        print(f"❌ {stage.name} exited with 0 but did not write {', '.join(missing)} ({seconds:.1f}s)")
+                        shown = lines if verbose else lines[-LOG_TAIL:]
+                    elif returncode == 0:
+                        status[stage.name] = 'ran'
+                        self._record(stage, seconds)
+                        self.save()
+                        print(f"✅ {stage.name} ({seconds:.1f}s)")
+                        shown = lines if verbose else []
+                    else:
+                        status[stage.name] = 'failed'
+                        self.results.pop(stage.name, None)
+                        print(f"❌ {stage.name} failed with exit code {returncode} ({seconds:.1f}s)")
+                        shown = lines if verbose else lines[-LOG_TAIL:]
+                    for line in shown:
+                        print(f"   {stage.name} | {line}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            self.save()
+        return status
+
+
+def _from_root(path):
+    """`path` (relative to the current directory) as seen from ROOT; relative while inside it, so keys stay put"""
+    path = os.path.abspath(path)
+    relative = os.path.relpath(path, ROOT)
+    return path if relative == os.pardir or relative.startswith(os.pardir + os.sep) else relative
+
+
+def _display(command):
+    return ' '.join(['python'] + command[1:] if command[0] == sys.executable else command)
+
+
+def _execute(command):
+    """(exit code, combined stdout/stderr) of a stage command"""
+    import subprocess
+    try:
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, errors='replace')
+    except OSError as e:
+        return 127, str(e)
+    return completed.returncode, completed.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the data refresh, skipping stages that are up to date')
+    parser.add_argument('targets', nargs='*', metavar='STAGE',
+                        help='Stages to bring up to date, with their dependencies (default: all but upload)')
+    parser.add_argument('--source',
+                        help='tableConvert JSON export; extract also reads an .xlsx workbook, '
+                             f'split-investments only the JSON export (skipped for a workbook; default: {SOURCE_FILE})')
+    parser.add_argument('--output-dir', help='Directory for *_extracted.json files (default: the repository)')
+    parser.add_argument('--batch-dir', help=f'Upload batch directory (default: {DEFAULT_BATCH_DIR})')
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE',
+                        help='Run these stages even if they are up to date')
+    parser.add_argument('--force-all', action='store_true', help='Run every selected stage')
+    parser.add_argument('--jobs', type=int, help='Stages to run at once (default: CPU count)')
+    parser.add_argument('--plan', action='store_true', help='Only show which stages would run')
+    parser.add_argument('--list', action='store_true', help='List the stages and exit')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show the output of every stage')
+    args = parser.parse_args()
+
+    # Stage commands and paths are relative to the repository; path
+    # arguments are relative to where the user ran us, defaults to the repository
+    args.source, args.output_dir, args.batch_dir = (
+        _from_root(path) if path is not None else default
+        for path, default in ((args.source, SOURCE_FILE), (args.output_dir, '.'), (args.batch_dir, DEFAULT_BATCH_DIR)))
+    os.chdir(ROOT)
+    stages = pipeline_stages(args.source, args.output_dir, args.batch_dir)
+    unsupported = unsupported_stages(args.source)
+    requested = [name for name in args.targets + args.force if name in unsupported]
+    if requested:
+        print(f"❌ {requested[0]} cannot run on {args.source}: {unsupported[requested[0]]}")
+        sys.exit(2)
+
+    if args.list:
+        for stage in stages:
+            after = f" (after {', '.join(stage.after)})" if stage.after else ''
+            print(f"{stage.name:<20} {_display(stage.command)}{after}{' [explicit]' if stage.explicit else ''}")
+    for name, reason in unsupported.items():
+        print(f"⏭️  {name}: skipped for {args.source} ({reason})")
+    if args.list:
+        return
+
+    pipeline = Pipeline(stages)
+    start = time.perf_counter()
+    try:
+        pipeline.check_names(args.force)
+        force = set(pipeline.selected(args.targets) if args.force_all else args.force)
+        if args.plan:
+            for name, action in pipeline.plan(args.targets, force):
+                print(f"{PLAN_ICONS[action]} {name}: {action}")
+            pipeline.save()
+            return
+        status = pipeline.run(args.targets, force, jobs=args.jobs, verbose=args.verbose)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    counts = {state: sum(1 for value in status.values() if value == state)
+              for state in ('ran', 'skipped', 'failed', 'blocked')}
+    print(f"\n🏁 {counts['ran']} ran, {counts['skipped']} up to date"
+          + (f", {counts['failed']} failed, {counts['blocked']} blocked" if counts['failed'] or counts['blocked'] else '')
+          + f" in {time.perf_counter() - start:.2f}s")
+    if counts['failed'] or counts['blocked']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
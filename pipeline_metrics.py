@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Low-overhead instrumentation for the extraction pipeline.
+
+- Metrics: cumulative stage timings (read, transform, clients, write, ...)
+  and named counters (records per product type, ...), written as JSON.
+- DATA_QUALITY: process-wide counter of silently coerced input, bumped by
+  field_mapping on its slow paths only (NULL / empty numbers and dates,
+  unparseable numbers, unrecognized dates), so clean rows cost nothing.
+- profile_to(): optional cProfile hook, dumps pstats for snakeviz/pstats.
+- SamplingProfiler: optional statistical profiler (SIGPROF timer) writing
+  folded stacks for flamegraph.pl / speedscope, with near-zero overhead.
+"""
+
+import cProfile
+import json
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_FILE = 'extraction_metrics.json'
+
+# Keys: nullNumbers, unparseableNumbers, nullDates, badDates
+DATA_QUALITY = Counter()
+
+
+class Metrics:
+    """Stage timings and counters for one pipeline run"""
+
+    def __init__(self):
+        self.started_at = datetime.now().isoformat()
+        self.stages = {}
+        self.counters = {}
+        self._quality_start = Counter(DATA_QUALITY)
+        self._start = time.perf_counter()
+
+    def add_time(self, name, seconds, calls=1):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {'seconds': 0.0, 'calls': 0}
+        stage['seconds'] += seconds
+        stage['calls'] += calls
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def count(self, group, key, amount=1):
+        counter = self.counters.get(group)
+        if counter is None:
+            counter = self.counters[group] = Counter()
+        counter[key] += amount
+
+    def data_quality(self):
+        """Coercions in this process since the run started, plus those reported by workers"""
+        quality = Counter(DATA_QUALITY)
+        quality.subtract(self._quality_start)
+        quality.update(self.counters.get('dataQuality', {}))
+        return {key: count for key, count in quality.items() if count}
+
+    def to_dict(self):
+        return {
+            'startedAt': self.started_at,
+            'totalSeconds': round(time.perf_counter() - self._start, 6),
+            'stages': {
+                name: {'seconds': round(stage['seconds'], 6), 'calls': stage['calls']}
+                for name, stage in self.stages.items()
+            },
+            'counters': {
+                group: dict(counter) for group, counter in self.counters.items() if group != 'dataQuality'
+            },
+            'dataQuality': self.data_quality(),
+        }
+
+    def write(self, path=METRICS_FILE):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2, ensure_ascii=False)
+        return path
+
+
+@contextmanager
+def profile_to(path):
+    """cProfile everything inside the block and dump the stats to `path`"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: every `interval` seconds of CPU time the current
+    Python stack is recorded. Output is one 'frame;frame;... count' line per
+    distinct stack (folded format). Main thread only; needs SIGPROF (not on
+    Windows).
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._previous = None
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+        return path
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else METRICS_FILE
+    if not os.path.exists(path):
+        print(f"❌ Error: {path} not found")
+        sys.exit(1)
+
+    with open(path, 'r', encoding='utf-8') as file:
+        metrics = json.load(file)
+
+    print(f"⏱️  {path}: {metrics['totalSeconds']:.3f}s total")
+    for name, stage in sorted(metrics['stages'].items(), key=lambda item: -item[1]['seconds']):
+        print(f"  {name:<14}{stage['seconds']:>10.3f}s")
+    for group, counter in metrics['counters'].items():
+        print(f"📊 {group}: " + ', '.join(f"{key}={count}" for key, count in counter.items()))
+    if metrics['dataQuality']:
+        print("⚠️ Data quality: " + ', '.join(f"{key}={count}" for key, count in metrics['dataQuality'].items()))
+
+
+if __name__ == '__main__':
+    main()
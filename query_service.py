@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+In-memory indexed queries over the extracted dataset.
+
+QueryService loads *_extracted.json once and keeps, per collection:
+
+- hash indexes (value -> set of row positions) on clientId, saleId,
+  productName, branch, advisor and productStatus,
+- sorted indexes on signedDate, investmentEntryDate, issueDate and
+  maturityDate for range filters (ISO strings sort chronologically).
+
+Filters on indexed fields intersect posting sets, smallest first; other
+fields are checked on the remaining candidates only, with URL values
+converted to the field's type. Unknown fields are an error. The apartment
+spelling of a field is used transparently (saleId/salesId,
+productName/projectName, maturityDate/redemptionDate).
+
+Records are streamed from disk into compact slotted records
+(compact_records.py) with categorical values pooled, so the whole book
+fits in a fraction of the memory plain dicts would take.
+
+refresh() re-reads only the files whose mtime or size changed, and only
+their collection's indexes are rebuilt; serve() calls it before every
+request:
+
+    GET /query?collection=bonds&advisor=...&branch=GDA&productStatus=Aktywny
+               &signedDate=2019-01-01..2019-12-31&limit=50   (or signedDate=2019-01-30)
+    GET /aggregate?groupBy=productName&sum=remainingCapital&productStatus=Aktywny
+    GET /investors?productName=...
+    GET /clients/<id>
+    GET /majority?productName=...   (majority_control.py, needs numpy)
+    GET /stats
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from compact_records import from_dict, plain
+from field_mapping import CATEGORICAL_FIELDS, INVESTMENT_COLLECTIONS
+from json_stream import iter_records
+
+INDEXED_FIELDS = ('clientId', 'saleId', 'productName', 'branch', 'advisor', 'productStatus')
+DATE_FIELDS = ('signedDate', 'investmentEntryDate', 'issueDate', 'maturityDate')
+
+# Query field -> spellings used by the different collections
+FIELD_ALIASES = {
+    'saleId': ('saleId', 'salesId'),
+    'productName': ('productName', 'projectName'),
+    'maturityDate': ('maturityDate', 'redemptionDate'),
+}
+
+DEFAULT_PORT = 8765
+# Upper bound for an inclusive date range end such as "2019-12-31"
+_RANGE_END = '\uffff'
+
+
+def field_value(record, field):
+    for name in FIELD_ALIASES.get(field, (field,)):
+        value = record.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+class Segment:
+    """Records and indexes of one collection file"""
+
+    def __init__(self, name, records, mtime=None, size=None):
+        self.name = name
+        self.records = records
+        self.mtime = mtime
+        self.size = size
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        self.date_indexes = {}
+        self._field_types = {}
+
+        for position, record in enumerate(records):
+            for field in INDEXED_FIELDS:
+                value = field_value(record, field)
+                if value is not None and value != 'NULL':
+                    postings = self.indexes[field].get(value)
+                    if postings is None:
+                        postings = self.indexes[field][value] = set()
+                    postings.add(position)
+
+        for field in DATE_FIELDS:
+            pairs = sorted(
+                (value, position) for position, value in
+                ((position, field_value(record, field)) for position, record in enumerate(records))
+                if value
+            )
+            self.date_indexes[field] = ([value for value, _ in pairs], [position for _, position in pairs])
+
+    def _range(self, field, start, end):
+        keys, positions = self.date_indexes[field]
+        low = bisect_left(keys, start) if start else 0
+        high = bisect_right(keys, end + _RANGE_END) if end else len(keys)
+        return set(positions[low:high])
+
+    def has_field(self, field):
+        return self.field_type(field) is not None
+
+    def field_type(self, field):
+        """
+        Type of an unindexed field's values: the type of its first non-null
+        value, type(None) when every record has it null, None when no
+        record has it at all.
+        """
+        if field not in self._field_types:
+            names = FIELD_ALIASES.get(field, (field,))
+            field_type = None
+            for record in self.records:
+                if any(name in record for name in names):
+                    value = field_value(record, field)
+                    if value is not None:
+                        field_type = type(value)
+                        break
+                    field_type = type(None)
+            self._field_types[field] = field_type
+        return self._field_types[field]
+
+    def _coerce(self, field, value):
+        """A filter value (a string when it came from a URL) as the field's type"""
+        field_type = self.field_type(field)
+        if not isinstance(value, str) or field_type in (None, str, type(None)):
+            return value
+        try:
+            if field_type is bool:
+                return {'true': True, 'false': False}[value.lower()]
+            return float(value)
+        except (KeyError, ValueError):
+            raise ValueError(f"{field} filter expects a {field_type.__name__}, got {value!r}") from None
+
+    def select(self, filters):
+        """Positions (ascending) of the records matching all filters"""
+        candidate_sets = []
+        remaining = []
+        for field, condition in filters.items():
+            if field in self.indexes:
+                values = condition if isinstance(condition, (list, tuple, set, frozenset)) else (condition,)
+                index = self.indexes[field]
+                postings = [index.get(value, ()) for value in values]
+                candidate_sets.append(set().union(*postings) if len(postings) > 1 else set(postings[0]))
+            elif field in self.date_indexes:
+                if isinstance(condition, str):
+                    # One day: every timestamp that starts with it
+                    start = end = condition
+                elif isinstance(condition, (list, tuple)) and len(condition) == 2:
+                    start, end = condition
+                else:
+                    raise TypeError(f"{field} filter must be an ISO date or a (start, end) pair, got {condition!r}")
+                candidate_sets.append(self._range(field, start, end))
+            elif not self.has_field(field):
+                return []
+            else:
+                values = condition if isinstance(condition, (list, tuple, set, frozenset)) else (condition,)
+                remaining.append((field, tuple(self._coerce(field, value) for value in values)))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            positions = candidate_sets[0].intersection(*candidate_sets[1:])
+        else:
+            positions = range(len(self.records))
+
+        if remaining:
+            records = self.records
+            positions = [
+                position for position in positions
+                if all(field_value(records[position], field) in values for field, values in remaining)
+            ]
+        return sorted(positions)
+
+
+class QueryService:
+    """Indexed, incrementally reloaded view of the extractor output in `output_dir`"""
+
+    def __init__(self, output_dir='.'):
+        self.output_dir = output_dir
+        self.segments = {}
+        self.clients = []
+        self.clients_by_id = {}
+        self._clients_stat = None
+        self._majority = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _path(self, collection):
+        return os.path.join(self.output_dir, f"{collection}_extracted.json")
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _load(path):
+        return [from_dict(record, CATEGORICAL_FIELDS) for record in iter_records(path)]
+
+    def refresh(self):
+        """Reload collections whose file changed; returns the reloaded names"""
+        reloaded = []
+        with self._lock:
+            for collection in INVESTMENT_COLLECTIONS:
+                path = self._path(collection)
+                stat = self._stat(path)
+                segment = self.segments.get(collection)
+                if stat is None:
+                    if segment is not None:
+                        del self.segments[collection]
+                        reloaded.append(collection)
+                    continue
+                if segment is not None and (segment.mtime, segment.size) == stat:
+                    continue
+                self.segments[collection] = Segment(collection, self._load(path), *stat)
+                reloaded.append(collection)
+
+            path = self._path('clients')
+            stat = self._stat(path)
+            if stat != self._clients_stat:
+                self.clients = self._load(path) if stat is not None else []
+                self.clients_by_id = {}
+                for client in self.clients:
+                    for client_id in (client.get('id'), client.get('excelId')):
+                        if client_id:
+                            self.clients_by_id.setdefault(str(client_id), client)
+                self._clients_stat = stat
+                reloaded.append('clients')
+            if reloaded:
+                self._majority = None
+        return reloaded
+
+    def _segments(self, collection):
+        if collection is None:
+            return [self.segments[name] for name in INVESTMENT_COLLECTIONS if name in self.segments]
+        if isinstance(collection, str):
+            collection = (collection,)
+        return [self.segments[name] for name in collection if name in self.segments]
+
+    def _filtered_segments(self, collection, filters):
+        """_segments(collection); ValueError for a filter field none of them has"""
+        segments = self._segments(collection)
+        for field in filters:
+            if field not in INDEXED_FIELDS and field not in DATE_FIELDS and segments and not any(
+                    segment.has_field(field) for segment in segments):
+                raise ValueError(f"unknown field {field}")
+        return segments
+
+    def query(self, collection=None, limit=None, **filters):
+        """
+        Investments matching all filters, in collection and source order.
+
+        Filters are field=value (or a list of values) and, for the date
+        fields, field=(start, end) with ISO dates, either bound may be None,
+        or field='YYYY-MM-DD' for a single day. String values are converted
+        to the type of a numeric or boolean field; a field no collection
+        has raises ValueError.
+        """
+        results = []
+        for segment in self._filtered_segments(collection, filters):
+            records = segment.records
+            for position in segment.select(filters):
+                if limit is not None and len(results) >= limit:
+                    return results
+                results.append(records[position])
+        return results
+
+    def count(self, collection=None, **filters):
+        return sum(len(segment.select(filters)) for segment in self._filtered_segments(collection, filters))
+
+    def aggregate(self, group_by, sums=('investmentAmount', 'remainingCapital'), collection=None, **filters):
+        """{group value: {'count': n, field: sum, ...}} over the matching investments"""
+        groups = {}
+        for segment in self._filtered_segments(collection, filters):
+            records = segment.records
+            for position in segment.select(filters):
+                record = records[position]
+                key = field_value(record, group_by)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = dict.fromkeys(sums, 0.0)
+                    group['count'] = 0
+                group['count'] += 1
+                for field in sums:
+                    value = record.get(field)
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        group[field] += value
+        return groups
+
+    def investors(self, collection=None, **filters):
+        """Clients holding at least one matching investment (first-seen order)"""
+        seen = {}
+        for investment in self.query(collection, **filters):
+            client_id = investment.get('clientId')
+            if client_id and client_id not in seen:
+                seen[client_id] = self.clients_by_id.get(str(client_id)) or {
+                    'id': client_id, 'fullName': investment.get('clientName')}
+        return list(seen.values())
+
+    def majority(self):
+        """MajorityControl over the loaded data, recomputed after a reload"""
+        with self._lock:
+            if self._majority is None:
+                from majority_control import MajorityControl
+                control = MajorityControl()
+                for segment in self._segments(None):
+                    for record in segment.records:
+                        control.add(record)
+                self._majority = control.compute(self.clients)
+            return self._majority
+
+    def client(self, client_id):
+        return self.clients_by_id.get(str(client_id))
+
+    def stats(self):
+        return {
+            'collections': {name: len(segment.records) for name, segment in self.segments.items()},
+            'clients': len(self.clients),
+            'indexedFields': list(INDEXED_FIELDS),
+            'dateFields': list(DATE_FIELDS),
+        }
+
+
+def parse_filters(params):
+    """Query-string parameters -> query() filters (comma lists, start..end ranges, single days)"""
+    filters = {}
+    for field, values in params.items():
+        value = values[-1]
+        if field in DATE_FIELDS:
+            if '..' in value:
+                start, _, end = value.partition('..')
+                filters[field] = (start or None, end or None)
+            else:
+                filters[field] = value
+        elif ',' in value:
+            filters[field] = value.split(',')
+        else:
+            filters[field] = value
+    return filters
+
+
+def _make_handler(service):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False, default=plain).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            collection = params.pop('collection', [None])[-1]
+            collection = collection.split(',') if collection else None
+            limit = params.pop('limit', [None])[-1]
+
+            try:
+                limit = int(limit) if limit else None
+            except ValueError:
+                limit = -1
+            if limit is not None and limit < 0:
+                self._send(400, {'error': 'limit must be a non-negative integer'})
+                return
+
+            service.refresh()
+            start = time.perf_counter()
+            try:
+                payload = self._dispatch(url, params, collection, limit)
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            if payload is None:
+                return
+            payload['elapsedMs'] = round((time.perf_counter() - start) * 1000, 3)
+            self._send(200, payload)
+
+        def _dispatch(self, url, params, collection, limit):
+            """Payload of a 200 response, or None when an error was already sent"""
+            if url.path == '/query':
+                records = service.query(collection, limit, **parse_filters(params))
+                payload = {'count': len(records), 'results': records}
+            elif url.path == '/aggregate':
+                group_by = params.pop('groupBy', ['productName'])[-1]
+                sums = params.pop('sum', ['investmentAmount,remainingCapital'])[-1].split(',')
+                payload = {'groups': service.aggregate(group_by, sums, collection, **parse_filters(params))}
+            elif url.path == '/investors':
+                payload = {'results': service.investors(collection, **parse_filters(params))}
+            elif url.path.startswith('/clients/'):
+                client = service.client(unquote(url.path[len('/clients/'):]))
+                self._send(200, client) if client is not None else self._send(404, {'error': 'client not found'})
+                return None
+            elif url.path == '/majority':
+                control = service.majority()
+                names = params.get('productName')
+                try:
+                    payload = control.product(names[-1]) if names else control.to_dict()
+                except KeyError:
+                    self._send(404, {'error': f'unknown product {names[-1]}'})
+                    return None
+            elif url.path == '/stats':
+                payload = service.stats()
+            else:
+                self._send(404, {'error': f'unknown endpoint {url.path}'})
+                return None
+            return payload
+
+        def log_message(self, format, *args):
+            pass
+
+    return QueryHandler
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    print(f"🌐 Query service on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Indexed queries over the *_extracted.json files')
+    parser.add_argument('output_dir', nargs='?', default='.', help='Directory with *_extracted.json')
+    parser.add_argument('--serve', action='store_true', help='Start the local HTTP endpoint')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--where', action='append', default=[], metavar='FIELD=VALUE',
+                        help='Filter (repeatable); dates as FIELD=START..END')
+    parser.add_argument('--group-by', help='Aggregate matching investments by this field')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = QueryService(args.output_dir)
+    loaded = service.stats()
+    print(f"📚 Loaded {sum(loaded['collections'].values())} investments and {loaded['clients']} clients "
+          f"in {time.perf_counter() - start:.3f}s")
+
+    if args.serve:
+        serve(service, args.host, args.port)
+        return
+
+    filters = parse_filters({field: [value] for field, _, value in (item.partition('=') for item in args.where)})
+    start = time.perf_counter()
+    try:
+        if args.group_by:
+            groups = service.aggregate(args.group_by, **filters)
+        else:
+            records = service.query(**filters)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    elapsed = time.perf_counter() - start
+    if args.group_by:
+        for key, group in sorted(groups.items(), key=lambda item: -item[1]['remainingCapital']):
+            print(f"  {key}: {group['count']} investments, remaining {group['remainingCapital']:,.2f}")
+    else:
+        for record in records[:20]:
+            print(f"  {record['id']}: {record.get('clientName')} | {field_value(record, 'productName')} | "
+                  f"{record.get('remainingCapital', 0.0):,.2f}")
+        print(f"  ... {len(records)} investments")
+    print(f"⚡ Query answered in {elapsed * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
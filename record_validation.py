@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Single-pass validation of extractor output against the Flutter models.
+
+Schemas are read from the Dart sources themselves (lib/models/*.dart,
+tokenized with dart_lexer.py): every `final Type name;` field of the model
+class gives the expected JSON type and nullability, and `required this.name`
+in the unnamed constructor marks the fields a document must contain.
+
+    String, enums        str
+    double               float or int (and >= 0: amounts and measures)
+    int / bool           int / bool
+    DateTime             ISO-8601 string ("2019-01-30T00:00:00.000Z")
+    Map / other classes  object,  List  array
+
+plus the date order signedDate <= investmentEntryDate <= maturityDate
+(redemptionDate for apartments).
+
+RecordValidator is a run_extraction consumer, so records are checked while
+they stream through the engine (`extraction_engine.py --validate`) instead
+of being read back from disk by separate tools. Issues are not reported
+one by one: they are counted per (collection, rule, field) with a few
+reservoir-sampled examples each and written as one validation_report.json.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+from compact_records import as_dict
+from dart_lexer import IDENT, PUNCT, matching_bracket, tokenize
+
+MODELS = {
+    'bonds': ('lib/models/bond.dart', 'Bond'),
+    'shares': ('lib/models/share.dart', 'Share'),
+    'loans': ('lib/models/loan.dart', 'Loan'),
+    'apartments': ('lib/models/apartment.dart', 'Apartment'),
+    'clients': ('lib/models/client.dart', 'Client'),
+}
+COLLECTION_FILES = {collection: f"{collection}_extracted.json" for collection in MODELS}
+REPORT_FILE = 'validation_report.json'
+MODELS_ROOT = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_SIZE = 5
+# Dates that must not decrease; a tuple takes the first field a collection has
+DATE_ORDER = ('signedDate', 'investmentEntryDate', ('maturityDate', 'redemptionDate'))
+
+FieldRule = namedtuple('FieldRule', 'name dart_type kind nullable required')
+
+# Dart type -> kind; enums map to 'enum', other classes to 'object'
+_DART_KINDS = {
+    'String': 'str', 'double': 'float', 'num': 'float', 'int': 'int', 'bool': 'bool',
+    'DateTime': 'date', 'Map': 'map', 'List': 'list', 'dynamic': None, 'Object': None,
+}
+# Kind -> accepted JSON value classes (exact classes: a bool is not an int here)
+_KIND_CLASSES = {
+    'str': (str,), 'enum': (str,), 'date': (str,), 'float': (float, int), 'int': (int,),
+    'bool': (bool,), 'map': (dict,), 'object': (dict,), 'list': (list,),
+}
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?')
+_MISSING = object()
+DATE_CACHE_SIZE = 4096
+
+
+class _DateCheck(dict):
+    """date text -> whether it is ISO-8601; extracted dates repeat, so the regex runs once per value"""
+
+    def __missing__(self, value):
+        if len(self) >= DATE_CACHE_SIZE:
+            self.clear()
+        valid = self[value] = _ISO_DATE.fullmatch(value) is not None
+        return valid
+
+
+def parse_model(source, class_name):
+    """[FieldRule] for the instance fields of `class_name` in a Dart source"""
+    tokens = list(tokenize(source))
+    enums = {tokens[i + 1].text for i, token in enumerate(tokens[:-1])
+             if token.kind == IDENT and token.text == 'enum' and tokens[i + 1].kind == IDENT}
+
+    start = next((i for i in range(len(tokens) - 1)
+                  if tokens[i].text == 'class' and tokens[i + 1].text == class_name), None)
+    if start is None:
+        raise ValueError(f"class {class_name} not found")
+    body = next(i for i in range(start, len(tokens)) if tokens[i].kind == PUNCT and tokens[i].text == '{')
+    end = matching_bracket(tokens, body)
+    if end is None:
+        raise ValueError(f"class {class_name} has unbalanced brackets")
+
+    fields = []
+    required = set()
+    position = body + 1
+    while position < end:
+        token = tokens[position]
+        if token.kind == PUNCT and token.text in '([{':
+            closing = matching_bracket(tokens, position)
+            # Unnamed constructor: `ClassName({... required this.name ...})`
+            if token.text == '(' and tokens[position - 1].text == class_name and tokens[position - 2].text != '.':
+                for i in range(position, closing - 2):
+                    if tokens[i].text == 'required' and tokens[i + 1].text == 'this' and tokens[i + 2].text == '.':
+                        required.add(tokens[i + 3].text)
+            position = closing + 1
+            continue
+        if token.text == 'final' and tokens[position - 1].text != 'static':
+            semicolon = position
+            while tokens[semicolon].text not in (';', '=', '{', '('):
+                semicolon += 1
+            if tokens[semicolon].text == ';':
+                name = tokens[semicolon - 1].text
+                type_tokens = [t.text for t in tokens[position + 1:semicolon - 1]]
+                nullable = type_tokens[-1:] == ['?']
+                base = type_tokens[0] if type_tokens else 'dynamic'
+                kind = _DART_KINDS.get(base, 'enum' if base in enums else 'object')
+                fields.append(FieldRule(name, ''.join(type_tokens), kind, nullable, False))
+            position = semicolon + 1
+            continue
+        position += 1
+
+    return [rule._replace(required=rule.name in required) for rule in fields]
+
+
+def _order_local(name):
+    return f"order_{name}"
+
+
+def load_schemas(root=MODELS_ROOT, models=MODELS):
+    """{collection: [FieldRule]} from the Dart model sources under `root`"""
+    schemas = {}
+    for collection, (path, class_name) in models.items():
+        with open(os.path.join(root, path), 'r', encoding='utf-8') as file:
+            schemas[collection] = parse_model(file.read(), class_name)
+    return schemas
+
+
+class _Issue:
+    __slots__ = ('count', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.samples = []
+
+
+class RecordValidator:
+    """
+    Validates records against the model schemas; usable as a
+    run_extraction consumer: validator(collection, record).
+
+    Each collection gets a generated check function (like the transforms
+    in field_mapping.py) that costs one class test per field for a valid
+    record; only a failing test calls back into _field_issue to find out
+    which rule was broken.
+    """
+
+    def __init__(self, schemas=None, sample_size=SAMPLE_SIZE, seed=0):
+        self.schemas = load_schemas() if schemas is None else schemas
+        self.sample_size = sample_size
+        self.records = {}
+        self.invalid = {}
+        self.issues = {}
+        self._random = random.Random(seed)
+        self._checks = {collection: self._compile(collection, rules) for collection, rules in self.schemas.items()}
+
+    def _compile(self, collection, rules):
+        order = []
+        names = {rule.name for rule in rules}
+        for step in DATE_ORDER:
+            present = [name for name in (step if isinstance(step, tuple) else (step,)) if name in names]
+            if present:
+                order.append(present[0])
+
+        lines = [
+            "def check(record):",
+            "    get = record.get",
+            "    problems = 0",
+        ]
+        checked = [rule for rule in rules if rule.kind in _KIND_CLASSES]
+        for index, rule in enumerate(checked):
+            classes = _KIND_CLASSES[rule.kind]
+            accepted = ' or '.join(f"value.__class__ is {cls.__name__}" for cls in classes)
+            # Anything but an accepted class or an allowed empty value is an issue
+            allowed = (['value is not None'] if rule.nullable else []) + \
+                ([] if rule.required else ['value is not _MISSING'])
+            lines.append(f"    value = get({rule.name!r}, _MISSING)")
+            lines.append(f"    if {accepted}:")
+            if rule.kind == 'float':
+                lines.append("        if value < 0:")
+                lines.append(f"            problems += issue(RULES[{index}], record, value)")
+            elif rule.kind == 'date':
+                lines.append("        if not valid_date[value]:")
+                lines.append(f"            problems += issue(RULES[{index}], record, value)")
+            else:
+                lines.append("        pass")
+            if rule.name in order:
+                lines.append(f"        {_order_local(rule.name)} = value")
+            lines.append(f"    elif {' and '.join(allowed)}:" if allowed else "    else:")
+            lines.append(f"        problems += issue(RULES[{index}], record, value)")
+        lines[3:3] = [f"    {_order_local(name)} = None" for name in order]
+        if len(order) > 1:
+            lines.append(f"    problems += date_order(record, ({', '.join(_order_local(name) for name in order)},))")
+        lines.append("    return problems")
+
+        source = '\n'.join(lines) + '\n'
+        namespace = {
+            '_MISSING': _MISSING, 'RULES': checked, 'valid_date': _DateCheck(),
+            'issue': lambda rule, record, value: self._field_issue(collection, rule, record, value),
+            'date_order': lambda record, values: self._date_order(collection, order, record, values),
+        }
+        exec(compile(source, f"<record_validation:{collection}>", 'exec'), namespace)
+        check = namespace['check']
+        check.__source__ = source
+        return check
+
+    def _field_issue(self, collection, rule, record, value):
+        if value is _MISSING:
+            name = 'missingField'
+        elif value is None:
+            name = 'nullField'
+        elif value.__class__ not in _KIND_CLASSES[rule.kind]:
+            name = 'wrongType'
+        elif rule.kind == 'float':
+            name = 'negativeAmount'
+        else:
+            name = 'badDate'
+        self._report(collection, name, rule.name, record, value)
+        return 1
+
+    def _date_order(self, collection, names, record, values):
+        problems = 0
+        previous_name = previous = None
+        for name, value in zip(names, values):
+            if value is None or len(value) < 10:
+                continue
+            day = value[:10]
+            if previous is not None and day < previous:
+                self._report(collection, 'dateOrder', f"{previous_name} <= {name}", record,
+                             [record.get(previous_name), value])
+                problems += 1
+            previous_name, previous = name, day
+        return problems
+
+    def _report(self, collection, rule, field, record, value):
+        key = (collection, rule, field)
+        issue = self.issues.get(key)
+        if issue is None:
+            issue = self.issues[key] = _Issue()
+        issue.count += 1
+        sample = {'id': record.get('id') or record.get('saleId'), 'value': None if value is _MISSING else value}
+        # Reservoir sampling: every occurrence has the same chance to be kept
+        if len(issue.samples) < self.sample_size:
+            issue.samples.append(sample)
+        else:
+            slot = self._random.randrange(issue.count)
+            if slot < self.sample_size:
+                issue.samples[slot] = sample
+
+    def __call__(self, collection, record):
+        check = self._checks.get(collection)
+        if check is None:
+            return True
+        self.records[collection] = self.records.get(collection, 0) + 1
+        # Compact records answer get() in Python; one to_dict() is cheaper
+        problems = check(as_dict(record))
+        if problems:
+            self.invalid[collection] = self.invalid.get(collection, 0) + 1
+        return not problems
+
+    def validate_all(self, collection, records):
+        for record in records:
+            self(collection, record)
+
+    def issue_count(self):
+        return sum(issue.count for issue in self.issues.values())
+
+    def to_dict(self):
+        issues = sorted(self.issues.items(), key=lambda item: (-item[1].count, item[0]))
+        return {
+            'validatedAt': datetime.now().isoformat(),
+            'models': {collection: f"{path}:{class_name}" for collection, (path, class_name) in MODELS.items()
+                       if collection in self.schemas},
+            'records': self.records,
+            'invalidRecords': self.invalid,
+            'issues': [
+                {'collection': collection, 'rule': rule, 'field': field, 'count': issue.count,
+                 'samples': issue.samples}
+                for (collection, rule, field), issue in issues
+            ],
+        }
+
+    def write(self, output_dir='.'):
+        path = os.path.join(output_dir, REPORT_FILE)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2, ensure_ascii=False, default=str)
+        return path
+
+    def print_summary(self, limit=10):
+        checked = sum(self.records.values())
+        invalid = sum(self.invalid.values())
+        print(f"🔎 Validated {checked} records: {invalid} with issues, {self.issue_count()} issues")
+        for (collection, rule, field), issue in sorted(self.issues.items(), key=lambda item: -item[1].count)[:limit]:
+            print(f"  ⚠️  {collection}: {rule} {field} ×{issue.count}")
+
+
+def main():
+    from json_stream import iter_records
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+
+    validator = RecordValidator()
+    found = False
+    for collection, filename in COLLECTION_FILES.items():
+        path = os.path.join(output_dir, filename)
+        if os.path.exists(path):
+            found = True
+            validator.validate_all(collection, iter_records(path))
+    if not found:
+        print(f"❌ No *_extracted.json files found in {output_dir}")
+        sys.exit(1)
+
+    validator.print_summary()
+    print(f"📝 Report written to {validator.write(output_dir)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,100 +2,238 @@
 """
 Skrypt do usuwania wszystkich wywołań print() z plików Dart.
 Obsługuje wieloliniowe wywołania print i zachowuje formatowanie.
+
+Wywołania są wyszukiwane na tokenach z dart_lexer.py, więc nawiasy w
+stringach i komentarzach nie psują dopasowania. Usuwane są tylko pełne
+instrukcje `print(...);` (nie `if (x) print(...);` ani `=> print(...)`),
+także po `case ...:`, `default:` i etykiecie (ale nie po `?:`).
+
+Katalogi są przetwarzane rekurencyjnie w puli procesów. Skróty treści
+plików bez print() trafiają do cache (.dart_tool/remove_prints_cache.json),
+więc kolejne uruchomienia pomijają niezmienione pliki bez ich analizy.
 """
 
+import argparse
+import hashlib
+import json
+import os
 import re
-import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from dart_lexer import IDENT, PUNCT, matching_bracket, tokenize
+
+CACHE_FILE = Path('.dart_tool') / 'remove_prints_cache.json'
+# Zmiana reguł usuwania unieważnia cache
+CACHE_VERSION = 2
+
+# Token poprzedzający samodzielną instrukcję
+_STATEMENT_BOUNDARY = frozenset({';', '{', '}'})
+_OPENING = frozenset({'(', '[', '{'})
+_CLOSING = frozenset({')', ']', '}'})
+_BLANK_LINE_BEFORE = re.compile(r'\n[ \t]*\n[ \t]*$')
+_BLANK_LINE_AFTER = re.compile(r'[ \t]*\n')
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _ends_case_or_label(tokens: list, colon: int) -> bool:
+    """Czy `:` kończy `case ...:`, `default:` lub etykietę (a nie `?:` czy wpis mapy)."""
+    if colon > 0 and tokens[colon - 1].kind == IDENT and (
+            colon == 1 or tokens[colon - 2].text in _STATEMENT_BOUNDARY):
+        return True
+    # Cofaj się do początku instrukcji; `case` musi ją otwierać, a ten `:` być jego pierwszym
+    depth = 0
+    position = colon - 1
+    while position >= 0:
+        text = tokens[position].text
+        if text in _CLOSING:
+            depth += 1
+        elif text in _OPENING:
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0 and text == ';':
+            break
+        elif depth == 0 and text == ':':
+            return False
+        position -= 1
+    first = tokens[position + 1]
+    return first.kind == IDENT and first.text == 'case'
+
+
+def _starts_statement(tokens: list, index: int) -> bool:
+    if index == 0 or tokens[index - 1].text in _STATEMENT_BOUNDARY:
+        return True
+    return tokens[index - 1].text == ':' and _ends_case_or_label(tokens, index - 1)
+
+
+def find_print_statements(content: str) -> list[tuple[int, int]]:
+    """Zakresy (start, koniec) instrukcji `print(...);` w kolejności występowania."""
+    tokens = list(tokenize(content))
+    spans = []
+    index = 0
+    while index < len(tokens) - 1:
+        token = tokens[index]
+        if (token.kind == IDENT and token.text == 'print'
+                and tokens[index + 1].text == '('
+                and _starts_statement(tokens, index)):
+            closing = matching_bracket(tokens, index + 1)
+            if closing is not None and closing + 1 < len(tokens):
+                semicolon = tokens[closing + 1]
+                if semicolon.kind == PUNCT and semicolon.text == ';':
+                    spans.append((token.start, semicolon.end))
+                    index = closing + 2
+                    continue
+        index += 1
+    return spans
+
+
+def _line_span(content: str, start: int, end: int) -> tuple[int, int]:
+    """Rozszerza zakres do pełnych linii, jeśli instrukcja stoi w nich sama."""
+    line_start = content.rfind('\n', 0, start) + 1
+    line_end = content.find('\n', end)
+    line_end = len(content) if line_end == -1 else line_end + 1
+    if content[end:line_end].strip():
+        return start, end
+    if content[line_start:start].strip():
+        # `case 1: print(x);` - bez spacji na końcu linii
+        return len(content[:start].rstrip(' \t')), end
+    return line_start, line_end
+
+
+def remove_prints_from_source(content: str) -> tuple[int, str]:
+    spans = find_print_statements(content)
+    if not spans:
+        return 0, content
+
+    pieces = []
+    position = 0
+    for start, end in spans:
+        start, end = _line_span(content, start, end)
+        start = max(start, position)
+        pieces.append(content[position:start])
+        position = end
+        # Nie zostawiaj dwóch pustych linii w miejscu usuniętego print
+        if _BLANK_LINE_BEFORE.search(content, 0, start):
+            blank = _BLANK_LINE_AFTER.match(content, position)
+            if blank is not None:
+                position = blank.end()
+    pieces.append(content[position:])
+    return len(spans), ''.join(pieces)
+
 
 def remove_prints_from_file(file_path: Path) -> tuple[int, str]:
     """
     Usuwa wszystkie wywołania print() z pliku Dart.
     Zwraca (liczba_usunięć, nowa_zawartość).
     """
-    content = file_path.read_text(encoding='utf-8')
-    original_content = content
-    
-    # Pattern dla print() - obsługuje wieloliniowe wywołania
-    # Dopasowuje: print(...), print('...'), print("..."), print('''...'''), etc.
-    pattern = r'^\s*print\s*\([^;]*?\);\s*$'
-    
-    # Usuń wszystkie linie zawierające print (pojedyncze linie)
-    lines = content.split('\n')
-    new_lines = []
-    removed_count = 0
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i]
-        
-        # Sprawdź czy linia zawiera początek print(
-        if re.search(r'^\s*print\s*\(', line):
-            # Znajdź koniec wywołania print (może być wieloliniowe)
-            full_print = line
-            paren_count = line.count('(') - line.count(')')
-            
-            # Jeśli nie zamknięto nawiasów, czytaj kolejne linie
-            j = i + 1
-            while paren_count > 0 and j < len(lines):
-                full_print += '\n' + lines[j]
-                paren_count += lines[j].count('(') - lines[j].count(')')
-                j += 1
-            
-            # Sprawdź czy to kompletne wywołanie print
-            if paren_count == 0 and full_print.rstrip().endswith(';'):
-                # Pomiń wszystkie linie tego wywołania print
-                i = j
-                removed_count += 1
-                continue
-        
-        new_lines.append(line)
-        i += 1
-    
-    new_content = '\n'.join(new_lines)
-    
-    # Usuń puste linie podwójne (zostaw maksymalnie 2 puste linie pod rząd)
-    new_content = re.sub(r'\n\n\n+', '\n\n', new_content)
-    
-    return removed_count, new_content
+    return remove_prints_from_source(file_path.read_text(encoding='utf-8'))
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python remove_prints.py <file1.dart> [file2.dart ...]")
-        sys.exit(1)
-    
-    total_removed = 0
-    
-    for file_arg in sys.argv[1:]:
-        file_path = Path(file_arg)
-        
-        if not file_path.exists():
-            print(f"❌ Plik nie istnieje: {file_path}")
-            continue
-        
-        if not file_path.suffix == '.dart':
-            print(f"⚠️  Pomijam nie-dartowy plik: {file_path}")
+def _process(job):
+    """Worker: (ścieżka, dry_run) -> (ścieżka, liczba_usunięć, skrót_wyniku, błąd)"""
+    path, dry_run = job
+    try:
+        data = Path(path).read_bytes()
+        removed, new_content = remove_prints_from_source(data.decode('utf-8'))
+        if removed:
+            data = new_content.encode('utf-8')
+            if not dry_run:
+                Path(path).write_bytes(data)
+        return path, removed, content_hash(data), None
+    except Exception as e:
+        return path, 0, None, str(e)
+
+
+def load_cache(path: Path = CACHE_FILE) -> set[str]:
+    try:
+        cache = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return set()
+    if cache.get('version') != CACHE_VERSION:
+        return set()
+    return set(cache.get('clean', ()))
+
+
+def save_cache(clean: set[str], path: Path = CACHE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps({'version': CACHE_VERSION, 'clean': sorted(clean)}), encoding='utf-8')
+    os.replace(temporary, path)
+
+
+def collect_dart_files(paths: list[str]) -> list[Path]:
+    files = []
+    for argument in paths:
+        path = Path(argument)
+        if path.is_dir():
+            files.extend(sorted(path.rglob('*.dart')))
+        elif not path.exists():
+            print(f"❌ Plik nie istnieje: {path}")
+        elif path.suffix != '.dart':
+            print(f"⚠️  Pomijam nie-dartowy plik: {path}")
+        else:
+            files.append(path)
+    return files
+
+
+def remove_prints(paths: list[str], jobs: int | None = None, dry_run: bool = False,
+                  use_cache: bool = True) -> dict:
+    """Usuwa print() ze wszystkich plików/katalogów; zwraca statystyki przebiegu."""
+    files = collect_dart_files(paths)
+    cache = load_cache() if use_cache else set()
+
+    pending = []
+    skipped = 0
+    for path in files:
+        if content_hash(path.read_bytes()) in cache:
+            skipped += 1
+        else:
+            pending.append((str(path), dry_run))
+
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_process, pending, chunksize=8))
+    else:
+        results = [_process(job) for job in pending]
+
+    statistics = {'files': len(files), 'cached': skipped, 'removed': 0, 'changed': [], 'errors': []}
+    for path, removed, final_hash, error in results:
+        if error is not None:
+            statistics['errors'].append((path, error))
             continue
-        
-        print(f"🔄 Przetwarzam: {file_path}")
-        
-        try:
-            removed, new_content = remove_prints_from_file(file_path)
-            
-            if removed > 0:
-                # Zapisz nową zawartość
-                file_path.write_text(new_content, encoding='utf-8')
-                print(f"  ✅ Usunięto {removed} wywołań print()")
-                total_removed += removed
-            else:
-                print(f"  ℹ️  Brak print() do usunięcia")
-        
-        except Exception as e:
-            print(f"  ❌ Błąd: {e}")
-    
-    print(f"\n🎯 PODSUMOWANIE: Usunięto łącznie {total_removed} wywołań print()")
+        if removed:
+            statistics['removed'] += removed
+            statistics['changed'].append((path, removed))
+        if not dry_run or not removed:
+            cache.add(final_hash)
+
+    if use_cache:
+        save_cache(cache)
+    return statistics
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Usuwa wywołania print() z plików Dart')
+    parser.add_argument('paths', nargs='+', help='Pliki .dart lub katalogi (np. lib/)')
+    parser.add_argument('--jobs', type=int, default=None, help='Liczba procesów (domyślnie: liczba CPU)')
+    parser.add_argument('--dry-run', action='store_true', help='Tylko pokaż, co zostałoby usunięte')
+    parser.add_argument('--no-cache', action='store_true', help='Analizuj wszystkie pliki, bez cache')
+    args = parser.parse_args()
+
+    statistics = remove_prints(args.paths, args.jobs, args.dry_run, not args.no_cache)
+
+    for path, removed in statistics['changed']:
+        print(f"  ✅ {path}: {'do usunięcia' if args.dry_run else 'usunięto'} {removed} wywołań print()")
+    for path, error in statistics['errors']:
+        print(f"  ❌ {path}: Błąd: {error}")
+
+    print(f"\n🎯 PODSUMOWANIE: {'Do usunięcia' if args.dry_run else 'Usunięto łącznie'} "
+          f"{statistics['removed']} wywołań print() w {len(statistics['changed'])} plikach "
+          f"({statistics['files']} plików, {statistics['cached']} bez zmian z cache)")
 
 
 if __name__ == '__main__':
@@ -1,112 +1,65 @@
 #!/usr/bin/env python3
 """
-Skrypt do usuwania nieużywanych metod z pliku premium_investor_analytics_screen.dart
+Skrypt do usuwania nieużywanych prywatnych metod z plików Dart.
+
+Nieużywane metody wyznacza indeks deklaracji i referencji całego projektu
+(dart_symbol_index.py): metoda `_nazwa` jest martwa, jeśli nie prowadzi do
+niej żadna referencja z kodu publicznego ani z innej żywej metody tej samej
+biblioteki. Wszystkie martwe metody są usuwane w jednym przebiegu, a indeks
+(.dart_tool/dart_symbol_index.json) jest aktualizowany przyrostowo.
 """
 
-import re
+import argparse
+import os
+from collections import defaultdict
+
+from dart_symbol_index import DEFAULT_ROOT, SymbolIndex, remove_declarations
+
+
+def remove_unused_methods(root=DEFAULT_ROOT, files=None, dry_run=False):
+    """
+    Usuń nieużywane metody; zwraca ({plik: [deklaracje]}, [pliki pominięte
+    z powodu niezbalansowanych nawiasów]).
+    """
+    index = SymbolIndex(root)
+    index.update()
+
+    unused = defaultdict(list)
+    selected = {os.path.normpath(path) for path in files} if files else None
+    for path, declaration in index.unreachable():
+        if selected is None or os.path.normpath(path) in selected:
+            unused[path].append(declaration)
+
+    if not dry_run:
+        for path, declarations in unused.items():
+            new_content = remove_declarations(path, declarations)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            index.refresh(path)
+    index.save()
+    return unused, index.unbalanced()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Usuwa nieużywane prywatne metody z plików Dart')
+    parser.add_argument('root', nargs='?', default=DEFAULT_ROOT, help=f'Katalog projektu (domyślnie: {DEFAULT_ROOT})')
+    parser.add_argument('--file', action='append', dest='files', help='Ogranicz usuwanie do podanych plików')
+    parser.add_argument('--dry-run', action='store_true', help='Tylko wypisz nieużywane metody')
+    args = parser.parse_args()
+
+    unused, unbalanced = remove_unused_methods(args.root, args.files, args.dry_run)
+
+    for path, declarations in unused.items():
+        print(f"📄 {path}")
+        for declaration in declarations:
+            print(f"  {'Nieużywana' if args.dry_run else 'Usuwam'} {declaration['name']} (linia {declaration['line']})")
 
-# Nieużywane metody do usunięcia (nazwa i linia początkowa)
-UNUSED_METHODS = [
-    '_buildSortChip',
-    '_exportSelectedInvestors', 
-    '_sendEmailToSelectedInvestors',
-    '_buildInvestorsContent',
-    '_buildMajorityControlSliver',
-    '_buildMajorityHoldersContent',
-    '_exportEmails',
-    '_performMajorityControlAnalysis',
-    '_performVotingDistributionAnalysis',
-    '_showRefreshCacheDialog',
-    '_buildPerformanceGrid',
-    '_buildPerformanceChart',
-    '_buildTrendMetrics',
-    '_buildTrendChart',
-    '_enterSelectionMode',
-    '_mapUnifiedToProductType'
-]
+    for path in unbalanced:
+        print(f"⚠️  Pominięto (niezbalansowane nawiasy): {path}")
 
-def find_method_bounds(lines, method_name, start_line):
-    """Znajdź granice metody - początek i koniec"""
-    # Znajdź dokładną linię z definicją metody
-    method_start = None
-    for i in range(start_line - 1, len(lines)):
-        if method_name in lines[i] and ('(' in lines[i] or '=>' in lines[i]):
-            method_start = i
-            break
-    
-    if method_start is None:
-        return None, None
-    
-    # Znajdź koniec metody poprzez liczenie nawiasów
-    brace_count = 0
-    in_method = False
-    method_end = None
-    
-    for i in range(method_start, len(lines)):
-        line = lines[i].strip()
-        
-        # Rozpoczynamy liczenie nawiasów gdy znajdziemy pierwszy {
-        if '{' in line:
-            in_method = True
-            brace_count += line.count('{')
-            brace_count -= line.count('}')
-        elif in_method:
-            brace_count += line.count('{')
-            brace_count -= line.count('}')
-        
-        # Jeśli wrócimy do zera nawiasów, to jest koniec metody
-        if in_method and brace_count == 0:
-            method_end = i
-            break
-        
-        # Obsługa metod jednoliniowych z =>
-        if '=>' in lines[method_start] and ';' in line:
-            method_end = i
-            break
-    
-    return method_start, method_end
+    count = sum(len(declarations) for declarations in unused.values())
+    print(f"{'Znaleziono' if args.dry_run else 'Usunięto'} {count} nieużywanych metod w {len(unused)} plikach")
 
-def remove_unused_methods():
-    """Usuń nieużywane metody z pliku"""
-    file_path = 'lib/screens/premium_investor_analytics_screen.dart'
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # Zbierz zakresy do usunięcia (odwrotnie, żeby usuwać od końca)
-    ranges_to_remove = []
-    
-    for method_name in UNUSED_METHODS:
-        print(f"Szukam metody: {method_name}")
-        
-        # Znajdź linię z definicją metody
-        for i, line in enumerate(lines):
-            if method_name in line and ('(' in line or '=>' in line):
-                # Sprawdź czy to rzeczywiście definicja metody
-                if re.search(rf'\b{re.escape(method_name)}\s*\(', line) or re.search(rf'\b{re.escape(method_name)}\s*\(.*\)\s*=>', line):
-                    start, end = find_method_bounds(lines, method_name, i + 1)
-                    if start is not None and end is not None:
-                        ranges_to_remove.append((start, end + 1, method_name))
-                        print(f"  Znaleziono na liniach {start + 1}-{end + 1}")
-                        break
-                    else:
-                        print(f"  Nie można znaleźć granic metody")
-                break
-        else:
-            print(f"  Nie znaleziono metody {method_name}")
-    
-    # Usuń od końca pliku, żeby nie popsuć numeracji linii
-    ranges_to_remove.sort(reverse=True)
-    
-    for start, end, method_name in ranges_to_remove:
-        print(f"Usuwam {method_name}: linie {start + 1}-{end}")
-        del lines[start:end]
-    
-    # Zapisz poprawiony plik
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.writelines(lines)
-    
-    print(f"Usunięto {len(ranges_to_remove)} nieużywanych metod")
 
 if __name__ == '__main__':
-    remove_unused_methods()
\ No newline at end of file
+    main()
@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+Content-addressed snapshot store for pipeline outputs.
+
+Replaces ad-hoc full copies (shares_normalized.json.backup_batch_repair,
+clients_normalized.json.backup_20250812_205807, ...) with snapshots that
+store every record once:
+
+    .snapshots/
+        packs/<id>.pack          zlib-compressed objects added by snapshot <id>
+        packs/<id>.idx           object hash -> [offset, length] in the pack
+        snapshots/<id>.json      per file: record keys + object hashes
+
+A JSON array file is split into its records, each stored once as an
+object named by the blake2b hash of its exact source text, and the bytes between records
+(indentation, separators) are kept in the snapshot manifest, so restore()
+rebuilds every file byte for byte. Timestamps (VOLATILE_FIELDS) are cut out
+of the record text into a per-file value table first: a rerun of the
+extractors that only moves createdAt stores no new objects. Files that are
+not a single JSON array (broken backups) are stored as content-defined
+chunks of lines instead.
+
+Creating a snapshot rereads only files whose size or mtime changed and
+compresses only objects the store has not seen into that snapshot's pack,
+so disk use and backup time grow with the changes, not with the dataset.
+
+diff_snapshots() compares two snapshots record by record, keyed by saleId
+(salesId) for investments and id (excelId) for clients; only records whose
+hashes differ are decompressed.
+"""
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+from datetime import datetime
+
+from incremental_extraction import VOLATILE_FIELDS
+
+DEFAULT_STORE = '.snapshots'
+DEFAULT_PATHS = ('split_investment_data_normalized', '*_extracted.json')
+KEY_FIELDS = ('saleId', 'salesId', 'id', 'excelId')
+COMPRESSION_LEVEL = 6
+# Line chunks end after a line whose CRC is 0 modulo this (~32 lines per chunk)
+LINE_CHUNK_MODULUS = 32
+
+# Placeholder for a cut-out volatile value; a raw NUL never occurs in valid JSON text
+_PLACEHOLDER = '\x00'
+_VOLATILE = re.compile(
+    r'("(?:%s)"\s*:\s*)"((?:[^"\\]|\\.)*)"' % '|'.join(re.escape(field) for field in VOLATILE_FIELDS))
+_WHITESPACE = re.compile(r'[ \t\n\r\ufeff]*')
+
+
+def _hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _skip(text, position):
+    return _WHITESPACE.match(text, position).end()
+
+
+def split_array(text):
+    """
+    Split the text of one top-level JSON array into
+    (head, [(start, end, value), ...], gaps, tail) where gaps[i] is the text
+    between record i and i + 1. Returns None when `text` is anything else.
+    """
+    decoder = json.JSONDecoder()
+    start = _skip(text, 0)
+    if not text.startswith('[', start):
+        return None
+    position = _skip(text, start + 1)
+    if text.startswith(']', position):
+        return (text[:position], [], [], text[position:]) if not text[position + 1:].strip() else None
+
+    head = text[:position]
+    records = []
+    gaps = []
+    while True:
+        try:
+            value, end = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            return None
+        records.append((position, end, value))
+        after = _skip(text, end)
+        if text.startswith(',', after):
+            position = _skip(text, after + 1)
+            gaps.append(text[end:position])
+        elif text.startswith(']', after):
+            if text[after + 1:].strip():
+                return None
+            return head, records, gaps, text[end:]
+        else:
+            return None
+
+
+def record_key(value, index):
+    """saleId / salesId for investments, id / excelId for clients, else the position"""
+    if isinstance(value, dict):
+        for field in KEY_FIELDS:
+            key = value.get(field)
+            if key not in (None, '', 'NULL'):
+                return str(key)
+    return f"#{index}"
+
+
+def _template(text, values, value_codes):
+    """Record text with volatile values replaced by placeholders; returns (template, codes)"""
+    codes = []
+
+    def cut(match):
+        code = value_codes.get(match.group(2))
+        if code is None:
+            code = value_codes[match.group(2)] = len(values)
+            values.append(match.group(2))
+        codes.append(code)
+        return match.group(1) + '"' + _PLACEHOLDER + '"'
+
+    return _VOLATILE.sub(cut, text), codes
+
+
+def _fill(template, values, codes):
+    if codes is None:
+        return template
+    parts = template.split(_PLACEHOLDER)
+    if isinstance(codes, int):
+        codes = [codes] * (len(parts) - 1)
+    return ''.join(part + values[code] for part, code in zip(parts, codes)) + parts[-1]
+
+
+def _line_chunks(data):
+    """Content-defined chunks of whole lines: an edit only changes its own chunk"""
+    chunk_start = 0
+    position = 0
+    size = len(data)
+    while position < size:
+        end = data.find(b'\n', position)
+        end = size if end < 0 else end + 1
+        if zlib.crc32(data[position:end]) % LINE_CHUNK_MODULUS == 0 or end == size:
+            yield data[chunk_start:end]
+            chunk_start = end
+        position = end
+
+
+class SnapshotStore:
+    """Objects and snapshot manifests under `root` (see module docstring)"""
+
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = root
+        self.packs_dir = os.path.join(root, 'packs')
+        self.snapshots_dir = os.path.join(root, 'snapshots')
+        self.new_objects = 0
+        self.new_bytes = 0
+        self._index = None
+        self._pack = None
+        self._pack_name = None
+        self._handles = {}
+        self._manifests = {}
+
+    # --- objects ---------------------------------------------------------
+
+    @property
+    def index(self):
+        """object hash -> (pack name, offset, length), read from every .idx once"""
+        if self._index is None:
+            self._index = {}
+            if os.path.isdir(self.packs_dir):
+                for name in sorted(os.listdir(self.packs_dir)):
+                    if name.endswith('.idx'):
+                        with open(os.path.join(self.packs_dir, name), 'r', encoding='utf-8') as file:
+                            for digest, (offset, length) in json.load(file).items():
+                                self._index[digest] = (name[:-4], offset, length)
+        return self._index
+
+    def _begin_pack(self, name):
+        os.makedirs(self.packs_dir, exist_ok=True)
+        self._pack_name = name
+        self._pack = open(os.path.join(self.packs_dir, name + '.pack.partial'), 'wb')
+        self._pack_index = {}
+        self.new_objects = self.new_bytes = 0
+
+    def _commit_pack(self):
+        """Publish the pack written since _begin_pack (nothing if it stayed empty)"""
+        partial = self._pack.name
+        self._pack.close()
+        self._pack = None
+        if not self._pack_index:
+            os.remove(partial)
+            return
+        base = os.path.join(self.packs_dir, self._pack_name)
+        os.replace(partial, base + '.pack')
+        with open(base + '.idx.partial', 'w', encoding='utf-8') as file:
+            json.dump(self._pack_index, file, separators=(',', ':'))
+        os.replace(base + '.idx.partial', base + '.idx')
+
+    def _abort_pack(self):
+        partial = self._pack.name
+        self._pack.close()
+        self._pack = None
+        os.remove(partial)
+        for digest in self._pack_index:
+            self.index.pop(digest, None)
+
+    def put(self, data):
+        """Store bytes once (in the open pack); returns their hash"""
+        digest = _hash(data)
+        if digest not in self.index:
+            compressed = zlib.compress(data, COMPRESSION_LEVEL)
+            offset = self._pack.tell()
+            self._pack.write(compressed)
+            self.index[digest] = (self._pack_name, offset, len(compressed))
+            self._pack_index[digest] = [offset, len(compressed)]
+            self.new_objects += 1
+            self.new_bytes += len(compressed)
+        return digest
+
+    def get(self, digest):
+        name, offset, length = self.index[digest]
+        handle = self._handles.get(name)
+        if handle is None:
+            handle = self._handles[name] = open(os.path.join(self.packs_dir, name + '.pack'), 'rb')
+        handle.seek(offset)
+        return zlib.decompress(handle.read(length))
+
+    def close(self):
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+
+    # --- snapshots -------------------------------------------------------
+
+    def snapshot_ids(self):
+        """All snapshot IDs, oldest first"""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith('.json'))
+
+    def resolve(self, reference):
+        """Snapshot ID from an ID, a unique prefix, 'latest' or 'latest~N'"""
+        ids = self.snapshot_ids()
+        if reference in ids:
+            return reference
+        match = re.fullmatch(r'latest(?:~(\d+))?', reference)
+        if match:
+            back = int(match.group(1) or 0)
+            if back >= len(ids):
+                raise KeyError(f"Only {len(ids)} snapshots in {self.root}")
+            return ids[-1 - back]
+        candidates = [snapshot_id for snapshot_id in ids if snapshot_id.startswith(reference)]
+        if len(candidates) != 1:
+            raise KeyError(f"{'Ambiguous' if candidates else 'Unknown'} snapshot {reference!r}")
+        return candidates[0]
+
+    def _read(self, snapshot_id):
+        manifest = self._manifests.get(snapshot_id)
+        if manifest is None:
+            with open(os.path.join(self.snapshots_dir, snapshot_id + '.json'), 'r', encoding='utf-8') as file:
+                manifest = self._manifests[snapshot_id] = json.load(file)
+        return manifest
+
+    def load(self, reference):
+        """
+        Manifest of a snapshot with every file entry complete. Files left
+        unchanged are stored as {'ref': snapshot ID, size, hash, mtime} and
+        resolved from the snapshot that holds their full entry.
+        """
+        manifest = dict(self._read(self.resolve(reference)))
+        files = {}
+        for path, entry in manifest['files'].items():
+            if 'ref' in entry:
+                entry = dict(self._read(entry['ref'])['files'][path], ref=entry['ref'], mtime=entry.get('mtime'))
+            files[path] = entry
+        manifest['files'] = files
+        return manifest
+
+    def _new_id(self):
+        base = datetime.now().strftime('%Y%m%dT%H%M%S')
+        snapshot_id, suffix = base, 1
+        while os.path.exists(os.path.join(self.snapshots_dir, snapshot_id + '.json')):
+            suffix += 1
+            snapshot_id = f"{base}-{suffix}"
+        return snapshot_id
+
+    def _store_file(self, data):
+        """Manifest entry for one file's bytes, writing its new objects"""
+        entry = {'size': len(data), 'hash': _hash(data)}
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            text = None
+        parts = split_array(text) if text is not None else None
+        if parts is None:
+            entry['format'] = 'lines'
+            entry['chunks'] = [self.put(chunk) for chunk in _line_chunks(data)]
+            return entry
+
+        head, records, gaps, tail = parts
+        values, value_codes = [], {}
+        entries = []
+        keys = {}
+        for index, (start, end, value) in enumerate(records):
+            template, codes = _template(text[start:end], values, value_codes)
+            key = record_key(value, index)
+            keys[key] = keys.get(key, 0) + 1
+            if keys[key] > 1:
+                key = f"{key}#{keys[key]}"
+            item = [key, self.put(template.encode('utf-8'))]
+            if codes:
+                item.append(codes[0] if len(set(codes)) == 1 else codes)
+            entries.append(item)
+
+        separator = max(set(gaps), key=gaps.count) if gaps else ''
+        entry.update({
+            'format': 'records',
+            'head': head,
+            'tail': tail,
+            'separator': separator,
+            'gaps': {str(index): gap for index, gap in enumerate(gaps) if gap != separator},
+            'values': values,
+            'records': entries,
+        })
+        return entry
+
+    def create(self, paths=DEFAULT_PATHS, label=None):
+        """Snapshot the given files / directories / globs; returns the manifest"""
+        previous_id = self.resolve('latest') if self.snapshot_ids() else None
+        previous = self.load(previous_id)['files'] if previous_id else {}
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        snapshot_id = self._new_id()
+
+        files = {}
+        self._begin_pack(snapshot_id)
+        try:
+            store_root = os.path.normpath(self.root) + os.sep
+            for path in expand_paths(paths):
+                if (os.path.normpath(path) + os.sep).startswith(store_root):
+                    continue
+                stat = os.stat(path)
+                old = previous.get(path)
+                if old is None or (old['size'], old.get('mtime')) != (stat.st_size, stat.st_mtime_ns):
+                    with open(path, 'rb') as file:
+                        data = file.read()
+                    if old is None or old['hash'] != _hash(data):
+                        entry = self._store_file(data)
+                        entry['mtime'] = stat.st_mtime_ns
+                        files[path] = entry
+                        continue
+                # Unchanged: point at the snapshot holding the full entry
+                files[path] = {'ref': old.get('ref', previous_id), 'size': old['size'], 'hash': old['hash'],
+                               'mtime': stat.st_mtime_ns}
+        except BaseException:
+            self._abort_pack()
+            raise
+        self._commit_pack()
+
+        manifest = {
+            'id': snapshot_id,
+            'createdAt': datetime.now().isoformat(),
+            'label': label,
+            'newObjects': self.new_objects,
+            'newBytes': self.new_bytes,
+            'files': files,
+        }
+        path = os.path.join(self.snapshots_dir, snapshot_id + '.json')
+        with open(path + '.partial', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(path + '.partial', path)
+        return manifest
+
+    # --- restore ---------------------------------------------------------
+
+    def iter_file(self, entry):
+        """Yield the original bytes of one snapshotted file piece by piece"""
+        if entry['format'] == 'lines':
+            for digest in entry['chunks']:
+                yield self.get(digest)
+            return
+
+        values, gaps, separator = entry['values'], entry['gaps'], entry['separator']
+        yield entry['head'].encode('utf-8')
+        last = len(entry['records']) - 1
+        for index, item in enumerate(entry['records']):
+            template = self.get(item[1]).decode('utf-8')
+            text = _fill(template, values, item[2] if len(item) > 2 else None)
+            if index < last:
+                text += gaps.get(str(index), separator)
+            yield text.encode('utf-8')
+        yield entry['tail'].encode('utf-8')
+
+    def restore(self, reference, target_dir='.', paths=None):
+        """Write the files of a snapshot under target_dir; returns the restored paths"""
+        manifest = self.load(reference)
+        selected = set(expand_selection(paths, manifest['files'])) if paths else None
+        restored = []
+        for path, entry in manifest['files'].items():
+            if selected is not None and path not in selected:
+                continue
+            output = os.path.join(target_dir, path)
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            digest = hashlib.blake2b(digest_size=16)
+            with open(output + '.partial', 'wb') as file:
+                for data in self.iter_file(entry):
+                    digest.update(data)
+                    file.write(data)
+            if digest.hexdigest() != entry['hash']:
+                os.remove(output + '.partial')
+                raise ValueError(f"Restored {path} does not match its snapshot hash")
+            os.replace(output + '.partial', output)
+            restored.append(output)
+        return restored
+
+    # --- diff ------------------------------------------------------------
+
+    def record(self, entry, item):
+        """Parsed record of a manifest item (volatile values filled back in)"""
+        template = self.get(item[1]).decode('utf-8')
+        return json.loads(_fill(template, entry['values'], item[2] if len(item) > 2 else None))
+
+
+def field_changes(old, new, prefix=''):
+    """{field: [old, new]} between two records; nested dicts use dotted names"""
+    changes = {}
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return {prefix or '.': [old, new]} if old != new else {}
+    for field in list(old) + [field for field in new if field not in old]:
+        if field in VOLATILE_FIELDS:
+            continue
+        old_value, new_value = old.get(field), new.get(field)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changes.update(field_changes(old_value, new_value, f"{prefix}{field}."))
+        elif old_value != new_value or (field in old) != (field in new):
+            changes[prefix + field] = [old_value, new_value]
+    return changes
+
+
+def diff_snapshots(store, old_reference, new_reference, paths=None):
+    """
+    Yield one change dict per added, removed or changed record between two
+    snapshots ({'path', 'change', 'key'[, 'fields']}), file by file in
+    the newer snapshot's order. Changes limited to VOLATILE_FIELDS are not
+    reported. Files stored as line chunks report a single 'file' change.
+    """
+    old_files = store.load(old_reference)['files']
+    new_files = store.load(new_reference)['files']
+    names = list(new_files) + [path for path in old_files if path not in new_files]
+    if paths:
+        selected = set(expand_selection(paths, {name: None for name in names}))
+        names = [name for name in names if name in selected]
+
+    empty = {'format': 'records', 'records': [], 'values': []}
+    for path in names:
+        old, new = old_files.get(path, empty), new_files.get(path, empty)
+        if old.get('hash') == new.get('hash'):
+            continue
+        if old['format'] == 'lines' or new['format'] == 'lines':
+            yield {'path': path, 'change': 'file', 'key': None}
+            continue
+
+        old_items = {item[0]: item for item in old['records']}
+        seen = set()
+        for item in new['records']:
+            key = item[0]
+            seen.add(key)
+            previous = old_items.get(key)
+            if previous is None:
+                yield {'path': path, 'change': 'added', 'key': key}
+            elif previous[1] != item[1]:
+                fields = field_changes(store.record(old, previous), store.record(new, item))
+                if fields:
+                    yield {'path': path, 'change': 'changed', 'key': key, 'fields': fields}
+        for key in old_items:
+            if key not in seen:
+                yield {'path': path, 'change': 'removed', 'key': key}
+
+
+def expand_paths(paths):
+    """Files named by paths, directories (recursively) and glob patterns, sorted"""
+    files = set()
+    for pattern in paths:
+        for path in glob.glob(pattern) or ([pattern] if os.path.exists(pattern) else []):
+            if os.path.isdir(path):
+                for directory, _, names in os.walk(path):
+                    files.update(os.path.normpath(os.path.join(directory, name)) for name in names)
+            elif os.path.isfile(path):
+                files.add(os.path.normpath(path))
+    return sorted(files)
+
+
+def expand_selection(paths, names):
+    """Snapshot paths selected by file names, directory prefixes or globs"""
+    patterns = [os.path.normpath(path) for path in paths]
+    for name in names:
+        for pattern in patterns:
+            if name == pattern or name.startswith(pattern + os.sep) or fnmatch.fnmatch(name, pattern):
+                yield name
+                break
+
+
+def _format_size(size):
+    return f"{size / 1024:,.1f} KB" if size < 1024 * 1024 else f"{size / 1024 / 1024:,.2f} MB"
+
+
+def _store_size(store):
+    if not os.path.isdir(store.packs_dir):
+        return 0
+    return sum(os.path.getsize(os.path.join(store.packs_dir, name)) for name in os.listdir(store.packs_dir))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed snapshots of the pipeline outputs')
+    parser.add_argument('--store', default=DEFAULT_STORE, help=f'Store directory (default: {DEFAULT_STORE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create = commands.add_parser('create', help='Snapshot files, directories or globs')
+    create.add_argument('paths', nargs='*', default=list(DEFAULT_PATHS))
+    create.add_argument('--label', help='Free-form note stored with the snapshot')
+
+    commands.add_parser('list', help='List snapshots')
+
+    restore = commands.add_parser('restore', help='Restore a snapshot (ID, prefix, latest or latest~N)')
+    restore.add_argument('snapshot')
+    restore.add_argument('--to', default='.', help='Target directory (default: original locations)')
+    restore.add_argument('--path', action='append', dest='paths', help='Restore only these files')
+
+    diff = commands.add_parser('diff', help='Record-level diff between two snapshots')
+    diff.add_argument('old')
+    diff.add_argument('new', nargs='?', default='latest')
+    diff.add_argument('--path', action='append', dest='paths', help='Compare only these files')
+    diff.add_argument('--json', action='store_true', help='Print one JSON object per change')
+
+    args = parser.parse_args()
+    store = SnapshotStore(args.store)
+
+    try:
+        if args.command == 'create':
+            start = datetime.now()
+            manifest = store.create(args.paths, args.label)
+            logical = sum(entry['size'] for entry in manifest['files'].values())
+            seconds = (datetime.now() - start).total_seconds()
+            print(f"📸 Snapshot {manifest['id']}: {len(manifest['files'])} files ({_format_size(logical)}) "
+                  f"in {seconds:.2f}s")
+            print(f"  {manifest['newObjects']} new objects, {_format_size(manifest['newBytes'])} added; "
+                  f"store holds {_format_size(_store_size(store))}")
+
+        elif args.command == 'list':
+            for snapshot_id in store.snapshot_ids():
+                manifest = store.load(snapshot_id)
+                label = f" - {manifest['label']}" if manifest.get('label') else ''
+                print(f"{snapshot_id}  {len(manifest['files']):>3} files  "
+                      f"+{_format_size(manifest['newBytes']):>10}{label}")
+
+        elif args.command == 'restore':
+            restored = store.restore(args.snapshot, args.to, args.paths)
+            print(f"♻️  Restored {len(restored)} files from {store.resolve(args.snapshot)} into {args.to}")
+
+        else:
+            counts = {}
+            for change in diff_snapshots(store, args.old, args.new, args.paths):
+                counts[change['change']] = counts.get(change['change'], 0) + 1
+                if args.json:
+                    print(json.dumps(change, ensure_ascii=False))
+                    continue
+                marker = {'added': '+', 'removed': '-', 'changed': '~', 'file': '!'}[change['change']]
+                print(f"{marker} {change['path']} {change['key'] or '(not a JSON array, file changed)'}")
+                for field, (old, new) in change.get('fields', {}).items():
+                    print(f"    {field}: {old!r} -> {new!r}")
+            if not args.json:
+                summary = ', '.join(f"{count} {change}" for change, count in counts.items()) or 'no changes'
+                print(f"📊 {summary}")
+    except (KeyError, ValueError) as e:
+        print(f"❌ {e.args[0] if isinstance(e, KeyError) else e}")
+        sys.exit(1)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
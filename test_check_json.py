@@ -0,0 +1,75 @@
+"""Tests for check_json's single-pass repair against hand-written expected outputs"""
+
+import pytest
+
+from check_json import CHUNK_SIZE, repair_bytes
+
+CASES = {
+    'bom': (
+        b'\xef\xbb\xbf[{"a": 1}]',
+        b'[{"a": 1}]',
+        ['bom'],
+    ),
+    'trailing commas': (
+        b'[{"a": 1,}, {"b": [1, 2,],},]',
+        b'[{"a": 1}, {"b": [1, 2]}]',
+        ['comma'] * 4,
+    ),
+    'bare nulls': (
+        b'[{"a": NULL, "b": None, "c": undefined, "d": Null}]',
+        b'[{"a": null, "b": null, "c": null, "d": null}]',
+        ['null'] * 4,
+    ),
+    'truncated record': (
+        b'[{"a": 1}, {"b": 2}, {"c": 3',
+        b'[{"a": 1}, {"b": 2}\n]',
+        ['truncated'],
+    ),
+    'truncated after a comma': (
+        b'[{"a": 1}, {"b": 2},',
+        b'[{"a": 1}, {"b": 2}\n]',
+        ['truncated'],
+    ),
+    'truncated object inside a string': (
+        b'{"x": [1, 2], "y": {"z": "abc',
+        b'{"x": [1, 2]\n}',
+        ['truncated', 'truncated'],
+    ),
+    'all fixes at once': (
+        b'\xef\xbb\xbf[{"a": NULL,}, {"b": "x\\"',
+        b'[{"a": null}\n]',
+        ['bom', 'null', 'comma', 'truncated', 'truncated'],
+    ),
+    'defects inside strings are data': (
+        b'[{"a": "NULL, None,]"}]',
+        b'[{"a": "NULL, None,]"}]',
+        [],
+    ),
+    'valid': (
+        b'[{"a": 1}]',
+        b'[{"a": 1}]',
+        [],
+    ),
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, CHUNK_SIZE])
+@pytest.mark.parametrize('data, expected, kinds', CASES.values(), ids=CASES.keys())
+def test_repair(data, expected, kinds, chunk_size):
+    repaired, issues = repair_bytes(data, chunk_size=chunk_size)
+    assert repaired == expected
+    assert [issue.kind for issue in issues] == kinds
+    assert all(issue.fixed for issue in issues)
+
+
+@pytest.mark.parametrize('data', [b'[{"a": 1} {"b": 2}]', b'[{"a": Nul}]'])
+def test_unknown_defects_are_reported_and_copied(data):
+    repaired, issues = repair_bytes(data)
+    assert repaired == data
+    assert [(issue.kind, issue.fixed) for issue in issues] == [('syntax', False)]
+
+
+def test_only_selected_fixes_are_applied():
+    repaired, issues = repair_bytes(b'[{"a": NULL,}]', fixes=('comma',))
+    assert repaired == b'[{"a": NULL}]'
+    assert [(issue.kind, issue.fixed) for issue in issues] == [('null', False), ('comma', True)]
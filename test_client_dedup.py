@@ -0,0 +1,75 @@
+"""Tests for client_dedup.normalize_name and the merges built on it"""
+
+import pytest
+
+from client_dedup import ClientDeduplicator, normalize_name
+
+
+@pytest.mark.parametrize('name, key', [
+    ('Joanna Kosa', 'joanna kosa'),
+    ('Joanna Kość', 'joanna kosc'),
+    ('Anna Rusa', 'anna rusa'),
+    ('Krystyna Aleksa', 'krystyna aleksa'),
+    ('Jan Spak', 'jan spak'),
+    ('Kosa', 'kosa'),
+])
+def test_surnames_ending_like_a_suffix_are_kept(name, key):
+    assert normalize_name(name) == key
+
+
+@pytest.mark.parametrize('name, key', [
+    ('X Sp. z o.o.', 'x'),
+    ('ABC Sp. z o.o.', 'abc'),
+    ('abc sp.z o.o', 'abc'),
+    ('Y S.A.', 'y'),
+    ('Y SA', 'y'),
+    ('Z sp.k.', 'z'),
+    ('Z Sp. k.', 'z'),
+    ('Kowalski Sp. J.', 'kowalski'),
+    ('Budimex Spółka Akcyjna', 'budimex'),
+    ('Firma, S.C.', 'firma'),
+    ('Kosa S.A.', 'kosa'),
+])
+def test_company_suffixes_are_removed(name, key):
+    assert normalize_name(name) == key
+
+
+def test_lone_suffix_is_not_emptied():
+    assert normalize_name('S.A.') == 's a'
+
+
+def test_different_people_are_not_merged():
+    deduplicator = ClientDeduplicator()
+    for index, name in enumerate(('Joanna Kosa', 'Joanna Kość', 'Joanna Ko', 'Anna Rusa', 'Anna Ru')):
+        entry, is_new = deduplicator.add(name, f"client_{index}")
+        assert is_new, name
+    assert deduplicator.merged() == []
+
+
+def test_company_name_variants_are_merged():
+    deduplicator = ClientDeduplicator()
+    first, _ = deduplicator.add('ABC Sp. z o.o.', 'client_1')
+    second, is_new = deduplicator.add('abc sp.z o.o', 'client_2')
+    assert second is first and not is_new
+    assert first['ids'] == ['client_1', 'client_2']
+
+
+def test_merged_ids_resolve_to_the_first_id():
+    deduplicator = ClientDeduplicator()
+    deduplicator.add('Jan Nowak', '1017')
+    deduplicator.add('JAN NOWAK', '638')
+    assert deduplicator.resolve_id('638') == '1017'
+    assert deduplicator.resolve_id('1017') == '1017'
+    assert deduplicator.resolve_id('5') == '5'
+
+
+def test_id_of_its_own_client_is_not_an_alias():
+    deduplicator = ClientDeduplicator()
+    deduplicator.add('Jan Nowak', '1017')
+    deduplicator.add('Anna Kowalska', '638')
+    deduplicator.add('Jan Nowak', '638')
+    assert deduplicator.resolve_id('638') == '638'
+    deduplicator.add('Piotr Zieliński', '7')
+    deduplicator.add('Piotr Zielinski', '8')
+    deduplicator.add('Ewa Wiśniewska', '8')
+    assert deduplicator.resolve_id('8') == '8'
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Upload-ready NDJSON batches for Firestore.
+
+Each collection is written as NDJSON shards of at most 500 documents (the
+Firestore batched-write limit) and at most MAX_BATCH_BYTES, so the uploader
+(firestore_uploader.py) can send every file as one commit without reading
+or re-slicing whole JSON arrays:
+
+    upload_batches/
+        manifest.json            collections -> [{file, documents, bytes, hash}]
+        bonds/00000.ndjson
+        bonds/00001.ndjson
+        ...
+        upload_checkpoint.ndjson written by the uploader: one line per
+                                 committed batch (file + hash), used to resume
+
+A batch whose content hash changed since it was checkpointed is uploaded
+again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+from compact_records import plain
+from field_mapping import COLLECTIONS
+
+BATCH_SIZE = 500  # Firestore batch limit
+# Firestore rejects commit requests over 10 MiB; the typed REST encoding of a
+# document is roughly twice its NDJSON size
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+DEFAULT_BATCH_DIR = 'upload_batches'
+MANIFEST_FILE = 'manifest.json'
+CHECKPOINT_FILE = 'upload_checkpoint.ndjson'
+
+
+class _BatchFile:
+    def __init__(self, directory, collection, index):
+        self.relative = f"{collection}/{index:05d}.ndjson"
+        self.file = open(os.path.join(directory, self.relative), 'wb')
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.documents = 0
+        self.bytes = 0
+
+    def write(self, line):
+        self.file.write(line)
+        self.hash.update(line)
+        self.documents += 1
+        self.bytes += len(line)
+
+    def close(self):
+        self.file.close()
+        return {'file': self.relative, 'documents': self.documents, 'bytes': self.bytes,
+                'hash': self.hash.hexdigest()}
+
+
+def write_collection(documents, output_dir, collection, batch_size=BATCH_SIZE, max_bytes=MAX_BATCH_BYTES):
+    """Write one collection as NDJSON batches; returns the manifest entries"""
+    directory = os.path.join(output_dir, collection)
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+
+    entries = []
+    batch = None
+    for document in documents:
+        line = (json.dumps(document, ensure_ascii=False, separators=(',', ':'), default=plain) + '\n').encode('utf-8')
+        if batch is not None and (batch.documents >= batch_size or batch.bytes + len(line) > max_bytes):
+            entries.append(batch.close())
+            batch = None
+        if batch is None:
+            batch = _BatchFile(output_dir, collection, len(entries))
+        batch.write(line)
+    if batch is not None:
+        entries.append(batch.close())
+    return entries
+
+
+def write_upload_batches(results, output_dir=DEFAULT_BATCH_DIR, batch_size=BATCH_SIZE):
+    """
+    Write extractor results ({collection: records}) as upload batches and
+    return the manifest. Collections not in `results` keep their previous
+    batches and manifest entries.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir) or {'batchSize': batch_size, 'collections': {}}
+    manifest['batchSize'] = batch_size
+
+    for collection in COLLECTIONS:
+        if collection in results:
+            manifest['collections'][collection] = write_collection(
+                results[collection], output_dir, collection, batch_size)
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def load_manifest(batch_dir):
+    path = os.path.join(batch_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def iter_batch_documents(batch_dir, entry):
+    with open(os.path.join(batch_dir, entry['file']), 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_checkpoint(batch_dir):
+    """{(file, hash)} of batches already committed"""
+    path = os.path.join(batch_dir, CHECKPOINT_FILE)
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn last line after a crash: that batch is simply uploaded again
+                continue
+            done.add((entry['file'], entry['hash']))
+    return done
+
+
+class CheckpointLog:
+    """Append-only log of committed batches (flushed after every line)"""
+
+    def __init__(self, batch_dir):
+        self.file = open(os.path.join(batch_dir, CHECKPOINT_FILE), 'a', encoding='utf-8')
+
+    def mark_done(self, entry):
+        self.file.write(json.dumps({'file': entry['file'], 'hash': entry['hash']}) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def reset_checkpoint(batch_dir):
+    path = os.path.join(batch_dir, CHECKPOINT_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def main():
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_BATCH_DIR
+
+    results = {}
+    for collection in COLLECTIONS:
+        path = os.path.join(source_dir, f"{collection}_extracted.json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                results[collection] = json.load(file)
+
+    if not results:
+        print(f"❌ No *_extracted.json files found in {source_dir}")
+        sys.exit(1)
+
+    manifest = write_upload_batches(results, output_dir)
+    for collection, entries in manifest['collections'].items():
+        documents = sum(entry['documents'] for entry in entries)
+        print(f"📦 {collection}: {documents} documents in {len(entries)} batches")
+    print(f"✅ Upload batches written to {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Streaming, read-only reader for the source .xlsx workbook.
+
+Replaces the tableConvert.com conversion step: iter_xlsx_records() yields
+the same flat record dicts the tableConvert JSON export contains, keyed by
+the header row, with every value as text:
+
+    missing / empty cell     "" (a literal NULL in a cell stays "NULL")
+    number with a format     formatted like Excel shows it ("0.00",
+                             "305,700.00" for #,##0.00)
+    date-formatted number    "YYYY-MM-DD HH:MM:SS"
+    ISO date cell (t="d")    "YYYY-MM-DD HH:MM:SS"
+    boolean                  "TRUE" / "FALSE"
+
+The sheet XML is parsed with ElementTree.iterparse straight out of the zip
+archive and every row is dropped as soon as it has been converted, so peak
+memory is the shared-strings table plus one row, whatever the sheet size.
+Only the standard library is used.
+"""
+
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Context, Decimal
+
+EMPTY_VALUE = ''
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+# Built-in number formats (ECMA-376 18.8.30) that are dates or times
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+_BUILTIN_NUMBER_FORMATS = {1: '0', 2: '0.00', 3: '#,##0', 4: '#,##0.00', 9: '0%', 10: '0.00%'}
+# Quoted text, escaped characters and [colour]/[condition] sections carry no date tokens
+_FORMAT_NOISE = re.compile(r'"[^"]*"|\\.|\[[^\]]*\]')
+_CELL_COLUMN = re.compile(r'[A-Z]+')
+# Enough digits for any double with its decimals; ties round away from zero like Excel
+_DECIMAL = Context(prec=400, rounding=ROUND_HALF_UP)
+
+
+class XlsxError(ValueError):
+    """Raised for a workbook that cannot be read (not a zip, missing parts, unknown sheet)"""
+
+
+def _local(tag):
+    """Tag name without its namespace, so transitional and strict OOXML both work"""
+    return tag.rpartition('}')[2]
+
+
+def _text(element):
+    """Concatenated <t> text of a shared or inline string, skipping phonetic runs"""
+    parts = []
+    for child in element:
+        name = _local(child.tag)
+        if name == 't':
+            parts.append(child.text or '')
+        elif name == 'r':
+            parts.extend(t.text or '' for t in child if _local(t.tag) == 't')
+    return ''.join(parts)
+
+
+def column_index(reference):
+    """0-based column of a cell reference ("A1" -> 0, "AB7" -> 27)"""
+    index = 0
+    for char in _CELL_COLUMN.match(reference).group():
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def is_date_format(format_id, code):
+    """True when a number format displays a date or time"""
+    if format_id in _BUILTIN_DATE_FORMATS:
+        return True
+    if not code:
+        return False
+    code = _FORMAT_NOISE.sub('', code).split(';')[0].lower()
+    return any(token in code for token in 'ymdhs')
+
+
+class _NumberFormat:
+    """Renders a cell number the way a simple Excel format code displays it"""
+
+    def __init__(self, code):
+        code = _FORMAT_NOISE.sub('', code or '').split(';')[0]
+        self.general = not code or code.lower() == 'general'
+        self.percent = '%' in code
+        self.grouped = '#,#' in code or ',0' in code
+        _, point, fraction = code.partition('.')
+        self.decimals = len(re.match(r'[0#?]*', fraction).group()) if point else 0
+        self.quantum = Decimal(1).scaleb(-self.decimals)
+
+    def __call__(self, number):
+        # Excel keeps 15 significant digits
+        if self.general:
+            return f"{number:.15g}".upper()  # "1E+16"
+        value = Decimal(f"{number:.15g}")
+        if self.percent:
+            value = _DECIMAL.multiply(value, 100)
+        # 0.125 -> "0.13" with 0.00 and "13%" with 0%
+        value = value.quantize(self.quantum, context=_DECIMAL)
+        text = f"{value:{',' if self.grouped else ''}f}"
+        return text + '%' if self.percent else text
+
+
+class XlsxWorkbook:
+    """
+    Read-only view of an .xlsx file. Shared strings and styles are loaded
+    once; sheets are streamed by rows().
+    """
+
+    def __init__(self, path):
+        try:
+            self.archive = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            raise XlsxError(f"{path} is not an .xlsx workbook: {e}") from None
+        try:
+            self.sheets, self.date1904 = self._read_workbook()
+            self.shared_strings = self._read_shared_strings()
+            self.cell_formats = self._read_styles()
+        except BaseException:
+            self.archive.close()
+            raise
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _part(self, name):
+        try:
+            return self.archive.open(name)
+        except KeyError:
+            raise XlsxError(f"Workbook part {name} is missing") from None
+
+    def _read_workbook(self):
+        """[(sheet name, archive path)] in workbook order and the date system"""
+        targets = {}
+        with self._part('xl/_rels/workbook.xml.rels') as file:
+            for relationship in ET.parse(file).getroot():
+                target = relationship.get('Target', '')
+                if target.startswith('/'):
+                    target = target[1:]
+                elif not target.startswith('xl/'):
+                    target = 'xl/' + target
+                targets[relationship.get('Id')] = target
+
+        sheets, date1904 = [], False
+        with self._part('xl/workbook.xml') as file:
+            for element in ET.parse(file).getroot().iter():
+                name = _local(element.tag)
+                if name == 'workbookPr':
+                    date1904 = element.get('date1904', '').lower() in ('1', 'true')
+                elif name == 'sheet':
+                    relationship = element.get(f'{{{_REL_NS}}}id') or element.get('id')
+                    sheets.append((element.get('name'), targets.get(relationship)))
+        return sheets, date1904
+
+    def _read_shared_strings(self):
+        if 'xl/sharedStrings.xml' not in self.archive.namelist():
+            return []
+        strings = []
+        with self._part('xl/sharedStrings.xml') as file:
+            for _, element in ET.iterparse(file):
+                if _local(element.tag) == 'si':
+                    strings.append(sys.intern(_text(element)))
+                    element.clear()
+        return strings
+
+    def _read_styles(self):
+        """Per cell style index: (is date, number formatter)"""
+        if 'xl/styles.xml' not in self.archive.namelist():
+            return []
+        with self._part('xl/styles.xml') as file:
+            root = ET.parse(file).getroot()
+
+        codes = dict(_BUILTIN_NUMBER_FORMATS)
+        formats = []
+        for section in root:
+            name = _local(section.tag)
+            if name == 'numFmts':
+                for number_format in section:
+                    codes[int(number_format.get('numFmtId'))] = number_format.get('formatCode')
+            elif name == 'cellXfs':
+                formats = [int(xf.get('numFmtId', 0)) for xf in section]
+        return [(is_date_format(format_id, codes.get(format_id)), _NumberFormat(codes.get(format_id)))
+                for format_id in formats]
+
+    def sheet_path(self, sheet=None):
+        """Archive path of a sheet given by name, 0-based index or None (first)"""
+        if not self.sheets:
+            raise XlsxError('Workbook has no sheets')
+        if sheet is None:
+            sheet = 0
+        if isinstance(sheet, int):
+            if not 0 <= sheet < len(self.sheets):
+                raise XlsxError(f"Sheet index {sheet} out of range ({len(self.sheets)} sheets)")
+            return self.sheets[sheet][1]
+        for name, path in self.sheets:
+            if name == sheet:
+                return path
+        raise XlsxError(f"Sheet {sheet!r} not found (sheets: {', '.join(name for name, _ in self.sheets)})")
+
+    def _date(self, serial):
+        if self.date1904:
+            base = datetime(1904, 1, 1)
+        else:
+            # Excel counts the nonexistent 1900-02-29 (serial 60)
+            base = datetime(1899, 12, 30) if serial >= 61 else datetime(1899, 12, 31)
+        return (base + timedelta(seconds=round(serial * 86400))).strftime(DATE_FORMAT)
+
+    @staticmethod
+    def _iso_date(raw, cell):
+        """ISO-8601 date cell (t="d", LibreOffice and strict OOXML) as DATE_FORMAT text"""
+        text = raw.strip()
+        if text.endswith('Z'):
+            text = text[:-1]
+        try:
+            if 'T' in text or ' ' in text or '-' in text:
+                value = datetime.fromisoformat(text)
+            else:
+                # Time only ("13:45:00")
+                value = datetime.combine(datetime(1899, 12, 30), datetime.strptime(text, '%H:%M:%S').time())
+        except ValueError:
+            raise XlsxError(f"Cell {cell.get('r', '?')}: {raw!r} is not an ISO-8601 date") from None
+        return value.strftime(DATE_FORMAT)
+
+    def _value(self, cell):
+        """Text of one <c> element, or None for an empty cell"""
+        kind = cell.get('t', 'n')
+        raw = None
+        for child in cell:
+            name = _local(child.tag)
+            if name == 'v':
+                raw = child.text
+            elif name == 'is':
+                return _text(child)
+        if raw is None:
+            return None
+        if kind == 's':
+            return self.shared_strings[int(raw)]
+        if kind in ('str', 'inlineStr'):
+            return raw
+        if kind == 'b':
+            return 'TRUE' if raw == '1' else 'FALSE'
+        if kind == 'e':
+            return None
+        if kind == 'd':
+            return self._iso_date(raw, cell)
+
+        try:
+            number = float(raw)
+        except ValueError:
+            raise XlsxError(f"Cell {cell.get('r', '?')}: {raw!r} is not a number") from None
+        style = int(cell.get('s', 0))
+        if style < len(self.cell_formats):
+            is_date, formatter = self.cell_formats[style]
+            return self._date(number) if is_date else formatter(number)
+        return _NumberFormat(None)(number)
+
+    def rows(self, sheet=None):
+        """Yield every row of a sheet as a list of cell texts (None where empty)"""
+        sheet_data = None
+        with self._part(self.sheet_path(sheet)) as file:
+            for event, element in ET.iterparse(file, events=('start', 'end')):
+                name = _local(element.tag)
+                if event == 'start':
+                    if name == 'sheetData':
+                        sheet_data = element
+                    continue
+                if name != 'row':
+                    continue
+
+                row = []
+                for position, cell in enumerate(element):
+                    if _local(cell.tag) != 'c':
+                        continue
+                    reference = cell.get('r')
+                    index = column_index(reference) if reference else position
+                    if index >= len(row):
+                        row.extend([None] * (index + 1 - len(row)))
+                    row[index] = self._value(cell)
+                # Drop the converted row so memory stays flat
+                element.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+                yield row
+
+
+def iter_xlsx_records(path, sheet=None, missing=EMPTY_VALUE):
+    """
+    Yield one dict per data row of an .xlsx sheet, keyed by the first
+    non-empty row, with the value shapes of the tableConvert JSON export.
+    """
+    with XlsxWorkbook(path) as workbook:
+        header = None
+        for row in workbook.rows(sheet):
+            if not any(value not in (None, '') for value in row):
+                continue
+            if header is None:
+                header = [(index, value) for index, value in enumerate(row) if value not in (None, '')]
+                continue
+            size = len(row)
+            yield {
+                name: (row[index] if index < size and row[index] not in (None, '') else missing)
+                for index, name in header
+            }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python xlsx_reader.py <workbook.xlsx> [output.json] [sheet]")
+        sys.exit(1)
+
+    from json_writers import write_json_array
+
+    source = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+    sheet = sys.argv[3] if len(sys.argv) > 3 else None
+
+    try:
+        if output is None:
+            count = sum(1 for _ in iter_xlsx_records(source, sheet))
+            print(f"✅ {count} records read from {source}")
+        else:
+            count = write_json_array(iter_xlsx_records(source, sheet), output)
+            print(f"✅ {count} records written to {output}")
+    except (FileNotFoundError, XlsxError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()